@@ -0,0 +1,124 @@
+"""Initial schema
+
+Revision ID: 0f1e2d3c4b5a
+Revises:
+Create Date: 2026-10-17 08:00:00.000000
+
+The tables as they were before the first migration, so `alembic upgrade head`
+builds the whole schema on an empty database. Databases that were created by
+Base.metadata.create_all and never stamped already have these tables; each
+one is only created if it is missing, and the later migrations add whatever
+columns and indexes those databases lack.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f1e2d3c4b5a'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SENTIMENT = sa.Enum("POSITIVE", "NEGATIVE", "NEUTRAL", name="sentimenttype")
+ANALYSIS_STATUS = sa.Enum("PENDING", "IN_PROGRESS", "COMPLETED", "FAILED", name="analysisstatus")
+
+
+def _tables():
+    """(name, columns, indexes) of each table, in creation order"""
+    return [
+        ("products", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        ], [("ix_products_id", ["id"], False), ("ix_products_name", ["name"], True)]),
+        ("analyses", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+            sa.Column("status", ANALYSIS_STATUS, nullable=False),
+            sa.Column("total_comments", sa.Integer(), nullable=True),
+            sa.Column("avg_sentiment_score", sa.Float(), nullable=True),
+            sa.Column("positive_count", sa.Integer(), nullable=True),
+            sa.Column("negative_count", sa.Integer(), nullable=True),
+            sa.Column("neutral_count", sa.Integer(), nullable=True),
+            sa.Column("churn_risk_score", sa.Float(), nullable=True),
+            sa.Column("error_message", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        ], [("ix_analyses_id", ["id"], False)]),
+        ("customer_comments", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+            sa.Column("analysis_id", sa.Integer(), sa.ForeignKey("analyses.id"), nullable=False),
+            sa.Column("text", sa.Text(), nullable=False),
+            sa.Column("source", sa.String(100), nullable=False),
+            sa.Column("source_url", sa.String(500), nullable=True),
+            sa.Column("author", sa.String(255), nullable=True),
+            sa.Column("sentiment", SENTIMENT, nullable=True),
+            sa.Column("sentiment_score", sa.Float(), nullable=True),
+            sa.Column("confidence", sa.Float(), nullable=True),
+            sa.Column("posted_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("scraped_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        ], [("ix_customer_comments_id", ["id"], False)]),
+        ("topics", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("analysis_id", sa.Integer(), sa.ForeignKey("analyses.id"), nullable=False),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("keywords", sa.Text(), nullable=True),
+            sa.Column("mention_count", sa.Integer(), nullable=True),
+            sa.Column("avg_sentiment", sa.Float(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        ], [("ix_topics_id", ["id"], False)]),
+        ("users", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("hashed_password", sa.String(255), nullable=False),
+            sa.Column("full_name", sa.String(255), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("is_admin", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("last_login", sa.DateTime(timezone=True), nullable=True),
+        ], [("ix_users_id", ["id"], False), ("ix_users_email", ["email"], True)]),
+        ("notification_preferences", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+            sa.Column("email_alerts", sa.Boolean(), nullable=True),
+            sa.Column("sentiment_threshold", sa.Float(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        ], [("ix_notification_preferences_id", ["id"], False)]),
+        ("saved_products", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+            sa.Column("nickname", sa.String(255), nullable=True),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        ], [("ix_saved_products_id", ["id"], False)]),
+    ]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, columns, indexes in _tables():
+        if inspector.has_table(name):
+            continue
+        op.create_table(name, *columns)
+        for index, index_columns, unique in indexes:
+            op.create_index(index, name, index_columns, unique=unique)
+
+
+def downgrade() -> None:
+    for name, _, indexes in reversed(_tables()):
+        for index, _, _ in indexes:
+            op.drop_index(index, table_name=name)
+        op.drop_table(name)
+
+    if op.get_bind().dialect.name == "postgresql":
+        ANALYSIS_STATUS.drop(op.get_bind(), checkfirst=True)
+        SENTIMENT.drop(op.get_bind(), checkfirst=True)
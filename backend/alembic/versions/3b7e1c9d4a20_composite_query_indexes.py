@@ -0,0 +1,49 @@
+"""Composite indexes for the latest-analysis and dashboard queries
+
+Revision ID: 3b7e1c9d4a20
+Revises: 0f1e2d3c4b5a
+Create Date: 2026-10-17 09:00:00.000000
+
+Base.metadata.create_all also creates these indexes, so if_not_exists makes
+this a no-op on databases it built. On PostgreSQL the indexes are built
+CONCURRENTLY, so a large customer_comments table stays writable while they
+build.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e1c9d4a20'
+down_revision: Union[str, None] = '0f1e2d3c4b5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_analyses_product_status_completed", "analyses", ["product_id", "status", "completed_at"]),
+    ("ix_customer_comments_analysis_scraped", "customer_comments", ["analysis_id", "scraped_at"]),
+    ("ix_topics_analysis_mentions", "topics", ["analysis_id", "mention_count"]),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,57 @@
+"""Incremental analyses reference their base analysis's comments
+
+Revision ID: 5e9b2d7f3a18
+Revises: c41a7e2b9f06
+Create Date: 2026-10-17 18:00:00.000000
+
+Adds the columns app/core/scrape_cursors.py uses to inherit comments from
+the previous completed analysis instead of copying them. Comments copied
+by earlier incremental analyses are left as they are.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9b2d7f3a18'
+down_revision: Union[str, None] = 'c41a7e2b9f06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = [
+    sa.Column("base_analysis_id", sa.Integer(), nullable=True),
+    sa.Column("inherited_since", sa.DateTime(timezone=True), nullable=True),
+]
+
+
+def upgrade() -> None:
+    # Databases created by Base.metadata.create_all already have these; add only what's missing
+    inspector = sa.inspect(op.get_bind())
+    existing = {column["name"] for column in inspector.get_columns("analyses")}
+    for column in COLUMNS:
+        if column.name not in existing:
+            op.add_column("analyses", column)
+
+    if op.get_bind().dialect.name != "sqlite":
+        # SQLite can't add constraints to an existing table (and doesn't enforce them by default)
+        constrained = {
+            tuple(fk["constrained_columns"]) for fk in inspector.get_foreign_keys("analyses")
+        }
+        if ("base_analysis_id",) not in constrained:
+            op.create_foreign_key("fk_analyses_base_analysis", "analyses", "analyses",
+                                  ["base_analysis_id"], ["id"], ondelete="SET NULL")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        # create_all names the constraint itself, so drop whatever is on the column
+        for fk in sa.inspect(op.get_bind()).get_foreign_keys("analyses"):
+            if fk["name"] and fk["constrained_columns"] == ["base_analysis_id"]:
+                op.drop_constraint(fk["name"], "analyses", type_="foreignkey")
+    # Batch mode rebuilds the table on SQLite, which can't drop a column a foreign key uses
+    with op.batch_alter_table("analyses") as batch_op:
+        batch_op.drop_column("inherited_since")
+        batch_op.drop_column("base_analysis_id")
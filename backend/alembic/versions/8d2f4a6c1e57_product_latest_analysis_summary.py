@@ -0,0 +1,91 @@
+"""Latest completed analysis pointer and summary on products
+
+Revision ID: 8d2f4a6c1e57
+Revises: 3b7e1c9d4a20
+Create Date: 2026-10-17 12:00:00.000000
+
+Adds the columns app/core/product_summary.py maintains and backfills them
+from each product's two most recent completed analyses.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4a6c1e57'
+down_revision: Union[str, None] = '3b7e1c9d4a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+POINTERS = [
+    ("latest_completed_analysis_id", "fk_products_latest_completed_analysis"),
+    ("previous_completed_analysis_id", "fk_products_previous_completed_analysis"),
+]
+
+# Summary column -> analyses column it caches
+SUMMARY = {
+    "latest_completed_at": "completed_at",
+    "latest_total_comments": "total_comments",
+    "latest_positive_count": "positive_count",
+    "latest_negative_count": "negative_count",
+    "latest_avg_sentiment": "avg_sentiment_score",
+    "latest_churn_risk_score": "churn_risk_score",
+}
+
+COLUMNS = [
+    sa.Column("latest_completed_analysis_id", sa.Integer(), nullable=True),
+    sa.Column("previous_completed_analysis_id", sa.Integer(), nullable=True),
+    sa.Column("latest_completed_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("latest_total_comments", sa.Integer(), nullable=True),
+    sa.Column("latest_positive_count", sa.Integer(), nullable=True),
+    sa.Column("latest_negative_count", sa.Integer(), nullable=True),
+    sa.Column("latest_avg_sentiment", sa.Float(), nullable=True),
+    sa.Column("latest_churn_risk_score", sa.Float(), nullable=True),
+]
+
+
+def upgrade() -> None:
+    # Databases created by Base.metadata.create_all already have these columns (and their
+    # foreign keys); only add what's missing so the migration can run against either
+    inspector = sa.inspect(op.get_bind())
+    existing = {column["name"] for column in inspector.get_columns("products")}
+    for column in COLUMNS:
+        if column.name not in existing:
+            op.add_column("products", column)
+
+    if op.get_bind().dialect.name != "sqlite":
+        # SQLite can't add constraints to an existing table (and doesn't enforce them by default)
+        constrained = {
+            tuple(fk["constrained_columns"]) for fk in inspector.get_foreign_keys("products")
+        }
+        for column, name in POINTERS:
+            if (column,) not in constrained:
+                op.create_foreign_key(name, "products", "analyses", [column], ["id"], ondelete="SET NULL")
+
+    completed = "FROM analyses WHERE analyses.product_id = products.id AND analyses.status = 'COMPLETED'"
+    order = "ORDER BY analyses.completed_at DESC, analyses.id DESC"
+    op.execute(f"""
+        UPDATE products SET
+            latest_completed_analysis_id = (SELECT analyses.id {completed} {order} LIMIT 1),
+            previous_completed_analysis_id = (SELECT analyses.id {completed} {order} LIMIT 1 OFFSET 1)
+    """)
+    assignments = ", ".join(
+        f"{column} = (SELECT analyses.{source} FROM analyses WHERE analyses.id = products.latest_completed_analysis_id)"
+        for column, source in SUMMARY.items()
+    )
+    op.execute(f"UPDATE products SET {assignments} WHERE latest_completed_analysis_id IS NOT NULL")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        # create_all names these constraints itself, so drop whatever is on the pointer columns
+        pointers = {column for column, _ in POINTERS}
+        for fk in sa.inspect(op.get_bind()).get_foreign_keys("products"):
+            if fk["name"] and set(fk["constrained_columns"]) <= pointers:
+                op.drop_constraint(fk["name"], "products", type_="foreignkey")
+    # Batch mode rebuilds the table on SQLite, which can't drop a column a foreign key uses
+    with op.batch_alter_table("products") as batch_op:
+        for column in reversed(COLUMNS):
+            batch_op.drop_column(column.name)
@@ -0,0 +1,37 @@
+"""Index for the paginated saved products list
+
+Revision ID: c41a7e2b9f06
+Revises: 8d2f4a6c1e57
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7e2b9f06'
+down_revision: Union[str, None] = '8d2f4a6c1e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index("ix_saved_products_user_created", "saved_products", ["user_id", "created_at"],
+                            if_not_exists=True, postgresql_concurrently=True)
+    else:
+        op.create_index("ix_saved_products_user_created", "saved_products", ["user_id", "created_at"],
+                        if_not_exists=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index("ix_saved_products_user_created", table_name="saved_products",
+                          if_exists=True, postgresql_concurrently=True)
+    else:
+        op.drop_index("ix_saved_products_user_created", table_name="saved_products", if_exists=True)
@@ -0,0 +1,90 @@
+"""Batch, scrape cursor, topic aggregate and comment fingerprint tables
+
+Revision ID: d2b8f4e6a1c3
+Revises: 5e9b2d7f3a18
+Create Date: 2026-10-17 20:00:00.000000
+
+Tables added to the models alongside the earlier migrations, which until now
+only Base.metadata.create_all created. Each one is only created if it is
+missing, so this is a no-op on databases create_all has already built.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b8f4e6a1c3'
+down_revision: Union[str, None] = '5e9b2d7f3a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Created with customer_comments by the initial schema
+SENTIMENT = postgresql.ENUM("POSITIVE", "NEGATIVE", "NEUTRAL", name="sentimenttype", create_type=False)
+
+
+def _tables():
+    """(name, columns, indexes) of each table, in creation order"""
+    return [
+        ("analysis_batches", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("total", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        ], [("ix_analysis_batches_id", ["id"])]),
+        ("analysis_batch_items", [
+            sa.Column("batch_id", sa.Integer(), sa.ForeignKey("analysis_batches.id"), primary_key=True),
+            sa.Column("analysis_id", sa.Integer(), sa.ForeignKey("analyses.id"), primary_key=True),
+            sa.Column("coalesced", sa.Boolean(), nullable=False),
+        ], []),
+        ("product_topic_aggregates", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+            sa.Column("bucket_date", sa.Date(), nullable=False),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("mention_count", sa.Integer(), nullable=False),
+            sa.Column("sentiment_sum", sa.Float(), nullable=False),
+            sa.Column("keyword_counts", sa.JSON(), nullable=True),
+            sa.Column("analysis_count", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.UniqueConstraint("product_id", "bucket_date", "name", name="uq_product_topic_aggregates_bucket"),
+        ], [("ix_product_topic_aggregates_id", ["id"])]),
+        ("scrape_cursors", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+            sa.Column("source", sa.String(100), nullable=False),
+            sa.Column("last_posted_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("last_source_url", sa.String(500), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.UniqueConstraint("product_id", "source", name="uq_scrape_cursors_source"),
+        ], [("ix_scrape_cursors_id", ["id"])]),
+        ("comment_fingerprints", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+            sa.Column("model", sa.String(255), nullable=False),
+            sa.Column("exact_hash", sa.String(32), nullable=False),
+            sa.Column("sentiment", SENTIMENT, nullable=False),
+            sa.Column("sentiment_score", sa.Float(), nullable=False),
+            sa.Column("confidence", sa.Float(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        ], [("ix_comment_fingerprints_id", ["id"]), ("ix_comment_fingerprints_product_id", ["product_id"])]),
+    ]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, columns, indexes in _tables():
+        if inspector.has_table(name):
+            continue
+        op.create_table(name, *columns)
+        for index, index_columns in indexes:
+            op.create_index(index, name, index_columns)
+
+
+def downgrade() -> None:
+    for name, _, indexes in reversed(_tables()):
+        for index, _ in indexes:
+            op.drop_index(index, table_name=name)
+        op.drop_table(name)
@@ -4,25 +4,40 @@ Analysis API Endpoints
 This module contains the core API endpoints for analyzing products.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import hashlib
+import json
 import logging
 
+from app.core.bulk_insert import bulk_insert
 from app.core.database import get_db
+from app.core.dashboard_cache import get_dashboard_cache
+from app.core.progress import TERMINAL_STATUSES, subscribe_progress
+from app.core.scrape_cursors import comment_scope
+from app.core.topic_aggregates import top_topics
 from app.models.database_models import (
-    Product, Analysis, CustomerComment, Topic,
+    Product, Analysis, AnalysisBatch, AnalysisBatchItem, CustomerComment, Topic,
     AnalysisStatus, SentimentType
 )
 from app.models.schemas import (
     AnalysisRequest,
     AnalysisResponse,
     AnalysisJobResponse,
+    BatchAnalysisItem,
+    BatchAnalysisRequest,
+    BatchAnalysisResponse,
+    BatchStatusResponse,
     DashboardData,
     ProductResponse,
     CommentResponse,
-    TopicResponse
+    TopicResponse,
+    TopicAggregateResponse
 )
 from app.core.config import settings
 
@@ -31,8 +46,9 @@ router = APIRouter(prefix="/analysis", tags=["analysis"])
 
 
 @router.post("/analyze", response_model=AnalysisJobResponse)
-async def start_analysis(
+def start_analysis(
     request: AnalysisRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -40,21 +56,33 @@ async def start_analysis(
     
     This endpoint:
     1. Creates or finds the product in the database
-    2. Creates a new analysis record
-    3. In DEMO mode: Runs synchronously with mock data (no Celery/Redis needed)
-    4. In FULL mode: Queues background task to Celery worker
-    5. Returns immediately with job ID
+    2. Returns the product's pending/running analysis, or one completed
+       within ANALYSIS_FRESHNESS_SECONDS, if there is one (coalescing)
+    3. Otherwise creates a new analysis record
+    4. In DEMO mode: Runs in a background thread with mock data (no Celery/Redis needed)
+    5. In FULL mode: Queues background task to Celery worker
+    6. Returns immediately with job ID
     """
     try:
-        # Find or create product
-        product = db.query(Product).filter(Product.name == request.product_name).first()
+        product = _get_or_create_product(db, request.product_name)
         
-        if not product:
-            product = Product(name=request.product_name)
-            db.add(product)
+        # Lock the product row (SELECT ... FOR UPDATE) so concurrent requests
+        # for it serialize on the check below; committing releases the lock
+        db.query(Product).filter(Product.id == product.id).with_for_update().first()
+        
+        existing = _find_reusable_analyses(db, [product.id]).get(product.id)
+        if existing:
+            existing_id, existing_status = existing.id, existing.status
             db.commit()
-            db.refresh(product)
-            logger.info(f"Created new product: {request.product_name}")
+            logger.info(f"Coalesced analysis request for '{request.product_name}' into analysis {existing_id} ({existing_status.value})")
+            completed = existing_status == AnalysisStatus.COMPLETED
+            return AnalysisJobResponse(
+                message=f"Analysis for '{request.product_name}' already {'available' if completed else 'running'}",
+                analysis_id=existing_id,
+                status=existing_status,
+                estimated_time_seconds=0 if completed else (5 if settings.DEMO_MODE else 90),
+                coalesced=True
+            )
         
         # Create new analysis
         analysis = Analysis(
@@ -70,11 +98,8 @@ async def start_analysis(
             # DEMO MODE: Run synchronously without Celery/Redis
             logger.info(f"Running analysis {analysis.id} in DEMO mode (no Celery)")
             from app.tasks.analysis_tasks import run_analysis_sync
-            # Run in background to avoid blocking the API response
-            import asyncio
-            asyncio.create_task(
-                asyncio.to_thread(run_analysis_sync, analysis.id, request.product_name)
-            )
+            # Runs in the threadpool after the response is sent
+            background_tasks.add_task(run_analysis_sync, analysis.id, request.product_name)
             estimated_time = 5  # Demo mode is faster
         else:
             # FULL MODE: Queue to Celery worker (requires Redis)
@@ -95,24 +120,380 @@ async def start_analysis(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/analyze-batch", response_model=BatchAnalysisResponse)
+def start_batch_analysis(
+    request: BatchAnalysisRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Start analyses for many products with one request
+    
+    Products are upserted and analyses created in a few bulk statements,
+    inside one transaction. Products with a running or recent analysis
+    join it, as in start_analysis. The new analyses fan out as a single
+    Celery chord (a background run in DEMO mode). Track the batch with
+    GET /batch/{batch_id}.
+    """
+    # Already stripped, de-duplicated and capped at BATCH_MAX_PRODUCTS by the schema (422 otherwise)
+    names = request.product_names
+    
+    try:
+        product_ids = _upsert_products(db, names)
+        ids = sorted(product_ids.values())
+        
+        # Same product row locks as start_analysis, taken in id order so
+        # overlapping batches cannot deadlock
+        for chunk in _chunks(ids):
+            db.query(Product.id).filter(Product.id.in_(chunk)).order_by(Product.id).with_for_update().all()
+        
+        reusable = {product_id: analysis.id for product_id, analysis in _find_reusable_analyses(db, ids).items()}
+        created = {}
+        new_product_ids = [product_id for product_id in ids if product_id not in reusable]
+        if new_product_ids:
+            rows = db.execute(
+                insert(Analysis).returning(Analysis.id, Analysis.product_id),
+                [{"product_id": product_id, "status": AnalysisStatus.PENDING} for product_id in new_product_ids]
+            )
+            created = {row.product_id: row.id for row in rows}
+        
+        batch = AnalysisBatch(total=len(names))
+        db.add(batch)
+        db.flush()
+        batch_id = batch.id
+        
+        items = []
+        jobs = []
+        for name in names:
+            product_id = product_ids[name]
+            if product_id in reusable:
+                items.append(BatchAnalysisItem(product_name=name, analysis_id=reusable[product_id], coalesced=True))
+            else:
+                items.append(BatchAnalysisItem(product_name=name, analysis_id=created[product_id]))
+                jobs.append((created[product_id], name))
+        
+        bulk_insert(db, AnalysisBatchItem.__table__, [
+            {"batch_id": batch_id, "analysis_id": item.analysis_id, "coalesced": item.coalesced}
+            for item in items
+        ])
+        db.commit()
+        
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error starting batch analysis: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if jobs:
+        if settings.DEMO_MODE:
+            from app.tasks.batches import run_batch_sync
+            background_tasks.add_task(run_batch_sync, batch_id, jobs)
+        else:
+            from app.tasks.batches import dispatch_batch
+            dispatch_batch(batch_id, jobs)
+    
+    logger.info(f"Started batch {batch_id}: {len(jobs)} new analyses, {len(items) - len(jobs)} coalesced")
+    return BatchAnalysisResponse(
+        message=f"Batch started for {len(names)} products",
+        batch_id=batch_id,
+        total=len(names),
+        queued=len(jobs),
+        coalesced=len(items) - len(jobs),
+        analyses=items
+    )
+
+
+@router.get("/batch/{batch_id}", response_model=BatchStatusResponse)
+def get_batch_status(batch_id: int, db: Session = Depends(get_db)):
+    """Get aggregated progress of a batch (one grouped count over its analyses)"""
+    from app.tasks.batches import batch_progress
+    
+    batch = db.query(AnalysisBatch).filter(AnalysisBatch.id == batch_id).first()
+    
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    counts = batch_progress(db, batch)
+    finished = counts["completed"] + counts["failed"]
+    return BatchStatusResponse(
+        batch_id=batch.id,
+        status="completed" if batch.completed_at else "in_progress",
+        total=batch.total,
+        progress=round(finished / batch.total * 100, 1) if batch.total else 100.0,
+        created_at=batch.created_at,
+        completed_at=batch.completed_at,
+        **counts
+    )
+
+
+def _upsert_products(db: Session, names: List[str]) -> dict:
+    """
+    Ensure products exist for all names in bulk
+    
+    Returns:
+        {name: product_id}
+    """
+    product_ids = {}
+    for chunk in _chunks(names):
+        product_ids.update(db.query(Product.name, Product.id).filter(Product.name.in_(chunk)).all())
+    
+    missing = [name for name in names if name not in product_ids]
+    if missing:
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            dialect_insert = None
+        
+        if dialect_insert is not None:
+            # Products created concurrently by other requests are skipped, then re-read below
+            statement = dialect_insert(Product.__table__).on_conflict_do_nothing(index_elements=["name"])
+        else:
+            statement = Product.__table__.insert()
+        db.execute(statement, [{"name": name} for name in missing])
+        
+        for chunk in _chunks(missing):
+            product_ids.update(db.query(Product.name, Product.id).filter(Product.name.in_(chunk)).all())
+        logger.info(f"Created {len(missing)} products for batch")
+    
+    return product_ids
+
+
+def _get_or_create_product(db: Session, name: str) -> Product:
+    """Find a product by name, creating it if needed (safe against concurrent creation)"""
+    product = db.query(Product).filter(Product.name == name).first()
+    if product:
+        return product
+    
+    try:
+        product = Product(name=name)
+        db.add(product)
+        db.commit()
+        db.refresh(product)
+        logger.info(f"Created new product: {name}")
+        return product
+    except IntegrityError:
+        # Another request created it first
+        db.rollback()
+        return db.query(Product).filter(Product.name == name).one()
+
+
+def _find_reusable_analyses(db: Session, product_ids: List[int]) -> dict:
+    """
+    The analyses new requests for these products can attach to
+    
+    Per product: the latest pending/in-progress analysis created within
+    ANALYSIS_ACTIVE_TIMEOUT (older ones are presumed abandoned), else the
+    latest one completed within ANALYSIS_FRESHNESS_SECONDS.
+    
+    Returns:
+        {product_id: Analysis} for the products that have one
+    """
+    now = datetime.now(timezone.utc)
+    reusable = {}
+    
+    for chunk in _chunks(product_ids):
+        active = (
+            db.query(Analysis)
+            .filter(
+                Analysis.product_id.in_(chunk),
+                Analysis.status.in_([AnalysisStatus.PENDING, AnalysisStatus.IN_PROGRESS]),
+                Analysis.created_at >= now - timedelta(seconds=settings.ANALYSIS_ACTIVE_TIMEOUT)
+            )
+            .order_by(Analysis.created_at)
+            .all()
+        )
+        # Ascending order: the latest analysis per product wins
+        for analysis in active:
+            reusable[analysis.product_id] = analysis
+        
+        remaining = [product_id for product_id in chunk if product_id not in reusable]
+        if not remaining or settings.ANALYSIS_FRESHNESS_SECONDS <= 0:
+            continue
+        
+        fresh = (
+            db.query(Analysis)
+            .join(Product, Product.latest_completed_analysis_id == Analysis.id)
+            .filter(
+                Product.id.in_(remaining),
+                Product.latest_completed_at >= now - timedelta(seconds=settings.ANALYSIS_FRESHNESS_SECONDS)
+            )
+            .all()
+        )
+        for analysis in fresh:
+            reusable[analysis.product_id] = analysis
+    
+    return reusable
+
+
+def _chunks(items: list, size: int = 1000):
+    """Split a list for IN (...) clauses, keeping well under bind-parameter limits"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
 @router.get("/status/{analysis_id}", response_model=AnalysisResponse)
-def get_analysis_status(analysis_id: int, db: Session = Depends(get_db)):
-    """Get the status of an analysis job"""
+def get_analysis_status(
+    analysis_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the status of an analysis job
     
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    Supports conditional GET: the ETag only changes with the analysis's
+    status or completion, so polling clients get a 304 from a narrow
+    status lookup until the job moves on.
+    """
+    state = (
+        db.query(Analysis.status, Analysis.completed_at)
+        .filter(Analysis.id == analysis_id)
+        .first()
+    )
     
-    if not analysis:
+    if not state:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
+    etag = _etag("analysis", analysis_id, state.status.value, state.completed_at)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    response.headers.update(_cache_headers(etag))
     return analysis
 
 
+@router.get("/stream/{analysis_id}")
+async def stream_analysis_progress(analysis_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Stream an analysis's progress as Server-Sent Events
+    
+    Each event is ``event: progress`` with JSON data
+    {analysis_id, status, step, progress, ...}. The stream starts with the
+    current state and ends after the completed/failed event. Events are
+    relayed from the workers via Redis pub/sub (in-process in DEMO_MODE),
+    so following a job costs no database polling.
+    """
+    state = (
+        db.query(Analysis.status, Analysis.total_comments, Analysis.error_message)
+        .filter(Analysis.id == analysis_id)
+        .first()
+    )
+    
+    if not state:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    async def events():
+        if state.status.value in TERMINAL_STATUSES:
+            yield _sse({
+                "analysis_id": analysis_id,
+                "status": state.status.value,
+                "step": "done",
+                "progress": 100 if state.status == AnalysisStatus.COMPLETED else None,
+                "comments": state.total_comments,
+                "error": state.error_message,
+            })
+            return
+        
+        yield _sse({"analysis_id": analysis_id, "status": state.status.value, "step": None, "progress": None})
+        async for event in subscribe_progress(analysis_id):
+            if await request.is_disconnected():
+                return
+            # None is a heartbeat: a comment line keeps proxies from timing out
+            yield ": keep-alive\n\n" if event is None else _sse(event)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse(event: dict) -> str:
+    return f"event: progress\ndata: {json.dumps(event, default=str)}\n\n"
+
+
 @router.get("/dashboard/{product_name}", response_model=DashboardData)
-def get_dashboard_data(product_name: str, db: Session = Depends(get_db)):
+def get_dashboard_data(product_name: str, request: Request, db: Session = Depends(get_db)):
     """
     Get comprehensive dashboard data for a product
     
-    Returns latest analysis results, comments, topics, and metrics
+    Returns latest analysis results, comments, topics, and metrics.
+    Served from the dashboard cache, which analysis completion invalidates;
+    the cached JSON is returned as-is, without re-validating the model.
+    Supports conditional GET keyed on the latest completed analysis. The
+    ETag is also the cache entry's version and the body is built from the
+    analysis it was derived from, so a request racing a completion (pointer
+    committed, cache not yet invalidated) never pairs a new ETag with the
+    previous body.
+    """
+    latest = (
+        db.query(Product.latest_completed_analysis_id, Product.latest_completed_at)
+        .filter(Product.name == product_name)
+        .first()
+    )
+    
+    etag = None
+    analysis_id = latest.latest_completed_analysis_id if latest else None
+    if analysis_id:
+        # The day is part of the tag because the topic trends window moves daily
+        etag = _etag("dashboard", product_name, analysis_id, latest.latest_completed_at,
+                     datetime.utcnow().date())
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+    
+    body = get_dashboard_cache().get_or_build(
+        product_name,
+        lambda: _build_dashboard(product_name, db, analysis_id).model_dump_json().encode("utf-8"),
+        version=etag
+    )
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=_cache_headers(etag) if etag else None
+    )
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """Dashboard cache hit/miss counters"""
+    return {"dashboard": get_dashboard_cache().stats()}
+
+
+def _etag(*parts) -> str:
+    """Strong ETag derived from the values that determine a response"""
+    digest = hashlib.sha256("\x00".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match covers the current ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _cache_headers(etag: str) -> dict:
+    # no-cache: clients may store the response but must revalidate it each time
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=_cache_headers(etag))
+
+
+def _build_dashboard(product_name: str, db: Session, analysis_id: Optional[int]) -> DashboardData:
+    """
+    Run the dashboard queries for a product (raises 404 if it does not exist)
+    
+    Args:
+        analysis_id: Latest completed analysis as read for the ETag; used
+            instead of re-reading the pointer, which may have moved since
     """
     # Find product
     product = db.query(Product).filter(Product.name == product_name).first()
@@ -121,15 +502,7 @@ def get_dashboard_data(product_name: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Get latest completed analysis
-    latest_analysis = (
-        db.query(Analysis)
-        .filter(
-            Analysis.product_id == product.id,
-            Analysis.status == AnalysisStatus.COMPLETED
-        )
-        .order_by(Analysis.completed_at.desc())
-        .first()
-    )
+    latest_analysis = db.get(Analysis, analysis_id) if analysis_id else None
     
     if not latest_analysis:
         return DashboardData(
@@ -137,27 +510,17 @@ def get_dashboard_data(product_name: str, db: Session = Depends(get_db)):
             latest_analysis=None,
             recent_comments=[],
             topics=[],
+            topic_trends=[],
             sentiment_distribution={},
             sentiment_timeline=[],
             risk_level=None
         )
     
     # Get recent comments
-    recent_comments = (
-        db.query(CustomerComment)
-        .filter(CustomerComment.analysis_id == latest_analysis.id)
-        .order_by(CustomerComment.scraped_at.desc())
-        .limit(20)
-        .all()
-    )
+    recent_comments = _recent_comments_query(db, latest_analysis.id).all()
     
     # Get topics
-    topics = (
-        db.query(Topic)
-        .filter(Topic.analysis_id == latest_analysis.id)
-        .order_by(Topic.mention_count.desc())
-        .all()
-    )
+    topics = _topics_query(db, latest_analysis.id).all()
     
     # Calculate sentiment distribution
     total = latest_analysis.total_comments
@@ -181,7 +544,51 @@ def get_dashboard_data(product_name: str, db: Session = Depends(get_db)):
         latest_analysis=AnalysisResponse.model_validate(latest_analysis),
         recent_comments=[CommentResponse.model_validate(c) for c in recent_comments],
         topics=[TopicResponse.model_validate(t) for t in topics],
+        topic_trends=[
+            TopicAggregateResponse(**t)
+            for t in top_topics(db, product.id, days=settings.TOPIC_TRENDS_DAYS)
+        ],
         sentiment_distribution=sentiment_dist,
         sentiment_timeline=[],  # Can be enhanced with time-series data
         risk_level=risk_level
     )
+
+
+def _recent_comments_query(db: Session, analysis_id: int):
+    """An analysis's 20 newest comments, inherited ones included (plan checked in tests/test_query_plans.py)"""
+    return (
+        db.query(CustomerComment)
+        .filter(comment_scope(db, analysis_id))
+        .order_by(CustomerComment.scraped_at.desc())
+        .limit(20)
+    )
+
+
+def _topics_query(db: Session, analysis_id: int):
+    """An analysis's topics, most mentioned first (plan checked in tests/test_query_plans.py)"""
+    return (
+        db.query(Topic)
+        .filter(Topic.analysis_id == analysis_id)
+        .order_by(Topic.mention_count.desc())
+    )
+
+
+@router.get("/topics/{product_name}", response_model=List[TopicAggregateResponse])
+def get_topic_trends(
+    product_name: str,
+    days: int = Query(30, ge=1, le=365),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a product's top topics over the last `days` days
+    
+    Reads the rolling per-day topic aggregates, so the cost depends on the
+    number of topics and days, not on the number of comments.
+    """
+    product = db.query(Product).filter(Product.name == product_name).first()
+    
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    return [TopicAggregateResponse(**t) for t in top_topics(db, product.id, days=days, limit=limit)]
@@ -5,7 +5,6 @@ Send alerts when sentiment spikes are detected
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from typing import List
 from datetime import datetime, timedelta
 import smtplib
@@ -64,17 +63,23 @@ def check_sentiment_spike(product_id: int, db: Session) -> dict:
     
     Returns alert info if spike detected, None otherwise
     """
-    # Get last 2 analyses
-    analyses = db.query(Analysis).filter(
-        Analysis.product_id == product_id,
-        Analysis.status == "completed"
-    ).order_by(desc(Analysis.completed_at)).limit(2).all()
+    # Get last 2 analyses (the product keeps pointers to both)
+    pointers = db.query(
+        Product.latest_completed_analysis_id,
+        Product.previous_completed_analysis_id
+    ).filter(Product.id == product_id).first()
     
-    if len(analyses) < 2:
+    if not pointers or not pointers.latest_completed_analysis_id or not pointers.previous_completed_analysis_id:
         return None
     
-    current = analyses[0]
-    previous = analyses[1]
+    analyses = {
+        analysis.id: analysis
+        for analysis in db.query(Analysis).filter(Analysis.id.in_(list(pointers))).all()
+    }
+    current = analyses.get(pointers.latest_completed_analysis_id)
+    previous = analyses.get(pointers.previous_completed_analysis_id)
+    if current is None or previous is None:
+        return None
     
     # Calculate sentiment change
     current_negative_ratio = current.negative_count / max(current.total_comments, 1)
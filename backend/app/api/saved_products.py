@@ -3,15 +3,16 @@ Saved Products API
 Allow users to track and manage their favorite products
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func
 from typing import List
 from datetime import datetime
 import logging
 
 from app.core.database import get_db
-from app.models.database_models import User, Product, SavedProduct, Analysis
+from app.core.product_summary import sentiment_label
+from app.models.database_models import User, Product, SavedProduct
 from app.models.schemas import SavedProductCreate, SavedProductResponse
 from app.api.auth import get_current_user
 
@@ -66,60 +67,48 @@ def save_product(
         db.commit()
         db.refresh(saved_product)
     
-    # Get latest analysis info
-    latest_analysis = db.query(Analysis).filter(
-        Analysis.product_id == product.id,
-        Analysis.status == "completed"
-    ).order_by(desc(Analysis.completed_at)).first()
-    
     logger.info(f"User {current_user.email} saved product: {product.name}")
     
-    return {
-        "id": saved_product.id,
-        "product_name": product.name,
-        "nickname": saved_product.nickname,
-        "notes": saved_product.notes,
-        "created_at": saved_product.created_at,
-        "last_analysis": latest_analysis.completed_at if latest_analysis else None,
-        "latest_sentiment": _get_sentiment_label(latest_analysis) if latest_analysis else None
-    }
+    return _saved_product_response(saved_product, product)
 
 
 @router.get("/", response_model=List[SavedProductResponse])
 def get_saved_products(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get all products saved by the current user
+    Get products saved by the current user, newest first
     
-    Returns list with latest analysis info
+    Returns a page of the list with latest analysis info; the total number
+    of saved products is in the X-Total-Count header.
+    
+    A single query regardless of page size: the latest analysis summary
+    lives on the product row, and the total is a window count.
     """
-    saved_products = db.query(SavedProduct).filter(
+    rows = db.query(
+        SavedProduct,
+        Product,
+        func.count().over().label("total")
+    ).join(
+        Product, Product.id == SavedProduct.product_id
+    ).filter(
         SavedProduct.user_id == current_user.id
-    ).order_by(desc(SavedProduct.created_at)).all()
+    ).order_by(
+        desc(SavedProduct.created_at), desc(SavedProduct.id)
+    ).limit(limit).offset(offset).all()
     
-    result = []
-    for sp in saved_products:
-        product = db.query(Product).filter(Product.id == sp.product_id).first()
-        
-        # Get latest analysis
-        latest_analysis = db.query(Analysis).filter(
-            Analysis.product_id == product.id,
-            Analysis.status == "completed"
-        ).order_by(desc(Analysis.completed_at)).first()
-        
-        result.append({
-            "id": sp.id,
-            "product_name": product.name,
-            "nickname": sp.nickname,
-            "notes": sp.notes,
-            "created_at": sp.created_at,
-            "last_analysis": latest_analysis.completed_at if latest_analysis else None,
-            "latest_sentiment": _get_sentiment_label(latest_analysis) if latest_analysis else None
-        })
+    if rows:
+        total = rows[0].total
+    else:
+        # Past the last page (or nothing saved): count separately
+        total = db.query(func.count(SavedProduct.id)).filter(SavedProduct.user_id == current_user.id).scalar()
+    response.headers["X-Total-Count"] = str(total)
     
-    return result
+    return [_saved_product_response(sp, product) for sp, product, _ in rows]
 
 
 @router.delete("/{saved_product_id}")
@@ -148,17 +137,19 @@ def remove_saved_product(
     return {"message": f"Removed {product.name} from saved products"}
 
 
-def _get_sentiment_label(analysis: Analysis) -> str:
-    """Helper to get sentiment label from analysis"""
-    if not analysis or analysis.total_comments == 0:
-        return "unknown"
-    
-    pos_ratio = analysis.positive_count / analysis.total_comments
-    neg_ratio = analysis.negative_count / analysis.total_comments
-    
-    if pos_ratio > 0.6:
-        return "positive"
-    elif neg_ratio > 0.4:
-        return "negative"
-    else:
-        return "mixed"
+def _saved_product_response(saved_product: SavedProduct, product: Product) -> dict:
+    """Response for a saved product, with its latest analysis summary"""
+    has_analysis = product.latest_completed_analysis_id is not None
+    return {
+        "id": saved_product.id,
+        "product_name": product.name,
+        "nickname": saved_product.nickname,
+        "notes": saved_product.notes,
+        "created_at": saved_product.created_at,
+        "last_analysis": product.latest_completed_at if has_analysis else None,
+        "latest_sentiment": sentiment_label(
+            product.latest_total_comments,
+            product.latest_positive_count,
+            product.latest_negative_count
+        ) if has_analysis else None
+    }
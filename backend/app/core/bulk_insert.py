@@ -0,0 +1,86 @@
+"""
+Bulk row insertion
+
+Writes large numbers of rows without the ORM's per-object identity-map and
+unit-of-work overhead. PostgreSQL (psycopg2) uses COPY FROM STDIN; other
+databases use a chunked Core INSERT executemany. Rows are written on the
+session's connection, so they commit or roll back with the session.
+"""
+
+from datetime import date, datetime
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+import enum
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def bulk_insert(db: Session, table: Table, rows: List[Dict[str, Any]], chunk_size: int = 5000) -> int:
+    """
+    Insert rows into a table in chunks
+
+    Args:
+        db: Session whose transaction the rows join (the caller commits)
+        table: Core table, e.g. ``CustomerComment.__table__``
+        rows: Column name -> value dicts; every row must have the same keys.
+            Omitted columns get their server defaults.
+        chunk_size: Rows per COPY / executemany round trip
+
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+
+    connection = db.connection()
+    dialect = connection.dialect
+    use_copy = dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        if use_copy:
+            _copy_rows(connection, table, chunk)
+        else:
+            connection.execute(table.insert(), chunk)
+
+    return len(rows)
+
+
+def _copy_rows(connection, table: Table, rows: List[Dict[str, Any]]):
+    """Stream rows through PostgreSQL COPY ... FROM STDIN (text format)"""
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(table.c[name], row[name]) for name in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    column_list = ", ".join(f'"{name}"' for name in columns)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY "{table.name}" ({column_list}) FROM STDIN', buffer)
+    finally:
+        cursor.close()
+
+
+def _copy_value(column, value: Any) -> str:
+    """Encode one value for COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy Enum columns store member names, not values
+        value = value.name if getattr(column.type, "enum_class", None) is not None else value.value
+    elif isinstance(value, bool):
+        return "t" if value else "f"
+    elif isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
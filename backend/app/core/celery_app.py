@@ -2,8 +2,11 @@
 Celery configuration for background task processing
 """
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_ready
 import os
 
+from app.core import event_loop, worker_bootstrap
+
 # Get Redis URL from environment or use default
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
@@ -12,7 +15,7 @@ celery_app = Celery(
     "customer_insight_platform",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=['app.tasks.analysis_tasks']
+    include=['app.tasks.analysis_tasks', 'app.tasks.batches']
 )
 
 # Celery configuration
@@ -28,3 +31,11 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=50,
 )
+
+# Load models in the parent before the prefork pool forks (shared copy-on-write)
+worker_init.connect(worker_bootstrap.preload_models)
+worker_process_init.connect(worker_bootstrap.log_child_memory)
+worker_ready.connect(worker_bootstrap.log_pool_memory)
+
+# Close the pooled scraper session and stop the persistent event loop
+worker_process_shutdown.connect(event_loop.shutdown)
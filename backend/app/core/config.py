@@ -42,12 +42,74 @@ class Settings(BaseSettings):
     
     # ML Models
     SENTIMENT_MODEL_PATH: str = "../trained_models/sentiment_model"
+    SENTIMENT_BACKEND: str = "pytorch"  # pytorch | pytorch-int8 | onnx
+    SENTIMENT_ONNX_PATH: str = "../trained_models/sentiment_onnx"
     CHURN_MODEL_PATH: str = "../trained_models/churn_model.pkl"
+    SENTIMENT_TOKEN_BUDGET: int = 8192  # Max padded tokens per inference batch
+    SENTIMENT_MAX_BATCH_SIZE: int = 64
+    SENTIMENT_LONG_TEXT_MODE: str = "truncate"  # truncate | window (score overlapping token windows)
+    SENTIMENT_WINDOW_STRIDE: int = 128  # Tokens shared by consecutive windows
+    SENTIMENT_MAX_WINDOWS: int = 4  # Max windows scored per text
+    SENTIMENT_CACHE_SIZE: int = 50000  # In-process LRU entries (0 disables the cache)
+    SENTIMENT_CACHE_REDIS: bool = True  # Share cached results across workers via REDIS_URL
+    SENTIMENT_CACHE_TTL: int = 604800  # Redis entry expiry in seconds (7 days)
+    SENTIMENT_SERVER_SOCKET: str = ""  # Unix socket of the shared inference server (empty = in-process model)
+    SENTIMENT_SERVER_MAX_BATCH: int = 256  # Max texts merged into one micro-batch
+    SENTIMENT_SERVER_MAX_WAIT_MS: int = 10  # Max time a request waits for its micro-batch to fill
+    SENTIMENT_SERVER_REQUEST_TEXTS: int = 128  # Texts per worker request; below MAX_BATCH so workers share micro-batches
+    SENTIMENT_SERVER_TIMEOUT: int = 60  # Seconds per request (at most SENTIMENT_SERVER_REQUEST_TEXTS texts each)
+    TOPIC_TAXONOMY_PATH: str = ""  # JSON {topic: [keywords]}; empty uses the built-in taxonomy
+    TOPIC_MODEL_METHOD: str = "nmf"  # nmf (TF-IDF + NMF) | keywords (taxonomy matching only)
+    TOPIC_MODEL_TOPICS: int = 8
+    TOPIC_MODEL_MAX_FEATURES: int = 5000  # Vocabulary size cap per product
+    TOPIC_MODEL_MIN_COMMENTS: int = 50  # Smaller analyses use keyword topics
+    TOPIC_MODEL_DIR: str = "../trained_models/topic_models"  # Per-product vocabularies (empty = memory only)
+    TOPIC_TRENDS_DAYS: int = 30  # Window of the dashboard's rolling topic list
+    WORKER_PRELOAD_MODELS: bool = True  # Load models in the Celery parent before forking children
+    
+    # Analysis request coalescing
+    ANALYSIS_FRESHNESS_SECONDS: int = 300  # Reuse an analysis completed this recently (0 = never)
+    ANALYSIS_ACTIVE_TIMEOUT: int = 1800  # Pending/running analyses older than this are not joined
+    BATCH_MAX_PRODUCTS: int = 5000  # Max products per /analyze-batch request
+    
+    # Dashboard cache (invalidated when an analysis completes)
+    DASHBOARD_CACHE_SIZE: int = 1000  # In-process LRU entries
+    DASHBOARD_CACHE_TTL: int = 300  # Seconds; bounds staleness if an invalidation is missed
+    DASHBOARD_CACHE_REDIS: bool = True  # Share entries and invalidations across processes via REDIS_URL
     
     # Scraping
     MAX_SCRAPE_RESULTS: int = 50
     SCRAPE_TIMEOUT: int = 30
     USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    SCRAPE_CONNECTION_LIMIT: int = 100  # Max open connections in the pooled session
+    SCRAPE_LIMIT_PER_HOST: int = 8  # Max concurrent connections per host
+    SCRAPE_KEEPALIVE_TIMEOUT: int = 30  # Seconds idle connections stay open for reuse
+    SCRAPE_DNS_CACHE_TTL: int = 300  # Seconds resolved hosts are cached
+    SCRAPE_RATE_PER_HOST: float = 2.0  # Sustained requests/second to one host
+    SCRAPE_BURST_PER_HOST: int = 5  # Requests to a host allowed back to back
+    SCRAPE_RATE_LIMIT_REDIS: bool = True  # Share host rate limits across workers via REDIS_URL
+    SCRAPE_MAX_CONCURRENCY: int = 16  # In-flight requests per process
+    SCRAPE_MAX_RETRIES: int = 3  # Retries of 429/5xx/connection failures
+    SCRAPE_BACKOFF_BASE: float = 0.5  # First retry's max delay (doubles per attempt, full jitter)
+    SCRAPE_BACKOFF_MAX: float = 30.0
+    SCRAPE_BREAKER_THRESHOLD: int = 5  # Consecutive failed attempts that open a source's breaker
+    SCRAPE_BREAKER_RESET: int = 60  # Seconds before an open breaker lets a trial request through
+    SCRAPE_INCREMENTAL: bool = True  # Re-analyses reuse the previous comments and scrape only newer ones
+    SCRAPE_CARRY_FORWARD_DAYS: int = 90  # Age limit of comments inherited from the previous analyses (0 = all)
+    SCRAPE_HTTP_CACHE_DIR: str = "../.cache/http"  # Conditional-request (ETag/Last-Modified) cache (empty = off)
+    SCRAPE_HTTP_CACHE_MAX_ENTRIES: int = 10000
+    SCRAPE_LIVE_SOURCES: bool = False  # Fetch sources with a live implementation (Reddit) over HTTP instead of simulating them
+    
+    # Analysis pipeline (scrape -> score -> persist run as overlapped stages)
+    PIPELINE_CHUNK_SIZE: int = 64  # Comments per chunk flowing between stages
+    PIPELINE_QUEUE_SIZE: int = 4  # Chunks buffered between stages before backpressure
+    ANALYSIS_FANOUT: bool = False  # Scrape and score each source in its own Celery subtask (chord)
+    
+    # Near-duplicate comments (retweets, templated reviews, spam) are scored once
+    DEDUP_ENABLED: bool = True
+    DEDUP_MAX_DISTANCE: int = 6  # Max differing SimHash bits (of 64) for a near duplicate
+    DEDUP_DUPLICATE_WEIGHT: float = 0.1  # Weight of repeats in average sentiment and negative ratio
+    DEDUP_INDEX_SIZE: int = 50000  # Scored representatives kept per product for later analyses
     
     class Config:
         env_file = ".env"
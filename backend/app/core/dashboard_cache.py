@@ -0,0 +1,291 @@
+"""
+Dashboard Response Cache
+
+Caches each product's serialized dashboard JSON, which only changes when an
+analysis of the product completes. A bounded in-process TTL/LRU sits in front
+of an optional Redis tier shared by the API processes.
+
+Invalidation is generational: every product has a generation counter (in
+Redis when available), entries are stored under the generation they were
+built from, and invalidate() bumps the counter. A Celery worker can
+therefore invalidate entries held in the API processes' memory, and a slow
+rebuild that started before an invalidation can never publish stale data
+under the new generation.
+
+Entries can also carry a version (the dashboard passes its ETag), so a
+body is only ever served under the state it was built from: data that
+changes in the database before the matching invalidation is seen as a
+different version, not paired with the previous body.
+
+Cold entries are rebuilt by a single caller: concurrent requests for the same
+entry wait for it (a lock per key in-process, a SET NX lock across processes
+via Redis) instead of all running the dashboard queries at once.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardCache:
+    """Two-tier (TTL/LRU + optional Redis) cache for serialized dashboards"""
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl: int = 300,
+        redis_url: str = None,
+        lock_timeout: float = 10.0
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Max entries held in the in-process LRU
+            ttl: Entry lifetime in seconds (bounds staleness if an
+                invalidation is ever missed)
+            redis_url: Redis URL for the shared tier (None disables it)
+            lock_timeout: Max seconds a rebuild may hold the rebuild lock
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._lru = OrderedDict()  # (product, generation, version) -> (expires_at, body)
+        self._lock = threading.Lock()
+        self._build_locks: Dict[tuple, threading.Lock] = {}
+        self._generations: Dict[str, int] = {}  # Used without Redis
+        self._redis = None
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.coalesced = 0  # Misses served by another caller's rebuild
+        self.invalidations = 0
+
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=1)
+                self._redis.ping()
+                logger.info("Dashboard cache Redis tier enabled")
+            except Exception as e:
+                logger.warning(f"Dashboard cache Redis tier unavailable: {e}. Using in-process cache only.")
+                self._redis = None
+
+    def get_or_build(self, product: str, build: Callable[[], bytes], version: str = None) -> bytes:
+        """
+        Return the cached dashboard body for a product, building it on a miss
+
+        Args:
+            product: Product name the dashboard is for
+            build: Produces the serialized dashboard; exceptions propagate
+                and nothing is cached
+            version: Identifies the data the body must be built from (build
+                has to use the same state); bodies of other versions are
+                never returned
+
+        Returns:
+            Serialized dashboard JSON
+        """
+        generation = self._generation(product)
+        key = (product, generation, version or "")
+
+        body = self._get(key)
+        if body is not None:
+            return body
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        if not build_lock.acquire(blocking=False):
+            # Another thread in this process is rebuilding: wait for it
+            with build_lock:
+                pass
+            body = self._get(key, count=False)
+            if body is not None:
+                self.coalesced += 1
+                self.hits += 1
+                return body
+            build_lock.acquire()
+
+        try:
+            body = self._get(key, count=False)
+            if body is not None:
+                self.hits += 1
+                return body
+
+            redis_locked = self._acquire_redis_lock(key)
+            if redis_locked is False:
+                # Another process is rebuilding: poll the shared tier for its result
+                body = self._wait_for_redis(key)
+                if body is not None:
+                    self.coalesced += 1
+                    self.hits += 1
+                    self.redis_hits += 1
+                    return body
+
+            self.misses += 1
+            try:
+                body = build()
+                self._set(key, body)
+            finally:
+                if redis_locked:
+                    self._release_redis_lock(key)
+            return body
+        finally:
+            build_lock.release()
+            with self._lock:
+                if self._build_locks.get(key) is build_lock and not build_lock.locked():
+                    del self._build_locks[key]
+
+    def invalidate(self, product: str):
+        """Drop a product's cached dashboard (call when its data changes)"""
+        self.invalidations += 1
+        with self._lock:
+            self._generations[product] = self._generations.get(product, 0) + 1
+            for key in [key for key in self._lru if key[0] == product]:
+                del self._lru[key]
+
+        if self._redis is not None:
+            try:
+                self._redis.incr(self._generation_key(product))
+            except Exception as e:
+                logger.warning(f"Dashboard cache Redis invalidation failed for {product!r}: {e}")
+
+    def stats(self) -> Dict[str, any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._lru),
+            "redis_enabled": self._redis is not None
+        }
+
+    def clear(self):
+        """Drop the in-process tier and reset counters (Redis entries expire on their own)"""
+        with self._lock:
+            self._lru.clear()
+        self.hits = self.redis_hits = self.misses = self.coalesced = self.invalidations = 0
+
+    def _generation(self, product: str) -> int:
+        if self._redis is not None:
+            try:
+                value = self._redis.get(self._generation_key(product))
+                return int(value) if value is not None else 0
+            except Exception as e:
+                logger.warning(f"Dashboard cache Redis generation lookup failed: {e}")
+        with self._lock:
+            return self._generations.get(product, 0)
+
+    def _get(self, key: tuple, count: bool = True) -> Optional[bytes]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._lru.move_to_end(key)
+                    if count:
+                        self.hits += 1
+                    return entry[1]
+                del self._lru[key]
+
+        if self._redis is not None:
+            try:
+                body = self._redis.get(self._data_key(key))
+            except Exception as e:
+                logger.warning(f"Dashboard cache Redis lookup failed: {e}")
+                body = None
+            if body is not None:
+                self._remember(key, body)
+                if count:
+                    self.hits += 1
+                    self.redis_hits += 1
+                return body
+        return None
+
+    def _set(self, key: tuple, body: bytes):
+        self._remember(key, body)
+        if self._redis is not None:
+            try:
+                self._redis.set(self._data_key(key), body, ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Dashboard cache Redis write failed: {e}")
+
+    def _remember(self, key: tuple, body: bytes):
+        """Insert into the LRU tier, evicting the oldest entries when full"""
+        with self._lock:
+            self._lru[key] = (time.monotonic() + self.ttl, body)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    def _acquire_redis_lock(self, key: tuple) -> Optional[bool]:
+        """True if acquired, False if held elsewhere, None without Redis"""
+        if self._redis is None:
+            return None
+        try:
+            return bool(self._redis.set(self._lock_key(key), b"1", nx=True, px=int(self.lock_timeout * 1000)))
+        except Exception as e:
+            logger.warning(f"Dashboard cache Redis lock failed: {e}")
+            return None
+
+    def _release_redis_lock(self, key: tuple):
+        try:
+            self._redis.delete(self._lock_key(key))
+        except Exception as e:
+            logger.warning(f"Dashboard cache Redis unlock failed: {e}")
+
+    def _wait_for_redis(self, key: tuple) -> Optional[bytes]:
+        """Poll for another process's rebuild; None if it did not finish in time"""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            try:
+                body = self._redis.get(self._data_key(key))
+                if body is not None:
+                    self._remember(key, body)
+                    return body
+                if not self._redis.exists(self._lock_key(key)):
+                    return None
+            except Exception as e:
+                logger.warning(f"Dashboard cache Redis wait failed: {e}")
+                return None
+        return None
+
+    @staticmethod
+    def _generation_key(product: str) -> str:
+        return f"dashboard:generation:{product}"
+
+    @staticmethod
+    def _data_key(key: tuple) -> str:
+        return f"dashboard:data:{key[1]}:{key[2]}:{key[0]}"
+
+    @staticmethod
+    def _lock_key(key: tuple) -> str:
+        return f"dashboard:lock:{key[1]}:{key[2]}:{key[0]}"
+
+
+# Global instance (lazy loading)
+_dashboard_cache = None
+
+
+def get_dashboard_cache() -> DashboardCache:
+    """Get or create the global dashboard cache"""
+    global _dashboard_cache
+    if _dashboard_cache is None:
+        from app.core.config import settings
+
+        _dashboard_cache = DashboardCache(
+            max_size=settings.DASHBOARD_CACHE_SIZE,
+            ttl=settings.DASHBOARD_CACHE_TTL,
+            redis_url=settings.REDIS_URL if settings.DASHBOARD_CACHE_REDIS else None
+        )
+    return _dashboard_cache
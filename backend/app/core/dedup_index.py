@@ -0,0 +1,97 @@
+"""
+Persistent per-product duplicate index
+
+Representatives scored by one analysis are stored (reuse_key hashes plus
+sentiment) so the next analysis of the same product can match exact
+repeats against them instead of rescoring. Entries are keyed by sentiment model:
+switching models or backends starts a fresh index.
+"""
+
+from sqlalchemy.orm import Session
+import logging
+
+from app.ml.dedup import DuplicateIndex
+from app.models.database_models import CommentFingerprint, SentimentType
+
+logger = logging.getLogger(__name__)
+
+def load_duplicate_index(db: Session, product_id: int, model: str, max_distance: int = 6,
+                         max_entries: int = 50000) -> DuplicateIndex:
+    """
+    Index seeded with the product's newest stored representatives
+
+    Rows are added oldest first, so where the same text was stored more than
+    once (by concurrent analyses) the newest result wins.
+    """
+    index = DuplicateIndex(max_distance)
+    rows = (
+        db.query(
+            CommentFingerprint.exact_hash,
+            CommentFingerprint.sentiment,
+            CommentFingerprint.sentiment_score,
+            CommentFingerprint.confidence
+        )
+        .filter(CommentFingerprint.product_id == product_id, CommentFingerprint.model == model)
+        .order_by(CommentFingerprint.id.desc())
+        .limit(max_entries)
+        .all()
+    )
+    for row in reversed(rows):
+        index.add(row.exact_hash, None, {
+            "sentiment": row.sentiment.value,
+            "score": row.sentiment_score,
+            "confidence": row.confidence,
+        }, new=False)
+    return index
+
+
+def save_duplicate_index(db: Session, product_id: int, model: str, index: DuplicateIndex,
+                         max_entries: int = 50000) -> int:
+    """
+    Store the representatives added since loading and prune the oldest
+
+    Joins the caller's transaction; the caller commits.
+
+    Returns:
+        Number of representatives stored
+    """
+    mappings = []
+    for key, fingerprint, entry in index.new_entries:
+        result = index.result(entry)
+        if result is None:
+            continue
+        mappings.append({
+            "product_id": product_id,
+            "model": model,
+            "exact_hash": key,
+            "sentiment": SentimentType(result["sentiment"]),
+            "sentiment_score": result["score"],
+            "confidence": result["confidence"],
+        })
+    if not mappings:
+        return 0
+    db.bulk_insert_mappings(CommentFingerprint, mappings)
+    index.new_entries.clear()
+
+    # Keep the newest max_entries per product and model
+    cutoff = (
+        db.query(CommentFingerprint.id)
+        .filter(CommentFingerprint.product_id == product_id, CommentFingerprint.model == model)
+        .order_by(CommentFingerprint.id.desc())
+        .offset(max_entries)
+        .limit(1)
+        .scalar()
+    )
+    if cutoff is not None:
+        pruned = (
+            db.query(CommentFingerprint)
+            .filter(
+                CommentFingerprint.product_id == product_id,
+                CommentFingerprint.model == model,
+                CommentFingerprint.id <= cutoff
+            )
+            .delete(synchronize_session=False)
+        )
+        logger.info(f"Pruned {pruned} duplicate index entries for product {product_id}")
+    return len(mappings)
+
@@ -0,0 +1,70 @@
+"""
+Persistent asyncio event loop for synchronous callers (Celery tasks)
+
+Creating and closing a loop per task also throws away everything bound to
+that loop, notably the scraper's pooled aiohttp session with its keep-alive
+connections and DNS cache. Instead each process runs one loop forever in a
+daemon thread, and run_async() submits coroutines to it from any thread.
+
+The loop is created lazily on first use, so each prefork worker child gets
+its own (loops and sockets must not cross a fork).
+"""
+
+from typing import Awaitable, Optional, TypeVar
+import asyncio
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get or start this process's persistent event loop"""
+    global _loop, _loop_pid
+    with _lock:
+        if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="event-loop", daemon=True).start()
+            logger.info(f"Started persistent event loop in process {_loop_pid}")
+        return _loop
+
+
+def run_async(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    Run a coroutine on the persistent loop and wait for its result
+
+    Must not be called from the loop's own thread. If the wait is
+    interrupted (timeout, Celery soft time limit), the coroutine is cancelled.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def shutdown(**kwargs):
+    """worker_process_shutdown handler: close pooled connections and stop the loop"""
+    global _loop
+    with _lock:
+        loop = _loop if _loop_pid == os.getpid() else None
+        _loop = None
+    if loop is None or loop.is_closed():
+        return
+
+    from app.scrapers import close_scraper
+
+    try:
+        asyncio.run_coroutine_threadsafe(close_scraper(), loop).result(5)
+    except Exception as e:
+        logger.warning(f"Failed to close scraper session: {e}")
+    loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,75 @@
+"""
+Latest-analysis summary on products
+
+Each product points at its latest (and previous) completed analysis and
+caches that analysis's headline numbers. Dashboard, saved products and
+spike alerts read the product row (or join on the pointer) instead of
+searching analyses with ORDER BY completed_at DESC LIMIT 1.
+
+The pointer moves in a single guarded UPDATE in the same transaction that
+marks the analysis completed, so readers never see a completed analysis
+the product doesn't point at, and an analysis finishing late never
+replaces a newer one.
+"""
+
+from sqlalchemy import case, or_, update
+from sqlalchemy.orm import Session
+from typing import Optional
+import logging
+
+from app.models.database_models import Analysis, Product
+
+logger = logging.getLogger(__name__)
+
+
+def record_completed_analysis(db: Session, analysis: Analysis) -> bool:
+    """
+    Make a just-completed analysis the product's latest
+
+    Call after setting the analysis's results and completed_at, before
+    committing. Joins the caller's transaction; the caller commits.
+
+    Returns:
+        False if the product already points at a newer analysis
+    """
+    product = Product.__table__.c
+    moved = db.execute(
+        update(Product.__table__)
+        .where(
+            product.id == analysis.product_id,
+            or_(product.latest_completed_at.is_(None), product.latest_completed_at <= analysis.completed_at)
+        )
+        .values(
+            # Recording the same analysis again keeps the previous pointer
+            previous_completed_analysis_id=case(
+                (product.latest_completed_analysis_id == analysis.id, product.previous_completed_analysis_id),
+                else_=product.latest_completed_analysis_id
+            ),
+            latest_completed_analysis_id=analysis.id,
+            latest_completed_at=analysis.completed_at,
+            latest_total_comments=analysis.total_comments,
+            latest_positive_count=analysis.positive_count,
+            latest_negative_count=analysis.negative_count,
+            latest_avg_sentiment=analysis.avg_sentiment_score,
+            latest_churn_risk_score=analysis.churn_risk_score
+        )
+    ).rowcount
+    if not moved:
+        logger.info(f"Product {analysis.product_id} already has a newer analysis than {analysis.id}")
+    return bool(moved)
+
+
+def sentiment_label(total: Optional[int], positive: Optional[int], negative: Optional[int]) -> str:
+    """Overall sentiment of an analysis from its counts"""
+    if not total:
+        return "unknown"
+
+    pos_ratio = (positive or 0) / total
+    neg_ratio = (negative or 0) / total
+
+    if pos_ratio > 0.6:
+        return "positive"
+    elif neg_ratio > 0.4:
+        return "negative"
+    else:
+        return "mixed"
@@ -0,0 +1,174 @@
+"""
+Analysis progress events
+
+Workers publish each analysis's progress (step, percentage, final status)
+and API processes relay them to clients over /api/analysis/stream/{id}.
+
+In full mode events travel over Redis pub/sub (channel
+``analysis:progress:{id}``), and the latest event is also kept under a key so
+clients connecting mid-job start from the current state. In DEMO_MODE the
+analysis runs inside the API process, so an in-process broadcaster does the
+same without Redis.
+"""
+
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import json
+import logging
+import threading
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which no more events follow
+TERMINAL_STATUSES = ("completed", "failed")
+
+_LAST_EVENT_TTL = 3600
+
+
+def _channel(analysis_id: int) -> str:
+    return f"analysis:progress:{analysis_id}"
+
+
+def _last_event_key(analysis_id: int) -> str:
+    return f"analysis:progress:{analysis_id}:last"
+
+
+class InProcessBroadcaster:
+    """Fan-out of progress events to asyncio subscribers in this process"""
+
+    def __init__(self, max_tracked: int = 1000):
+        self._subscribers: Dict[int, list] = {}
+        self._last: "OrderedDict[int, dict]" = OrderedDict()
+        self._max_tracked = max_tracked
+        self._lock = threading.Lock()
+
+    def publish(self, analysis_id: int, event: dict):
+        """Deliver an event to current subscribers (safe from any thread)"""
+        with self._lock:
+            self._last[analysis_id] = event
+            self._last.move_to_end(analysis_id)
+            while len(self._last) > self._max_tracked:
+                self._last.popitem(last=False)
+            subscribers = list(self._subscribers.get(analysis_id, []))
+
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def last_event(self, analysis_id: int) -> Optional[dict]:
+        with self._lock:
+            return self._last.get(analysis_id)
+
+    def subscribe(self, analysis_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(analysis_id, []).append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, analysis_id: int, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = [s for s in self._subscribers.get(analysis_id, []) if s[1] is not queue]
+            if subscribers:
+                self._subscribers[analysis_id] = subscribers
+            else:
+                self._subscribers.pop(analysis_id, None)
+
+
+_broadcaster = InProcessBroadcaster()
+_redis = None
+
+
+def _get_redis():
+    """Lazily connected Redis client for publishing (None if unavailable)"""
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=1)
+    return _redis
+
+
+def publish_progress(analysis_id: int, status: str, step: str = None, progress: int = None, **extra):
+    """
+    Publish a progress event for an analysis
+
+    Never raises: progress reporting must not fail the analysis.
+
+    Args:
+        analysis_id: Analysis the event belongs to
+        status: in_progress | completed | failed
+        step: Current pipeline step (e.g. "scraping")
+        progress: Percentage complete
+        **extra: Additional JSON-serializable fields (e.g. comments, error)
+    """
+    event = {"analysis_id": analysis_id, "status": status, "step": step, "progress": progress, **extra}
+
+    if settings.DEMO_MODE:
+        _broadcaster.publish(analysis_id, event)
+        return
+
+    try:
+        payload = json.dumps(event, default=str)
+        pipe = _get_redis().pipeline(transaction=False)
+        pipe.set(_last_event_key(analysis_id), payload, ex=_LAST_EVENT_TTL)
+        pipe.publish(_channel(analysis_id), payload)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to publish progress for analysis {analysis_id}: {e}")
+
+
+async def subscribe_progress(analysis_id: int, heartbeat: float = 15.0) -> AsyncIterator[Optional[dict]]:
+    """
+    Yield an analysis's progress events as they are published
+
+    Starts with the latest known event, if any. Yields None every `heartbeat`
+    seconds without events so callers can send keep-alives and notice
+    disconnects. Stops after a terminal (completed/failed) event.
+    """
+    if settings.DEMO_MODE:
+        queue = _broadcaster.subscribe(analysis_id)
+        try:
+            last = _broadcaster.last_event(analysis_id)
+            if last is not None:
+                yield last
+                if last["status"] in TERMINAL_STATUSES:
+                    return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event["status"] in TERMINAL_STATUSES:
+                    return
+        finally:
+            _broadcaster.unsubscribe(analysis_id, queue)
+        return
+
+    import redis.asyncio as aioredis
+
+    client = aioredis.Redis.from_url(settings.REDIS_URL)
+    pubsub = client.pubsub()
+    try:
+        # Subscribe before reading the last event, so nothing falls in between
+        await pubsub.subscribe(_channel(analysis_id))
+        last = await client.get(_last_event_key(analysis_id))
+        if last is not None:
+            event = json.loads(last)
+            yield event
+            if event["status"] in TERMINAL_STATUSES:
+                return
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat)
+            if message is None:
+                yield None
+                continue
+            event = json.loads(message["data"])
+            yield event
+            if event["status"] in TERMINAL_STATUSES:
+                return
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
@@ -0,0 +1,202 @@
+"""
+Incremental scraping state
+
+A re-analysis of a tracked product starts from its previous completed
+analysis: the new analysis references it (base_analysis_id) and inherits
+its comments, already scored, without copying them. Inheritance follows
+the chain of base analyses, limited to comments posted within
+SCRAPE_CARRY_FORWARD_DAYS; comment_scope() selects an analysis's own plus
+inherited comments. The scraper only keeps comments newer than the
+per-(product, source) cursor, so only the delta is fetched, scored and
+stored.
+
+Cursors advance when an analysis completes, in the same transaction, so a
+failed analysis never skips comments for the next one.
+"""
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, aliased
+from typing import Dict, Optional
+import logging
+
+from app.models.database_models import Analysis, AnalysisStatus, CustomerComment, Product, ScrapeCursor
+
+logger = logging.getLogger(__name__)
+
+
+def load_cursors(db: Session, product_id: int) -> Dict[str, datetime]:
+    """
+    Newest already-scraped post time per source for a product
+
+    Products analyzed before cursors existed get them derived from their
+    latest completed analysis's comments.
+
+    Returns:
+        {CustomerComment.source: posted_at (naive UTC)}
+    """
+    rows = (
+        db.query(ScrapeCursor.source, ScrapeCursor.last_posted_at)
+        .filter(ScrapeCursor.product_id == product_id, ScrapeCursor.last_posted_at.isnot(None))
+        .all()
+    )
+    if not rows:
+        previous = _latest_completed_analysis(db, product_id)
+        if previous is None:
+            return {}
+        rows = (
+            db.query(CustomerComment.source, func.max(CustomerComment.posted_at))
+            .filter(comment_scope(db, previous))
+            .group_by(CustomerComment.source)
+            .all()
+        )
+    return {source: _naive_utc(posted_at) for source, posted_at in rows if posted_at is not None}
+
+
+def carry_forward_comments(db: Session, product_id: int, analysis_id: int, max_age_days: int = 90) -> Optional[int]:
+    """
+    Base a new analysis on the product's previous completed analysis
+
+    The new analysis inherits the previous one's comments by reference
+    (see comment_scope): nothing is copied, so storage grows with the
+    comments scraped rather than with the number of analyses. The caller
+    commits.
+
+    Args:
+        max_age_days: Only inherit comments posted within this many days
+            (0 = all), so analyses don't accumulate history forever
+
+    Returns:
+        The base analysis's id (None if the product has none)
+    """
+    previous = _latest_completed_analysis(db, product_id, exclude=analysis_id)
+    if previous is None:
+        return None
+
+    since = datetime.now(timezone.utc) - timedelta(days=max_age_days) if max_age_days else None
+    db.query(Analysis).filter(Analysis.id == analysis_id).update(
+        {Analysis.base_analysis_id: previous, Analysis.inherited_since: since},
+        synchronize_session=False
+    )
+    logger.info(f"Analysis {analysis_id} inherits the comments of analysis {previous}")
+    return previous
+
+
+def comment_scope(db: Session, analysis_id: int):
+    """
+    Filter condition selecting an analysis's comments: its own plus inherited ones
+
+    Inherited comments belong to the analysis's chain of base analyses and
+    were posted (scraped, if the post time is unknown) at or after its
+    inherited_since. The walk up the chain stops at analyses completed
+    before that, since none of their own comments can qualify.
+
+    Usage:
+        db.query(CustomerComment).filter(comment_scope(db, analysis_id))
+    """
+    own = CustomerComment.analysis_id == analysis_id
+
+    # The analysis and the base analyses it inherits from, in one query. The
+    # scope is then a plain analysis_id IN (...) the planner can estimate and
+    # serve from ix_customer_comments_analysis_scraped; a subquery on the
+    # recursive CTE gets a row estimate PostgreSQL answers with a full scan.
+    chain = (
+        select(Analysis.id, Analysis.base_analysis_id, Analysis.inherited_since.label("since"))
+        .where(Analysis.id == analysis_id)
+        .cte("scope_analyses", recursive=True)
+    )
+    earlier = aliased(Analysis)
+    chain = chain.union_all(
+        select(earlier.id, earlier.base_analysis_id, chain.c.since)
+        .join(chain, earlier.id == chain.c.base_analysis_id)
+        .where(or_(chain.c.since.is_(None), earlier.completed_at >= chain.c.since))
+    )
+    rows = db.execute(select(chain.c.id, chain.c.since)).all()
+    if len(rows) <= 1:
+        return own
+    since = rows[0].since
+
+    scope = CustomerComment.analysis_id.in_([row.id for row in rows])
+    if since is not None:
+        scope = and_(scope, or_(own, func.coalesce(CustomerComment.posted_at, CustomerComment.scraped_at) >= since))
+    return scope
+
+
+def advance_cursors(db: Session, product_id: int, analysis_id: int):
+    """
+    Move the product's cursors up to the newest comment per source in an analysis
+
+    Cursor rows are locked (SELECT ... FOR UPDATE where supported) and only
+    move forward. Joins the caller's transaction; the caller commits.
+    """
+    newest = (
+        select(CustomerComment.source, func.max(CustomerComment.posted_at).label("posted_at"))
+        .where(CustomerComment.analysis_id == analysis_id)
+        .group_by(CustomerComment.source)
+        .subquery()
+    )
+    latest = {
+        row.source: row
+        for row in (
+            db.query(CustomerComment.source, CustomerComment.posted_at, CustomerComment.source_url)
+            .join(newest, and_(
+                CustomerComment.source == newest.c.source,
+                CustomerComment.posted_at == newest.c.posted_at
+            ))
+            .filter(CustomerComment.analysis_id == analysis_id)
+            .all()
+        )
+    }
+    if not latest:
+        return
+
+    existing = {
+        cursor.source: cursor
+        for cursor in (
+            db.query(ScrapeCursor)
+            .filter(ScrapeCursor.product_id == product_id, ScrapeCursor.source.in_(list(latest)))
+            .with_for_update()
+            .all()
+        )
+    }
+    for source, row in latest.items():
+        cursor = existing.get(source)
+        if cursor is None:
+            db.add(ScrapeCursor(
+                product_id=product_id,
+                source=source,
+                last_posted_at=row.posted_at,
+                last_source_url=row.source_url
+            ))
+        elif cursor.last_posted_at is None or _naive_utc(row.posted_at) > _naive_utc(cursor.last_posted_at):
+            cursor.last_posted_at = row.posted_at
+            cursor.last_source_url = row.source_url
+
+    db.flush()
+
+
+def _latest_completed_analysis(db: Session, product_id: int, exclude: Optional[int] = None) -> Optional[int]:
+    latest = db.query(Product.latest_completed_analysis_id).filter(Product.id == product_id).scalar()
+    if latest is None or latest != exclude:
+        return latest
+
+    # The excluded analysis is the latest: find the one before it
+    return _completed_analyses_query(db, product_id, exclude).limit(1).scalar()
+
+
+def _completed_analyses_query(db: Session, product_id: int, exclude: Optional[int] = None):
+    """Ids of a product's completed analyses, newest first (plan checked in tests/test_query_plans.py)"""
+    query = db.query(Analysis.id).filter(
+        Analysis.product_id == product_id,
+        Analysis.status == AnalysisStatus.COMPLETED
+    )
+    if exclude is not None:
+        query = query.filter(Analysis.id != exclude)
+    return query.order_by(Analysis.completed_at.desc(), Analysis.id.desc())
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Compare stored (possibly timezone-aware) and scraped (naive UTC) times"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
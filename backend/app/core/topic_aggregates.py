@@ -0,0 +1,211 @@
+"""
+Rolling per-product topic aggregates
+
+Each finished analysis adds its topic counts, sentiment sums and keyword
+frequencies to one ProductTopicAggregate row per topic per UTC day. Queries
+such as "top topics for a product over the last 30 days" then read
+O(topics x days) rows instead of rescanning customer_comments.
+"""
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+import logging
+
+from app.models.database_models import Analysis, AnalysisStatus, ProductTopicAggregate, Topic
+
+logger = logging.getLogger(__name__)
+
+# keyword_counts of an existing row plus the inserted row's, summed per keyword
+_MERGED_KEYWORD_COUNTS = literal_column("""(
+    SELECT json_object_agg(pairs.key, pairs.total)
+    FROM (
+        SELECT key, SUM(value::bigint) AS total
+        FROM (
+            SELECT * FROM json_each_text(COALESCE(product_topic_aggregates.keyword_counts, '{}'::json))
+            UNION ALL
+            SELECT * FROM json_each_text(COALESCE(excluded.keyword_counts, '{}'::json))
+        ) AS both_counts
+        GROUP BY key
+    ) AS pairs
+)""")
+
+
+def record_topics(db: Session, product_id: int, topics: Dict[str, dict], bucket: Optional[date] = None):
+    """
+    Add one analysis's topics to the product's aggregate for a day
+
+    On PostgreSQL this is a single INSERT ... ON CONFLICT DO UPDATE that adds
+    to the stored totals in the database, so analyses of the same product
+    finishing concurrently add up, including when both create the day's
+    row. Elsewhere existing rows are locked (SELECT ... FOR UPDATE where
+    supported) and updated in Python. Joins the caller's transaction; the
+    caller commits.
+
+    Args:
+        db: Database session
+        product_id: Product the analysis belongs to
+        topics: extract_topics() output, {name: {"count", "avg_sentiment", ...}}
+            with optional "sentiment_sum" and "keyword_counts"
+        bucket: Day to add to (default: today, UTC)
+    """
+    if not topics:
+        return
+    bucket = bucket or datetime.utcnow().date()
+
+    # Sorted by name, so concurrent upserts lock rows in the same order
+    rows = []
+    for name in sorted(topics):
+        data = topics[name]
+        count = data["count"]
+        rows.append({
+            "product_id": product_id,
+            "bucket_date": bucket,
+            "name": name,
+            "mention_count": count,
+            "sentiment_sum": data.get("sentiment_sum", data["avg_sentiment"] * count),
+            "keyword_counts": dict(data.get("keyword_counts") or {kw: count for kw in data.get("keywords", [])}),
+            "analysis_count": 1,
+        })
+
+    if db.get_bind().dialect.name == "postgresql":
+        _upsert_rows(db, rows)
+    else:
+        _add_to_locked_rows(db, product_id, bucket, rows)
+    db.flush()
+
+
+def _upsert_rows(db: Session, rows: List[dict]):
+    insert = postgresql_insert(ProductTopicAggregate.__table__).values(rows)
+    table = ProductTopicAggregate.__table__.c
+    db.execute(insert.on_conflict_do_update(
+        constraint="uq_product_topic_aggregates_bucket",
+        set_={
+            "mention_count": table.mention_count + insert.excluded.mention_count,
+            "sentiment_sum": table.sentiment_sum + insert.excluded.sentiment_sum,
+            "keyword_counts": _MERGED_KEYWORD_COUNTS,
+            "analysis_count": table.analysis_count + insert.excluded.analysis_count,
+            "updated_at": func.now(),
+        }
+    ))
+
+
+def _add_to_locked_rows(db: Session, product_id: int, bucket: date, rows: List[dict]):
+    existing = {
+        row.name: row
+        for row in (
+            db.query(ProductTopicAggregate)
+            .filter(
+                ProductTopicAggregate.product_id == product_id,
+                ProductTopicAggregate.bucket_date == bucket,
+                ProductTopicAggregate.name.in_([row["name"] for row in rows])
+            )
+            .with_for_update()
+            .all()
+        )
+    }
+
+    for values in rows:
+        row = existing.get(values["name"])
+        if row is None:
+            db.add(ProductTopicAggregate(**values))
+        else:
+            row.mention_count += values["mention_count"]
+            row.sentiment_sum += values["sentiment_sum"]
+            # Reassign rather than mutate, so the JSON column is marked dirty
+            row.keyword_counts = dict(Counter(row.keyword_counts or {}) + Counter(values["keyword_counts"]))
+            row.analysis_count += 1
+
+
+def top_topics(db: Session, product_id: int, days: int = 30, limit: int = 10) -> List[dict]:
+    """
+    Top topics for a product over the last `days` days
+
+    Returns:
+        Up to `limit` dicts with name, mention_count, avg_sentiment, keywords
+        (top 5 by frequency), analysis_count, first_seen and last_seen,
+        ordered by mention_count
+    """
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    rows = (
+        db.query(ProductTopicAggregate)
+        .filter(
+            ProductTopicAggregate.product_id == product_id,
+            ProductTopicAggregate.bucket_date >= since
+        )
+        .all()
+    )
+
+    totals = {}
+    for row in rows:
+        topic = totals.setdefault(row.name, {
+            "name": row.name,
+            "mention_count": 0,
+            "sentiment_sum": 0.0,
+            "keyword_counts": Counter(),
+            "analysis_count": 0,
+            "first_seen": row.bucket_date,
+            "last_seen": row.bucket_date,
+        })
+        topic["mention_count"] += row.mention_count
+        topic["sentiment_sum"] += row.sentiment_sum
+        topic["keyword_counts"].update(row.keyword_counts or {})
+        topic["analysis_count"] += row.analysis_count
+        topic["first_seen"] = min(topic["first_seen"], row.bucket_date)
+        topic["last_seen"] = max(topic["last_seen"], row.bucket_date)
+
+    ranked = sorted(totals.values(), key=lambda t: (-t["mention_count"], t["name"]))[:limit]
+    return [
+        {
+            "name": topic["name"],
+            "mention_count": topic["mention_count"],
+            "avg_sentiment": topic["sentiment_sum"] / topic["mention_count"] if topic["mention_count"] else None,
+            "keywords": [kw for kw, _ in topic["keyword_counts"].most_common(5)],
+            "analysis_count": topic["analysis_count"],
+            "first_seen": topic["first_seen"],
+            "last_seen": topic["last_seen"],
+        }
+        for topic in ranked
+    ]
+
+
+def backfill_topic_aggregates(db: Session, product_id: Optional[int] = None) -> int:
+    """
+    Rebuild aggregates from the per-analysis Topic rows of completed analyses
+
+    For databases that have analyses from before the aggregate table existed.
+    Replaces the affected products' aggregates; the caller commits. Topic
+    rows of incremental analyses also cover the comments they inherited,
+    so for those the backfill over-counts compared with record_topics,
+    which only adds each analysis's new comments.
+
+    Returns:
+        Number of analyses folded in
+    """
+    query = (
+        db.query(Analysis.id, Analysis.product_id, Analysis.completed_at)
+        .filter(Analysis.status == AnalysisStatus.COMPLETED, Analysis.completed_at.isnot(None))
+    )
+    delete = db.query(ProductTopicAggregate)
+    if product_id is not None:
+        query = query.filter(Analysis.product_id == product_id)
+        delete = delete.filter(ProductTopicAggregate.product_id == product_id)
+    analyses = query.all()
+    delete.delete(synchronize_session=False)
+
+    topics_by_analysis = {}
+    for topic in db.query(Topic).filter(Topic.analysis_id.in_([a.id for a in analyses])).all():
+        topics_by_analysis.setdefault(topic.analysis_id, {})[topic.name] = {
+            "count": topic.mention_count or 0,
+            "avg_sentiment": topic.avg_sentiment or 0.0,
+            "keywords": [kw.strip() for kw in (topic.keywords or "").split(",") if kw.strip()],
+        }
+
+    for analysis in analyses:
+        record_topics(db, analysis.product_id, topics_by_analysis.get(analysis.id, {}), analysis.completed_at.date())
+
+    logger.info(f"Backfilled topic aggregates from {len(analyses)} analyses")
+    return len(analyses)
@@ -0,0 +1,119 @@
+"""
+Celery worker bootstrap
+
+Loads the ML models in the worker's parent process before the prefork pool
+forks its children, so every child inherits them instead of paying a cold
+start on its first task. Children replaced after ``worker_max_tasks_per_child``
+are forked from the same parent and inherit the models again.
+
+Also includes a per-child memory report (RSS and USS) to confirm the
+copy-on-write sharing actually holds:
+    python -m app.core.worker_bootstrap <worker parent pid>
+"""
+
+from pathlib import Path
+from typing import Dict, List
+import gc
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+def preload_models(**kwargs):
+    """
+    worker_init handler: load models in the parent before the pool forks
+
+    Weights live in tensor/array buffers that children only read, so those
+    pages stay shared. gc.freeze() moves everything allocated so far into the
+    permanent generation, so the children's garbage collector never writes to
+    the object headers of the preloaded models (which would copy their pages).
+    """
+    from app.core.config import settings
+
+    if settings.DEMO_MODE or not settings.WORKER_PRELOAD_MODELS:
+        return
+
+    # Fast tokenizers must not start their thread pool before fork
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    from app.ml import get_sentiment_analyzer, get_churn_predictor
+
+    logger.info("Preloading ML models in worker parent process")
+    get_sentiment_analyzer()
+    get_churn_predictor()
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Models preloaded; parent memory: {process_memory(os.getpid())}")
+
+
+def log_child_memory(**kwargs):
+    """worker_process_init handler: record each child's starting footprint"""
+    logger.info(f"Worker child {os.getpid()} started; memory: {process_memory(os.getpid())}")
+
+
+def log_pool_memory(sender=None, **kwargs):
+    """worker_ready handler: report parent and child memory once the pool is up"""
+    for entry in memory_report(os.getpid()):
+        logger.info(f"Worker memory: {entry}")
+
+
+def process_memory(pid: int) -> Dict[str, float]:
+    """
+    Read RSS, PSS and USS (in MB) for a process from /proc (Linux only)
+
+    USS is the memory unique to the process (private clean + private dirty),
+    i.e. what would be freed if it exited. Pages shared copy-on-write with
+    the parent count towards RSS but not USS.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return {}
+
+    return {
+        "rss_mb": round(fields.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(fields.get("Pss", 0) / 1024, 1),
+        "uss_mb": round((fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024, 1),
+    }
+
+
+def _child_pids(pid: int) -> List[int]:
+    """Direct children of a process"""
+    children = []
+    for task in Path(f"/proc/{pid}/task").glob("*/children"):
+        try:
+            children.extend(int(child) for child in task.read_text().split())
+        except OSError:
+            continue
+    return children
+
+
+def memory_report(parent_pid: int) -> List[Dict[str, any]]:
+    """Memory usage of a worker parent and each of its pool children"""
+    report = [{"pid": parent_pid, "role": "parent", **process_memory(parent_pid)}]
+    for child in _child_pids(parent_pid):
+        report.append({"pid": child, "role": "child", **process_memory(child)})
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m app.core.worker_bootstrap <worker parent pid>")
+        sys.exit(1)
+
+    rows = memory_report(int(sys.argv[1]))
+    print(f"{'pid':>8} {'role':>7} {'rss_mb':>8} {'pss_mb':>8} {'uss_mb':>8}")
+    for row in rows:
+        print(f"{row['pid']:>8} {row['role']:>7} {row.get('rss_mb', 0):>8} {row.get('pss_mb', 0):>8} {row.get('uss_mb', 0):>8}")
+    children = [row for row in rows if row["role"] == "child"]
+    if children:
+        total_uss = sum(row.get("uss_mb", 0) for row in rows)
+        print(f"Total USS (parent + {len(children)} children): {total_uss:.1f} MB")
@@ -1,10 +1,19 @@
 # ML Module
-from .sentiment_analyzer import SentimentAnalyzer, get_sentiment_analyzer
+from .sentiment_analyzer import SentimentAnalyzer, build_sentiment_analyzer, get_sentiment_analyzer
+from .sentiment_cache import SentimentCache
 from .churn_predictor import ChurnPredictor, get_churn_predictor
+from .topic_matcher import TopicMatcher, get_topic_matcher
+from .topic_model import TopicModeler, get_topic_modeler
 
 __all__ = [
     "SentimentAnalyzer",
+    "build_sentiment_analyzer",
     "get_sentiment_analyzer",
+    "SentimentCache",
     "ChurnPredictor",
-    "get_churn_predictor"
+    "get_churn_predictor",
+    "TopicMatcher",
+    "get_topic_matcher",
+    "TopicModeler",
+    "get_topic_modeler"
 ]
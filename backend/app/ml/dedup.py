@@ -0,0 +1,217 @@
+"""
+Near-Duplicate Comment Detection
+
+Scraped feeds repeat themselves: retweets, quote-posts, templated reviews,
+spam bursts. Comments are matched two ways:
+
+- Exactly, by a hash of the text with whitespace runs folded (the same
+  folding as the sentiment cache key), so only texts the model would score
+  identically match
+- Nearly, by a 64-bit SimHash over word bigrams (so word order counts) of
+  the normalized text (case, URLs, @mentions, RT prefixes and punctuation
+  removed): comments whose fingerprints differ in at most `max_distance`
+  bits are duplicates. Fingerprints are split into max_distance + 1 bands,
+  so any match shares at least one band exactly and lookups only compare
+  within band buckets.
+
+Only exact duplicates share a sentiment result: one representative is
+scored and the repeats reuse its result. A near duplicate can differ in
+exactly the word that decides its sentiment ("not good" / "so good"), and
+even normalization alone drops signal the model reads ("Love it!" /
+"love it..." / emoji), so those are always scored themselves. A DuplicateIndex can be seeded with a product's
+earlier representatives (see app/core/dedup_index.py) so repeats across
+analyses are not rescored either. duplicate_weights() down-weights exact and
+near repeats in aggregate metrics, so a spam burst counts little more than
+a single comment.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import logging
+import re
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_MENTION_RE = re.compile(r"\brt\s+@\w+:?|@\w+")
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_BITS = 64
+_SHIFTS = np.arange(_BITS, dtype=np.uint64)
+
+# Shorter texts are only matched exactly: a few words give unstable fingerprints
+_MIN_NEAR_TOKENS = 4
+
+
+def normalize(text: str) -> str:
+    """Canonical form used for near-duplicate matching"""
+    text = _URL_RE.sub(" ", text.lower())
+    text = _MENTION_RE.sub(" ", text)
+    text = _NON_WORD_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def exact_hash(normalized: str) -> str:
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def reuse_key(text: str) -> str:
+    """Exact-duplicate key: texts sharing it get the same sentiment result"""
+    return exact_hash(_WHITESPACE_RE.sub(" ", text).strip())
+
+
+def simhash(normalized: str) -> Optional[int]:
+    """64-bit SimHash of a normalized text (None if too short to match nearly)"""
+    tokens = normalized.split()
+    if len(tokens) < _MIN_NEAR_TOKENS:
+        return None
+    # Word bigrams: over single words, any reordering of the same words
+    # ("good, not bad" / "bad, not good") would get the same fingerprint
+    shingles = [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    hashes = np.frombuffer(digests, dtype=np.uint64)
+    votes = ((hashes[:, None] >> _SHIFTS) & np.uint64(1)).sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    return int(np.bitwise_or.reduce(np.uint64(1) << _SHIFTS[votes > 0], initial=np.uint64(0)))
+
+
+class DuplicateIndex:
+    """Exact + SimHash lookup of representative comments and their sentiment"""
+
+    def __init__(self, max_distance: int = 6):
+        """
+        Initialize index
+
+        Args:
+            max_distance: Max differing fingerprint bits for a near duplicate
+        """
+        self.max_distance = max_distance
+        self._bands = max_distance + 1
+        self._band_bits = _BITS // self._bands
+        self._band_mask = (1 << self._band_bits) - 1
+
+        self._results: List[Optional[dict]] = []
+        self._exact: Dict[str, int] = {}
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self._bands)]
+        self._fingerprints = np.zeros(1024, dtype=np.uint64)  # By entry id; candidates compare vectorized
+        self.new_entries: List[Tuple[str, Optional[int], int]] = []  # (key, fingerprint, entry) added since loading
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def lookup(self, key: str, fingerprint: Optional[int]) -> Optional[Tuple[int, float]]:
+        """
+        Find a representative for a comment
+
+        Returns:
+            (entry id, similarity in [0, 1]) or None
+        """
+        entry = self._exact.get(key)
+        if entry is not None:
+            return entry, 1.0
+        if fingerprint is None:
+            return None
+
+        candidates = []
+        for band, value in self._band_values(fingerprint):
+            candidates.extend(self._buckets[band].get(value, ()))
+        if not candidates:
+            return None
+
+        candidates = np.array(candidates)
+        distances = np.bitwise_count(self._fingerprints[candidates] ^ np.uint64(fingerprint))
+        best = int(distances.argmin())
+        if distances[best] > self.max_distance:
+            return None
+        return int(candidates[best]), 1.0 - int(distances[best]) / _BITS
+
+    def add(self, key: str, fingerprint: Optional[int], result: Optional[dict] = None, new: bool = True) -> int:
+        """Add a representative (result may be filled in later with set_result)"""
+        entry = len(self._results)
+        self._results.append(result)
+        self._exact[key] = entry
+        if fingerprint is not None:
+            if entry >= len(self._fingerprints):
+                self._fingerprints = np.resize(self._fingerprints, 2 * len(self._fingerprints))
+            self._fingerprints[entry] = fingerprint
+            for band, value in self._band_values(fingerprint):
+                self._buckets[band].setdefault(value, []).append(entry)
+        if new:
+            self.new_entries.append((key, fingerprint, entry))
+        return entry
+
+    def set_result(self, entry: int, result: dict):
+        self._results[entry] = result
+
+    def result(self, entry: int) -> Optional[dict]:
+        return self._results[entry]
+
+    def _band_values(self, fingerprint: int):
+        for band in range(self._bands):
+            yield band, (fingerprint >> (band * self._band_bits)) & self._band_mask
+
+
+def score_deduplicated(
+    texts: List[str],
+    score: Callable[[List[str]], List[dict]],
+    index: DuplicateIndex
+) -> Tuple[List[dict], Dict[str, int]]:
+    """
+    Score texts, running `score` only once per exact duplicate group
+
+    Texts whose reuse_key matches a representative already in the index
+    (from earlier chunks or analyses) are not scored at all. New
+    representatives are added to the index. Near duplicates are scored like
+    any other text (see the module docstring).
+
+    Args:
+        texts: Comment texts
+        score: Sentiment function, e.g. SentimentAnalyzer.analyze_batch
+        index: The product's duplicate index
+
+    Returns:
+        (one sentiment dict per text, {"scored", "exact"} counts)
+    """
+    entries = []
+    pending = []  # Entries of the texts in batch
+    batch = []
+    stats = {"scored": 0, "exact": 0}
+
+    for text in texts:
+        key = reuse_key(text)
+        match = index.lookup(key, None)
+        if match is None:
+            entry = index.add(key, None)
+            pending.append(entry)
+            batch.append(text)
+        else:
+            entry = match[0]
+            stats["exact"] += 1
+        entries.append(entry)
+
+    if batch:
+        for entry, result in zip(pending, score(batch)):
+            index.set_result(entry, result)
+        stats["scored"] = len(batch)
+
+    return [index.result(entry) for entry in entries], stats
+
+
+def duplicate_weights(texts: List[str], duplicate_weight: float, max_distance: int = 6) -> List[float]:
+    """
+    Aggregate weight per comment: 1 for the first of a duplicate group, duplicate_weight for repeats
+    """
+    index = DuplicateIndex(max_distance)
+    weights = []
+    for text in texts:
+        normalized = normalize(text)
+        key = exact_hash(normalized)
+        fingerprint = simhash(normalized)
+        if index.lookup(key, fingerprint) is None:
+            index.add(key, fingerprint, new=False)
+            weights.append(1.0)
+        else:
+            weights.append(duplicate_weight)
+    return weights
@@ -0,0 +1,289 @@
+"""
+Shared Sentiment Inference Server
+
+A local model-server process that holds a single copy of the sentiment model
+and serves every Celery child on the machine over a Unix socket. Requests from
+concurrent analysis tasks are merged into micro-batches: a batch is flushed as
+soon as it reaches ``max_batch_texts`` or ``max_wait_ms`` after its first
+request arrived, whichever comes first.
+
+Start it next to the worker (from backend/):
+    python -m app.ml.inference_server
+
+Wire protocol: each message is a 4-byte big-endian length followed by a UTF-8
+JSON body. Requests are ``{"texts": [...]}``, responses ``{"results": [...]}``
+or ``{"error": "..."}``. ``{"stats": true}`` and ``{"namespace": true}`` return
+the batcher's counters and the model's cache namespace.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import time
+from typing import Dict, List
+
+from app.ml import streaming
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+
+
+def _encode(payload: dict) -> bytes:
+    body = json.dumps(payload).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+
+class MicroBatcher:
+    """Merges concurrent requests into model-sized batches with a max-wait deadline"""
+
+    def __init__(self, analyzer, max_batch_texts: int = 256, max_wait_ms: int = 10):
+        self.analyzer = analyzer
+        self.max_batch_texts = max_batch_texts
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue = None
+
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+
+    async def submit(self, texts: List[str]) -> List[Dict]:
+        """Queue texts for the next micro-batch and wait for their results"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def run(self):
+        """Collect requests into batches forever; run inference off the event loop"""
+        self._queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_texts:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            merged = [text for texts, _ in pending for text in texts]
+            try:
+                results = await loop.run_in_executor(None, self.analyzer.analyze_batch, merged)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(pending)
+            self.texts += len(merged)
+
+            offset = 0
+            for texts, future in pending:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(texts)])
+                offset += len(texts)
+
+    def stats(self) -> Dict[str, any]:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "texts": self.texts,
+            "avg_requests_per_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class InferenceServer:
+    """Unix socket server in front of a MicroBatcher"""
+
+    def __init__(self, analyzer, socket_path: str, max_batch_texts: int = 256, max_wait_ms: int = 10):
+        self.socket_path = socket_path
+        self.batcher = MicroBatcher(analyzer, max_batch_texts, max_wait_ms)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                body = await reader.readexactly(_HEADER.unpack(header)[0])
+                try:
+                    request = json.loads(body)
+                    if request.get("stats"):
+                        response = {"stats": self.batcher.stats()}
+                    elif request.get("namespace"):
+                        response = {"namespace": self.batcher.analyzer.cache_namespace}
+                    else:
+                        response = {"results": await self.batcher.submit(request["texts"])}
+                except Exception as e:
+                    logger.error(f"Inference request failed: {e}")
+                    response = {"error": str(e)}
+                writer.write(_encode(response))
+                await writer.drain()
+        except ConnectionError:
+            logger.info("Client disconnected before its results were ready (timed out)")
+        finally:
+            writer.close()
+
+    async def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        batcher_task = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        logger.info(f"Sentiment inference server listening on {self.socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+class InferenceClient:
+    """Blocking client used from Celery tasks"""
+
+    def __init__(self, socket_path: str, timeout: float = 60, max_request_texts: int = 128):
+        """
+        Initialize client
+
+        Args:
+            socket_path: Unix socket of the inference server
+            timeout: Seconds to wait for one request's results
+            max_request_texts: Texts sent per request; larger calls are split,
+                so the timeout covers about one micro-batch however big the call.
+                Smaller than the server's max_batch_texts, so a request leaves
+                room in its micro-batch for other workers' texts
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.max_request_texts = max(1, max_request_texts)
+
+    def _request(self, payload: dict) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(_encode(payload))
+            try:
+                (length,) = _HEADER.unpack(self._recv_exactly(sock, _HEADER.size))
+                response = json.loads(self._recv_exactly(sock, length))
+            except socket.timeout:
+                raise TimeoutError(f"Inference server did not answer within {self.timeout}s")
+
+        if "error" in response:
+            raise RuntimeError(f"Inference server error: {response['error']}")
+        return response
+
+    @staticmethod
+    def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+        chunks = []
+        while size:
+            chunk = sock.recv(min(size, 1 << 20))
+            if not chunk:
+                raise ConnectionError("Inference server closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        results = []
+        for start in range(0, len(texts), self.max_request_texts):
+            results.extend(self._request({"texts": texts[start:start + self.max_request_texts]})["results"])
+        return results
+
+    def stats(self) -> Dict[str, any]:
+        return self._request({"stats": True})["stats"]
+
+    def namespace(self) -> str:
+        """Cache namespace of the server's model (see SentimentAnalyzer.cache_namespace)"""
+        return self._request({"namespace": True})["namespace"]
+
+
+class RemoteSentimentAnalyzer:
+    """
+    Thin SentimentAnalyzer stand-in that forwards to the inference server
+
+    Falls back to an in-process SentimentAnalyzer (loaded on first use) when
+    the server is unreachable, so tasks keep working if it is down. A server
+    that is up but slow (a timeout) or reports an error is not a reason to
+    load another model copy into the worker: those errors are raised.
+    """
+
+    cache = None  # Results are cached server-side
+
+    def __init__(self, client: InferenceClient, local_factory):
+        self.client = client
+        self._local_factory = local_factory
+        self._local = None
+        self._retry_at = 0.0
+        self._namespace = None
+
+    def _fallback(self):
+        if self._local is None:
+            logger.warning("Loading in-process sentiment model as inference server fallback")
+            self._local = self._local_factory()
+        return self._local
+
+    def analyze_batch(self, texts: list) -> list:
+        if not texts:
+            return []
+        # After a failure, skip the server for a short while instead of timing out on every call
+        if time.monotonic() >= self._retry_at:
+            try:
+                return self.client.analyze_batch(texts)
+            except (ConnectionError, FileNotFoundError) as e:
+                logger.warning(f"Inference server unavailable ({e}); using in-process model")
+                self._retry_at = time.monotonic() + 30
+        return self._fallback().analyze_batch(texts)
+
+    @property
+    def cache_namespace(self) -> str:
+        """The server model's namespace, or the fallback model's while the server is down"""
+        if self._namespace is None and time.monotonic() >= self._retry_at:
+            try:
+                self._namespace = self.client.namespace()
+            except (ConnectionError, FileNotFoundError) as e:
+                logger.warning(f"Inference server unavailable ({e}); using in-process model")
+                self._retry_at = time.monotonic() + 30
+        if self._namespace is not None:
+            return self._namespace
+        return self._fallback().cache_namespace
+
+    def analyze(self, text: str) -> Dict[str, any]:
+        return self.analyze_batch([text])[0]
+
+    def analyze_stream(self, texts, chunk_size: int = 256, on_chunk=None):
+        return streaming.stream(self.analyze_batch, texts, chunk_size, on_chunk)
+
+
+def main():
+    from app.core.config import settings
+    from app.ml.sentiment_analyzer import build_sentiment_analyzer
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    server = InferenceServer(
+        build_sentiment_analyzer(),
+        settings.SENTIMENT_SERVER_SOCKET or "/tmp/sentiment-inference.sock",
+        max_batch_texts=settings.SENTIMENT_SERVER_MAX_BATCH,
+        max_wait_ms=settings.SENTIMENT_SERVER_MAX_WAIT_MS
+    )
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
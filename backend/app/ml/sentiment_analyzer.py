@@ -5,44 +5,123 @@ This module provides sentiment analysis capabilities using a pre-trained
 or fine-tuned transformer model.
 """
 
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
 import torch
-from typing import Dict, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import logging
 
+from app.core.config import settings
+from app.ml import streaming
+from app.ml.sentiment_cache import SentimentCache
+
 logger = logging.getLogger(__name__)
 
+# fp32 PyTorch, dynamically quantized int8 PyTorch, exported ONNX Runtime session
+SUPPORTED_BACKENDS = ("pytorch", "pytorch-int8", "onnx")
+
 
 class SentimentAnalyzer:
     """Sentiment analysis using transformer models"""
     
-    def __init__(self, model_name: str = "distilbert-base-uncased-finetuned-sst-2-english"):
+    def __init__(
+        self,
+        model_name: str = "distilbert-base-uncased-finetuned-sst-2-english",
+        token_budget: int = 8192,
+        max_batch_size: int = 64,
+        cache: Optional[SentimentCache] = None,
+        backend: str = "pytorch",
+        onnx_path: Optional[str] = None,
+        long_text_mode: str = "truncate",
+        window_stride: int = 128,
+        max_windows: int = 4
+    ):
         """
         Initialize sentiment analyzer
         
         Args:
             model_name: Hugging Face model name or path to local model
+            token_budget: Max padded tokens (batch size x longest input) per forward pass
+            max_batch_size: Max number of texts per forward pass
+            cache: Optional result cache consulted by analyze_batch
+            backend: Inference backend, one of SUPPORTED_BACKENDS
+            onnx_path: Directory produced by ``python -m app.ml.sentiment_export``
+                (required for the "onnx" backend)
+            long_text_mode: "truncate" keeps the first max_length tokens,
+                "window" scores overlapping token windows and averages them
+            window_stride: Tokens shared by consecutive windows
+            max_windows: Max windows scored per text in "window" mode
         """
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"Unknown sentiment backend '{backend}'. Expected one of {SUPPORTED_BACKENDS}")
+        if long_text_mode not in ("truncate", "window"):
+            raise ValueError(f"Unknown long text mode '{long_text_mode}'. Expected 'truncate' or 'window'")
+        
         self.model_name = model_name
-        self.device = 0 if torch.cuda.is_available() else -1
+        self.backend = backend
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        self.long_text_mode = long_text_mode
+        self.window_stride = window_stride
+        self.max_windows = max(1, max_windows)
+        self.cache = cache
+        self.session = None
+        # Quantized and ONNX backends are CPU-only
+        self.device = 0 if torch.cuda.is_available() and backend == "pytorch" else -1
         
-        logger.info(f"Loading sentiment model: {model_name}")
+        logger.info(f"Loading sentiment model: {model_name} (backend: {backend})")
         logger.info(f"Using device: {'GPU' if self.device == 0 else 'CPU'}")
         
         try:
-            # Load pipeline for sentiment analysis
-            self.pipeline = pipeline(
-                "sentiment-analysis",
-                model=model_name,
-                device=self.device,
-                truncation=True,
-                max_length=512
-            )
+            if backend == "onnx":
+                self._load_onnx(onnx_path)
+            else:
+                self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+                self.model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+                if backend == "pytorch-int8":
+                    # Dynamic quantization: int8 weights for Linear layers, fp32 activations
+                    self.model = torch.ao.quantization.quantize_dynamic(
+                        self.model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                self.model.to("cuda" if self.device == 0 else "cpu")
+                self.id2label = self.model.config.id2label
+            self.max_length = min(512, self.tokenizer.model_max_length)
             logger.info("Sentiment model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load sentiment model: {e}")
             raise
     
+    def _load_onnx(self, onnx_path: Optional[str]):
+        """Load an exported ONNX Runtime session plus its tokenizer and label map"""
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("The 'onnx' sentiment backend requires onnxruntime (pip install onnxruntime)")
+        
+        if not onnx_path:
+            raise ValueError("SENTIMENT_ONNX_PATH must be set for the 'onnx' sentiment backend")
+        
+        model_dir = Path(onnx_path)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_dir / "model.onnx"),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._onnx_inputs = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.id2label = AutoConfig.from_pretrained(model_dir).id2label
+        self.model = None
+    
+    @property
+    def cache_namespace(self) -> str:
+        """Cache key prefix; backends and long text settings produce different scores"""
+        namespace = f"{self.model_name}@{self.backend}/{self.long_text_mode}"
+        if self.long_text_mode == "window":
+            namespace += f":{self.window_stride}x{self.max_windows}"
+        return namespace
+    
     def analyze(self, text: str) -> Dict[str, any]:
         """
         Analyze sentiment of a single text
@@ -61,29 +140,7 @@ class SentimentAnalyzer:
             }
         
         try:
-            # Run inference
-            result = self.pipeline(text[:512])[0]  # Truncate long texts
-            
-            # Map label to our sentiment types
-            label = result['label'].lower()
-            confidence = result['score']
-            
-            # Convert to our format
-            if label == 'positive' or label == 'pos':
-                sentiment = "positive"
-                score = confidence
-            elif label == 'negative' or label == 'neg':
-                sentiment = "negative"
-                score = -confidence
-            else:
-                sentiment = "neutral"
-                score = 0.0
-            
-            return {
-                "sentiment": sentiment,
-                "score": score,  # -1 to 1
-                "confidence": confidence  # 0 to 1
-            }
+            return self._score_batch([text])[0]
             
         except Exception as e:
             logger.error(f"Error analyzing sentiment: {e}")
@@ -97,6 +154,9 @@ class SentimentAnalyzer:
         """
         Analyze sentiment for multiple texts (more efficient)
         
+        When a result cache is attached, only texts missing from the cache
+        are sent to the model.
+        
         Args:
             texts: List of texts to analyze
             
@@ -107,33 +167,17 @@ class SentimentAnalyzer:
             return []
         
         try:
-            # Truncate texts
-            truncated_texts = [text[:512] if text else "" for text in texts]
-            
-            # Batch inference
-            results = self.pipeline(truncated_texts)
+            if self.cache is None:
+                return self._score_batch(texts)
             
-            # Convert to our format
-            analyzed = []
-            for result in results:
-                label = result['label'].lower()
-                confidence = result['score']
-                
-                if label == 'positive' or label == 'pos':
-                    sentiment = "positive"
-                    score = confidence
-                elif label == 'negative' or label == 'neg':
-                    sentiment = "negative"
-                    score = -confidence
-                else:
-                    sentiment = "neutral"
-                    score = 0.0
-                
-                analyzed.append({
-                    "sentiment": sentiment,
-                    "score": score,
-                    "confidence": confidence
-                })
+            analyzed = self.cache.get_many(self.cache_namespace, texts)
+            misses = [i for i, result in enumerate(analyzed) if result is None]
+            if misses:
+                miss_texts = [texts[i] for i in misses]
+                scored = self._score_batch(miss_texts)
+                self.cache.set_many(self.cache_namespace, miss_texts, scored)
+                for i, result in zip(misses, scored):
+                    analyzed[i] = result
             
             return analyzed
             
@@ -142,15 +186,226 @@ class SentimentAnalyzer:
             # Return neutral results for all texts
             return [{"sentiment": "neutral", "score": 0.0, "confidence": 0.0} 
                     for _ in texts]
+    
+    def analyze_stream(self, texts, chunk_size: int = 256, on_chunk=None):
+        """
+        Analyze a (possibly huge) stream of texts with bounded memory
+        
+        Texts are consumed ``chunk_size`` at a time and scored with
+        analyze_batch; results are yielded one per text, in input order.
+        
+        Args:
+            texts: Iterable or async iterable of texts
+            chunk_size: Texts scored per batch
+            on_chunk: Optional callback receiving per-chunk timings
+                ({"chunk", "size", "seconds", "texts_per_second"})
+            
+        Returns:
+            Generator of sentiment dictionaries (async generator for async input)
+        """
+        return streaming.stream(self.analyze_batch, texts, chunk_size, on_chunk)
+    
+    def _score_batch(self, texts: list) -> list:
+        """
+        Run the model over a list of texts
+        
+        Texts are tokenized once, in batch, by the fast tokenizer. In
+        "truncate" mode each text keeps its first ``max_length`` tokens; in
+        "window" mode long texts are split into overlapping token windows
+        (at most ``max_windows`` per text) whose class probabilities are
+        averaged, weighted by window length.
+        
+        Windows are sorted by token length and grouped into buckets whose
+        padded size stays under ``token_budget``. Each bucket is padded only
+        to its own longest input, and results are returned in the original
+        input order.
+        """
+        windowed = self.long_text_mode == "window"
+        # Bound tokenizer work on pathological inputs; no window can reach past this
+        char_limit = self.max_length * self.max_windows * 10
+        capped_texts = [text[:char_limit] if text else "" for text in texts]
+        
+        # Tokenize everything once, without padding
+        encodings = self.tokenizer(
+            capped_texts,
+            truncation=True,
+            max_length=self.max_length,
+            stride=self.window_stride if windowed else 0,
+            return_overflowing_tokens=windowed
+        )
+        input_ids = encodings["input_ids"]
+        attention_mask = encodings["attention_mask"]
+        if windowed:
+            owners = _cap_windows(encodings["overflow_to_sample_mapping"], self.max_windows)
+        else:
+            owners = list(enumerate(range(len(texts))))
+        
+        windows = [w for w, _ in owners]
+        lengths = [len(input_ids[w]) for w in windows]
+        probs = [None] * len(windows)
+        for bucket in _bucket_by_length(lengths, self.token_budget, self.max_batch_size):
+            batch = self._pad(
+                [input_ids[windows[i]] for i in bucket],
+                [attention_mask[windows[i]] for i in bucket]
+            )
+            for i, row in zip(bucket, self._forward(batch)):
+                probs[i] = row
+        
+        # Length-weighted mean of window probabilities per text
+        totals = [None] * len(texts)
+        weights = [0] * len(texts)
+        for (_, owner), length, row in zip(owners, lengths, probs):
+            totals[owner] = row * length if totals[owner] is None else totals[owner] + row * length
+            weights[owner] += length
+        
+        analyzed = []
+        for text, total, weight in zip(texts, totals, weights):
+            if not text or not text.strip():
+                # Empty inputs are neutral
+                analyzed.append({"sentiment": "neutral", "score": 0.0, "confidence": 0.0})
+                continue
+            confidence, label_id = (total / weight).max(dim=-1)
+            analyzed.append(_to_result(self.id2label[int(label_id)], float(confidence)))
+        
+        return analyzed
+    
+    def _pad(self, input_ids: List[List[int]], attention_mask: List[List[int]]) -> Dict[str, torch.Tensor]:
+        """Right-pad pre-tokenized rows to the longest row in the bucket"""
+        width = max(len(ids) for ids in input_ids)
+        ids = torch.full((len(input_ids), width), self.tokenizer.pad_token_id or 0, dtype=torch.long)
+        mask = torch.zeros((len(input_ids), width), dtype=torch.long)
+        for row, (row_ids, row_mask) in enumerate(zip(input_ids, attention_mask)):
+            ids[row, :len(row_ids)] = torch.tensor(row_ids, dtype=torch.long)
+            mask[row, :len(row_mask)] = torch.tensor(row_mask, dtype=torch.long)
+        return {"input_ids": ids, "attention_mask": mask}
+    
+    def _forward(self, batch) -> torch.Tensor:
+        """Run one padded batch through the model and return class probabilities"""
+        if self.session is not None:
+            feeds = {k: v.numpy() for k, v in batch.items() if k in self._onnx_inputs}
+            logits = torch.from_numpy(self.session.run(None, feeds)[0])
+        else:
+            device = self.model.device
+            with torch.inference_mode():
+                logits = self.model(**{k: v.to(device) for k, v in batch.items()}).logits
+        return torch.softmax(logits.float(), dim=-1).cpu()
+
+
+def _cap_windows(sample_mapping: List[int], max_windows: int) -> List[Tuple[int, int]]:
+    """
+    Pick at most ``max_windows`` windows per text, evenly spread over the text
+    
+    Args:
+        sample_mapping: Owning text index of each tokenized window
+        max_windows: Max windows kept per text
+        
+    Returns:
+        List of (window index, text index) pairs
+    """
+    per_text = {}
+    for window, owner in enumerate(sample_mapping):
+        per_text.setdefault(owner, []).append(window)
+    
+    kept = []
+    for owner, windows in per_text.items():
+        if len(windows) > max_windows:
+            if max_windows == 1:
+                windows = windows[:1]
+            else:
+                step = (len(windows) - 1) / (max_windows - 1)
+                windows = [windows[round(k * step)] for k in range(max_windows)]
+        kept.extend((window, owner) for window in windows)
+    return kept
+
+
+def _to_result(label: str, confidence: float) -> Dict[str, any]:
+    """Map a model label and its probability to our sentiment format"""
+    label = label.lower()
+    if label == 'positive' or label == 'pos':
+        return {"sentiment": "positive", "score": confidence, "confidence": confidence}
+    elif label == 'negative' or label == 'neg':
+        return {"sentiment": "negative", "score": -confidence, "confidence": confidence}
+    return {"sentiment": "neutral", "score": 0.0, "confidence": confidence}
+
+
+def _bucket_by_length(lengths: List[int], token_budget: int, max_batch_size: int) -> List[List[int]]:
+    """
+    Group input indices into length-sorted buckets
+    
+    Indices are sorted by token length so each bucket holds inputs of similar
+    size. A bucket is closed once adding the next input would push its padded
+    size (count x longest length) over ``token_budget`` or its count over
+    ``max_batch_size``. An input longer than the budget gets its own bucket.
+    
+    Args:
+        lengths: Token length of each input
+        token_budget: Max padded tokens per bucket
+        max_batch_size: Max inputs per bucket
+        
+    Returns:
+        List of buckets, each a list of indices into ``lengths``
+    """
+    buckets = []
+    current = []
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        # Sorted ascending, so the newcomer is the longest in the bucket
+        if current and (
+            len(current) >= max_batch_size
+            or (len(current) + 1) * lengths[i] > token_budget
+        ):
+            buckets.append(current)
+            current = []
+        current.append(i)
+    if current:
+        buckets.append(current)
+    return buckets
 
 
 # Global instance (lazy loading)
 _sentiment_analyzer = None
 
 
+def build_sentiment_analyzer() -> SentimentAnalyzer:
+    """Create an in-process sentiment analyzer from settings"""
+    cache = None
+    if settings.SENTIMENT_CACHE_SIZE > 0:
+        cache = SentimentCache(
+            max_size=settings.SENTIMENT_CACHE_SIZE,
+            redis_url=settings.REDIS_URL if settings.SENTIMENT_CACHE_REDIS else None,
+            ttl=settings.SENTIMENT_CACHE_TTL
+        )
+    return SentimentAnalyzer(
+        token_budget=settings.SENTIMENT_TOKEN_BUDGET,
+        max_batch_size=settings.SENTIMENT_MAX_BATCH_SIZE,
+        cache=cache,
+        backend=settings.SENTIMENT_BACKEND,
+        onnx_path=settings.SENTIMENT_ONNX_PATH,
+        long_text_mode=settings.SENTIMENT_LONG_TEXT_MODE,
+        window_stride=settings.SENTIMENT_WINDOW_STRIDE,
+        max_windows=settings.SENTIMENT_MAX_WINDOWS
+    )
+
+
 def get_sentiment_analyzer() -> SentimentAnalyzer:
-    """Get or create the global sentiment analyzer instance"""
+    """
+    Get or create the global sentiment analyzer instance
+    
+    When SENTIMENT_SERVER_SOCKET is set this is a thin client for the shared
+    inference server (see app.ml.inference_server), which only loads a local
+    model if the server can't be reached.
+    """
     global _sentiment_analyzer
     if _sentiment_analyzer is None:
-        _sentiment_analyzer = SentimentAnalyzer()
+        if settings.SENTIMENT_SERVER_SOCKET:
+            from app.ml.inference_server import InferenceClient, RemoteSentimentAnalyzer
+            _sentiment_analyzer = RemoteSentimentAnalyzer(
+                InferenceClient(
+                    settings.SENTIMENT_SERVER_SOCKET,
+                    timeout=settings.SENTIMENT_SERVER_TIMEOUT,
+                    max_request_texts=settings.SENTIMENT_SERVER_REQUEST_TEXTS
+                ),
+                build_sentiment_analyzer
+            )
+        else:
+            _sentiment_analyzer = build_sentiment_analyzer()
     return _sentiment_analyzer
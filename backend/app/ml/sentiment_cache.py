@@ -0,0 +1,143 @@
+"""
+Sentiment Result Cache
+
+Content-addressed cache for sentiment results. Entries are keyed by a hash of
+(model name, normalized text), so the same review scraped twice is only
+scored once. A bounded in-process LRU sits in front of an optional Redis tier
+shared by all workers.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import hashlib
+import json
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def cache_key(model_name: str, text: str) -> str:
+    """Build the cache key for a text scored by a given model"""
+    normalized = _WHITESPACE_RE.sub(" ", text).strip()
+    digest = hashlib.sha256(f"{model_name}\x00{normalized}".encode("utf-8")).hexdigest()
+    return f"sentiment:{digest}"
+
+
+class SentimentCache:
+    """Two-tier (LRU + optional Redis) cache for sentiment results"""
+
+    def __init__(self, max_size: int = 50000, redis_url: str = None, ttl: int = 7 * 24 * 3600):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Max entries held in the in-process LRU
+            redis_url: Redis URL for the shared tier (None disables it)
+            ttl: Expiry of Redis entries in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=1)
+                self._redis.ping()
+                logger.info("Sentiment cache Redis tier enabled")
+            except Exception as e:
+                logger.warning(f"Sentiment cache Redis tier unavailable: {e}. Using in-process LRU only.")
+                self._redis = None
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[Dict]]:
+        """
+        Look up cached results for a list of texts
+
+        Returns:
+            List aligned with ``texts``; None marks a cache miss
+        """
+        keys = [cache_key(model_name, text) for text in texts]
+        results = [None] * len(keys)
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._lru.get(key)
+                if cached is not None:
+                    self._lru.move_to_end(key)
+                    results[i] = cached
+                    self.hits += 1
+                else:
+                    missing.append(i)
+
+        if missing and self._redis is not None:
+            try:
+                values = self._redis.mget([keys[i] for i in missing])
+            except Exception as e:
+                logger.warning(f"Sentiment cache Redis lookup failed: {e}")
+                values = [None] * len(missing)
+
+            still_missing = []
+            for i, value in zip(missing, values):
+                if value is None:
+                    still_missing.append(i)
+                    continue
+                results[i] = json.loads(value)
+                self._remember(keys[i], results[i])
+                self.hits += 1
+                self.redis_hits += 1
+            missing = still_missing
+
+        self.misses += len(missing)
+        return results
+
+    def set_many(self, model_name: str, texts: List[str], results: List[Dict]):
+        """Store freshly computed results for a list of texts"""
+        keys = [cache_key(model_name, text) for text in texts]
+        for key, result in zip(keys, results):
+            self._remember(key, result)
+
+        if self._redis is not None and keys:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for key, result in zip(keys, results):
+                    pipe.set(key, json.dumps(result), ex=self.ttl)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Sentiment cache Redis write failed: {e}")
+
+    def _remember(self, key: str, result: Dict):
+        """Insert into the LRU tier, evicting the oldest entries when full"""
+        with self._lock:
+            self._lru[key] = result
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    def stats(self) -> Dict[str, any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._lru),
+            "redis_enabled": self._redis is not None
+        }
+
+    def clear(self):
+        """Drop the in-process tier and reset counters (Redis entries expire on their own)"""
+        with self._lock:
+            self._lru.clear()
+        self.hits = self.redis_hits = self.misses = 0
@@ -0,0 +1,162 @@
+"""
+Sentiment Model Export
+
+One-shot command that exports the sentiment model to ONNX, quantizes it to
+int8 and checks that the exported model agrees with the fp32 PyTorch model.
+
+Usage (from backend/):
+    python -m app.ml.sentiment_export --output ../trained_models/sentiment_onnx
+    python -m app.ml.sentiment_export --parity-only --backend pytorch-int8
+"""
+
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import torch
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import logging
+import time
+
+from app.ml.sentiment_analyzer import SentimentAnalyzer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# Mixed-length, mixed-sentiment samples used when no parity file is given
+PARITY_SAMPLES = [
+    "I've been using this for months and it's amazing!",
+    "Really disappointed. Not worth the money.",
+    "It's okay, nothing special but gets the job done.",
+    "Customer support is terrible. Never again.",
+    "Excellent features! This is our go-to solution.",
+    "Why is it so expensive? Not happy",
+    "Integration issues, but support was helpful though.",
+    "Thinking of canceling my subscription...",
+    "Reliable and stable. It just works.",
+    "Lots of features but a steep learning curve, and the documentation could be "
+    "much better. After a few weeks the team got used to it and now we rely on it daily.",
+    "The update is fire! Great improvements",
+    "Broke after just one week. Avoid!",
+]
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True, opset: int = 17) -> Path:
+    """
+    Export a sequence classification model to ONNX
+
+    Args:
+        model_name: Hugging Face model name or path to local model
+        output_dir: Directory that receives model.onnx, tokenizer and config
+        quantize: Apply ONNX Runtime dynamic int8 quantization to the weights
+        opset: ONNX opset version
+
+    Returns:
+        Path to the exported model.onnx
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    fp32_file = output_dir / "model_fp32.onnx"
+    model_file = output_dir / "model.onnx"
+
+    dummy = tokenizer(["export sample"], return_tensors="pt")
+    logger.info(f"Exporting {model_name} to {fp32_file}")
+    torch.onnx.export(
+        model,
+        (dummy["input_ids"], dummy["attention_mask"]),
+        str(fp32_file),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=opset,
+        dynamo=False
+    )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info(f"Quantizing weights to int8 -> {model_file}")
+        quantize_dynamic(str(fp32_file), str(model_file), weight_type=QuantType.QInt8)
+        fp32_file.unlink()
+    else:
+        fp32_file.replace(model_file)
+
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+
+    logger.info(f"Export complete: {model_file} ({model_file.stat().st_size / 1e6:.1f} MB)")
+    return model_file
+
+
+def check_parity(
+    reference: SentimentAnalyzer,
+    candidate: SentimentAnalyzer,
+    texts: List[str]
+) -> Dict[str, any]:
+    """
+    Compare a candidate backend against the fp32 reference
+
+    Returns:
+        Label agreement ratio, score drift and per-backend latency
+    """
+    start = time.perf_counter()
+    expected = reference._score_batch(texts)
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = candidate._score_batch(texts)
+    candidate_seconds = time.perf_counter() - start
+
+    agree = sum(1 for e, a in zip(expected, actual) if e["sentiment"] == a["sentiment"])
+    drift = [abs(e["score"] - a["score"]) for e, a in zip(expected, actual)]
+
+    return {
+        "backend": candidate.backend,
+        "samples": len(texts),
+        "label_agreement": round(agree / len(texts), 4) if texts else 1.0,
+        "max_score_diff": round(max(drift), 4) if drift else 0.0,
+        "mean_score_diff": round(sum(drift) / len(drift), 4) if drift else 0.0,
+        "reference_seconds": round(reference_seconds, 3),
+        "candidate_seconds": round(candidate_seconds, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export/quantize the sentiment model and check parity")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Model name or local path")
+    parser.add_argument("--output", default="../trained_models/sentiment_onnx", help="ONNX output directory")
+    parser.add_argument("--no-quantize", action="store_true", help="Keep fp32 ONNX weights")
+    parser.add_argument("--backend", default="onnx", choices=["onnx", "pytorch-int8"],
+                        help="Backend to compare against fp32 PyTorch")
+    parser.add_argument("--parity-only", action="store_true", help="Skip export, only run the parity check")
+    parser.add_argument("--parity-file", help="Text file with one sample per line for the parity check")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if not args.parity_only and args.backend == "onnx":
+        export_onnx(args.model, args.output, quantize=not args.no_quantize)
+
+    if args.parity_file:
+        texts = [line.strip() for line in Path(args.parity_file).read_text(encoding="utf-8").splitlines() if line.strip()]
+    else:
+        texts = PARITY_SAMPLES
+
+    reference = SentimentAnalyzer(args.model, backend="pytorch")
+    candidate = SentimentAnalyzer(args.model, backend=args.backend, onnx_path=args.output)
+    report = check_parity(reference, candidate, texts)
+
+    for key, value in report.items():
+        print(f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
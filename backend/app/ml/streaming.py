@@ -0,0 +1,94 @@
+"""
+Chunked streaming over a batch scoring function
+
+Shared by SentimentAnalyzer and the inference server client so both expose
+the same ``analyze_stream`` API. Input is consumed ``chunk_size`` texts at a
+time and results are yielded in input order, so memory stays bounded by one
+chunk no matter how long the input is.
+"""
+
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Union
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+BatchFn = Callable[[List[str]], List[Dict]]
+ChunkCallback = Callable[[Dict[str, any]], None]
+
+
+def stream(
+    analyze_batch: BatchFn,
+    texts: Union[Iterable[str], AsyncIterable[str]],
+    chunk_size: int = 256,
+    on_chunk: Optional[ChunkCallback] = None
+) -> Union[Iterator[Dict], AsyncIterator[Dict]]:
+    """
+    Score texts chunk by chunk
+
+    Args:
+        analyze_batch: Function scoring a list of texts
+        texts: Iterable or async iterable of texts
+        chunk_size: Texts scored per call to analyze_batch
+        on_chunk: Optional callback receiving per-chunk timings
+
+    Returns:
+        A generator for a plain iterable, an async generator for an async iterable
+    """
+    if hasattr(texts, "__aiter__"):
+        return _stream_async(analyze_batch, texts, chunk_size, on_chunk)
+    return _stream_sync(analyze_batch, texts, chunk_size, on_chunk)
+
+
+def _report(on_chunk: Optional[ChunkCallback], index: int, size: int, seconds: float):
+    timing = {
+        "chunk": index,
+        "size": size,
+        "seconds": round(seconds, 4),
+        "texts_per_second": round(size / seconds, 1) if seconds > 0 else 0.0,
+    }
+    logger.debug(f"Sentiment stream chunk: {timing}")
+    if on_chunk is not None:
+        on_chunk(timing)
+
+
+def _stream_sync(analyze_batch: BatchFn, texts: Iterable[str], chunk_size: int,
+                 on_chunk: Optional[ChunkCallback]) -> Iterator[Dict]:
+    iterator = iter(texts)
+    index = 0
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        start = time.perf_counter()
+        results = analyze_batch(chunk)
+        _report(on_chunk, index, len(chunk), time.perf_counter() - start)
+        index += 1
+        yield from results
+
+
+async def _stream_async(analyze_batch: BatchFn, texts: AsyncIterable[str], chunk_size: int,
+                        on_chunk: Optional[ChunkCallback]) -> AsyncIterator[Dict]:
+    index = 0
+    chunk = []
+
+    async def flush():
+        start = time.perf_counter()
+        # Inference is CPU bound; keep it off the event loop
+        results = await asyncio.to_thread(analyze_batch, chunk)
+        _report(on_chunk, index, len(chunk), time.perf_counter() - start)
+        return results
+
+    async for text in texts:
+        chunk.append(text)
+        if len(chunk) >= chunk_size:
+            for result in await flush():
+                yield result
+            index += 1
+            chunk = []
+
+    if chunk:
+        for result in await flush():
+            yield result
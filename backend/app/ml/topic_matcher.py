@@ -0,0 +1,196 @@
+"""
+Keyword Topic Matcher
+
+Matches comments against a topic taxonomy (topic -> keywords) with a single
+precompiled regex, factored as a keyword trie, so each text is scanned once
+regardless of how many keywords there are. Keywords match whole words only
+("tool" does not match "toolbar"), allow a plural "s"/"es" suffix, and
+multi-word keywords match across any whitespace.
+
+The taxonomy can be loaded from a JSON file of the form
+``{"topic": ["keyword", ...], ...}`` via TOPIC_TAXONOMY_PATH.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOPIC_TAXONOMY = {
+    "price": ["price", "expensive", "cheap", "cost", "pricing", "affordable", "$"],
+    "quality": ["quality", "reliable", "durable", "broken", "defective"],
+    "support": ["support", "service", "help", "customer service", "response"],
+    "features": ["feature", "functionality", "capability", "option", "tool"],
+    "performance": ["fast", "slow", "performance", "speed", "lag", "responsive"],
+    "usability": ["easy", "difficult", "intuitive", "user-friendly", "complicated"],
+}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class TopicMatcher:
+    """Single-pass multi-keyword topic matcher"""
+
+    def __init__(self, taxonomy: Dict[str, List[str]] = None):
+        """
+        Compile the matcher
+
+        Args:
+            taxonomy: Mapping of topic name to keywords (defaults to DEFAULT_TOPIC_TAXONOMY)
+        """
+        self.taxonomy = taxonomy or DEFAULT_TOPIC_TAXONOMY
+
+        # Matched text (normalized) -> ((topic, keyword) pairs, topics)
+        self._lookup: Dict[str, Tuple[Tuple[Tuple[str, str], ...], Tuple[str, ...]]] = {}
+        keyword_topics = defaultdict(list)
+        for topic, keywords in self.taxonomy.items():
+            for keyword in keywords:
+                keyword = _WHITESPACE_RE.sub(" ", keyword.strip().lower())
+                if keyword and topic not in keyword_topics[keyword]:
+                    keyword_topics[keyword].append(topic)
+
+        words, symbols = [], []
+        for keyword, topics in keyword_topics.items():
+            entry = (tuple((topic, keyword) for topic in topics), tuple(topics))
+            if _is_word_char(keyword[0]) and _is_word_char(keyword[-1]):
+                words.append(keyword)
+                for variant in (keyword, keyword + "s", keyword + "es"):
+                    self._lookup.setdefault(variant, entry)
+            else:
+                # Keywords starting or ending with a symbol (e.g. "$") match anywhere
+                symbols.append(keyword)
+                self._lookup.setdefault(keyword, entry)
+
+        # Keywords are compiled into a character trie, so the regex engine
+        # walks one branch per position instead of trying every keyword
+        alternatives = []
+        if words:
+            alternatives.append(r"\b" + _trie_pattern(words) + r"(?:s|es)?\b")
+        if symbols:
+            alternatives.append(_trie_pattern(symbols))
+        self._pattern = re.compile("|".join(alternatives)) if alternatives else None
+
+    @classmethod
+    def from_file(cls, path: str) -> "TopicMatcher":
+        """Build a matcher from a JSON taxonomy file"""
+        with open(Path(path), encoding="utf-8") as f:
+            taxonomy = json.load(f)
+        if not isinstance(taxonomy, dict) or not all(isinstance(v, list) for v in taxonomy.values()):
+            raise ValueError(f"Topic taxonomy {path} must map topic names to keyword lists")
+        logger.info(f"Loaded topic taxonomy with {len(taxonomy)} topics from {path}")
+        return cls(taxonomy)
+
+    def match(self, text: str) -> Set[Tuple[str, str]]:
+        """Return the distinct (topic, keyword) pairs mentioned in a text"""
+        found = set()
+        if not text or self._pattern is None:
+            return found
+        for hit in self._pattern.findall(text.lower()):
+            found.update(self._resolve(hit)[0])
+        return found
+
+    def _resolve(self, hit: str) -> Tuple[Tuple[Tuple[str, str], ...], Tuple[str, ...]]:
+        """Map matched text back to its (topic, keyword) pairs and topics"""
+        entry = self._lookup.get(hit)
+        if entry is None:
+            # Multi-word keyword matched across unusual whitespace
+            entry = self._lookup[_WHITESPACE_RE.sub(" ", hit)]
+        return entry
+
+    def aggregate(self, texts: Iterable[str], sentiments: Iterable[dict]) -> Dict[str, dict]:
+        """
+        Count topic mentions and sum their sentiment in one pass over the texts
+
+        A comment counts once per topic it mentions, however many of the
+        topic's keywords it contains.
+
+        Returns:
+            {topic: {"count", "keywords", "keyword_counts", "sentiment_sum", "avg_sentiment"}}
+        """
+        counts = defaultdict(int)
+        sentiment_sums = defaultdict(float)
+        keyword_counts = defaultdict(lambda: defaultdict(int))
+
+        findall = self._pattern.findall if self._pattern is not None else None
+        for text, sentiment in zip(texts, sentiments):
+            if not text or findall is None:
+                continue
+            hits = findall(text.lower())
+            if not hits:
+                continue
+
+            if len(hits) == 1:
+                mentions, topics = self._resolve(hits[0])
+            else:
+                mentions = set()
+                for hit in hits:
+                    mentions.update(self._resolve(hit)[0])
+                topics = {topic for topic, _ in mentions}
+
+            score = sentiment['score']
+            for topic in topics:
+                counts[topic] += 1
+                sentiment_sums[topic] += score
+            for topic, keyword in mentions:
+                keyword_counts[topic][keyword] += 1
+
+        result = {}
+        for topic, count in counts.items():
+            ranked = sorted(keyword_counts[topic].items(), key=lambda kv: (-kv[1], kv[0]))
+            result[topic] = {
+                "count": count,
+                # Symbols like "$" are matched but not shown as keywords
+                "keywords": [kw for kw, _ in ranked if any(_is_word_char(c) for c in kw)][:5],
+                "keyword_counts": dict(ranked),
+                "sentiment_sum": sentiment_sums[topic],
+                "avg_sentiment": sentiment_sums[topic] / count,
+            }
+        return result
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """Build a regex matching any of the keywords, factored as a character trie"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A keyword ends here but longer ones continue: the rest is optional (greedy)
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+
+# Global instance (lazy loading)
+_topic_matcher = None
+
+
+def get_topic_matcher() -> TopicMatcher:
+    """Get or create the global topic matcher (taxonomy from TOPIC_TAXONOMY_PATH if set)"""
+    global _topic_matcher
+    if _topic_matcher is None:
+        from app.core.config import settings
+
+        if settings.TOPIC_TAXONOMY_PATH:
+            _topic_matcher = TopicMatcher.from_file(settings.TOPIC_TAXONOMY_PATH)
+        else:
+            _topic_matcher = TopicMatcher()
+    return _topic_matcher
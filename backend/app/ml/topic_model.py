@@ -0,0 +1,407 @@
+"""
+Statistical Topic Modeling
+
+Discovers the themes of an analysis's comments with TF-IDF + NMF instead of
+fixed keyword lists.
+
+Each product gets its own vocabulary (terms and IDF weights) and NMF model,
+fitted on its first large-enough analysis and persisted under
+TOPIC_MODEL_DIR. Later analyses of the product reuse them:
+
+- Texts are vectorized against the fitted vocabulary with a C-level
+  translate/split tokenizer rather than re-running TfidfVectorizer
+- The NMF model is updated with one partial_fit pass over a sample of the
+  analysis's new comments, so topics follow the product's comments over
+  time without a full refactorization
+- Comment -> topic weights are solved from the projection onto the topics
+  plus a few multiplicative updates, instead of NMF.transform's cold start
+- Topics keep their names across updates: a topic is renamed only when its
+  top terms no longer overlap the ones it was named after, so the rolling
+  per-product aggregates see the same topic under the same name
+
+Topic sizes and sentiment come from sparse matrix products of the one-hot
+comment -> topic assignment with the score vector.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import itertools
+import logging
+import os
+import tempfile
+import threading
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.decomposition import MiniBatchNMF
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+logger = logging.getLogger(__name__)
+
+# Document separator when texts are tokenized as one string
+_DOC_SEPARATOR = "\x00"
+
+# Comments used to update a product's NMF model per analysis
+_UPDATE_SAMPLE_SIZE = 5000
+
+# Multiplicative updates when solving comment -> topic weights
+_WEIGHT_ITERATIONS = 5
+
+# Top terms compared when matching updated topics to their earlier names,
+# and the overlap (Jaccard) needed to keep a name
+_NAME_TERMS = 10
+_NAME_MIN_OVERLAP = 0.3
+
+# Length of the name columns (Topic.name, ProductTopicAggregate.name)
+MAX_TOPIC_NAME_LENGTH = 100
+
+# Characters TfidfVectorizer's token pattern (\b\w\w+\b) splits on -> space.
+# Covers the Basic Multilingual Plane up to CJK; anything rarer stays attached
+# to its word and simply misses the vocabulary.
+_SPLIT_TABLE = {
+    i: " " for i in range(0x3000)
+    if not (chr(i).isalnum() or chr(i) == "_") and chr(i) != _DOC_SEPARATOR
+}
+
+
+class ProductVocabulary:
+    """Fitted TF-IDF vocabulary and NMF model for one product"""
+
+    # Topic names and the terms they were last matched on (defaults for
+    # vocabularies saved before topics had stable names)
+    topic_names: List[str] = ()
+    topic_terms: List[set] = ()
+
+    def __init__(self, vectorizer: TfidfVectorizer, nmf: MiniBatchNMF):
+        self.terms = vectorizer.get_feature_names_out()
+        self.idf = vectorizer.idf_.astype(np.float32)
+        self.sublinear_tf = vectorizer.sublinear_tf
+        self.nmf = nmf
+        self.fitted_at = datetime.utcnow()
+        self.updates = 0
+
+        # Term -> column, plus a reserved id marking document boundaries
+        self._columns = {term: i for i, term in enumerate(self.terms)}
+        self._columns[_DOC_SEPARATOR] = -2
+
+    def transform(self, texts: List[str]) -> sp.csr_matrix:
+        """
+        TF-IDF vectorize texts against the fitted vocabulary
+
+        Matches TfidfVectorizer.transform (lowercasing, 2+ character word
+        tokens, optional sublinear TF, IDF weighting, L2 rows) but tokenizes
+        all texts in one pass with str.translate/str.split.
+        """
+        joined = _DOC_SEPARATOR.join(texts)
+        if joined.count(_DOC_SEPARATOR) != max(len(texts) - 1, 0):
+            joined = _DOC_SEPARATOR.join(text.replace(_DOC_SEPARATOR, " ") for text in texts)
+        tokens = (
+            joined.lower()
+            .translate(_SPLIT_TABLE)
+            .replace(_DOC_SEPARATOR, f" {_DOC_SEPARATOR} ")
+            .split()
+        )
+
+        ids = np.fromiter(map(self._columns.get, tokens, itertools.repeat(-1)), dtype=np.int64, count=len(tokens))
+        rows = np.cumsum(ids == -2)
+        known = ids >= 0
+
+        # Duplicate (row, column) pairs are summed into term counts
+        matrix = sp.csr_matrix(
+            (np.ones(int(known.sum()), dtype=np.float32), (rows[known], ids[known])),
+            shape=(len(texts), len(self.terms))
+        )
+        if self.sublinear_tf:
+            np.log(matrix.data, out=matrix.data)
+            matrix.data += 1
+        matrix = matrix @ sp.diags(self.idf)
+        return normalize(matrix, copy=False)
+
+    def name_topics(self, top_terms: np.ndarray) -> List[str]:
+        """
+        Name each NMF component, reusing earlier names where the topic is the same
+
+        Components are matched to the previously named topics by overlap of
+        their top terms (best overlaps first, each name used once), so a name
+        survives partial_fit drift and components trading places. Components
+        without a match are named after their current top terms.
+
+        Args:
+            top_terms: Term columns per component, strongest first
+        """
+        current = [set(self.terms[row[:_NAME_TERMS]]) for row in top_terms]
+        pairs = sorted(
+            (
+                (len(terms & named) / len(terms | named), i, j)
+                for i, terms in enumerate(current)
+                for j, named in enumerate(self.topic_terms)
+            ),
+            reverse=True
+        )
+
+        names = [None] * len(current)
+        reused = set()
+        for overlap, i, j in pairs:
+            if overlap < _NAME_MIN_OVERLAP:
+                break
+            if names[i] is None and j not in reused:
+                names[i] = self.topic_names[j]
+                reused.add(j)
+
+        for i, name in enumerate(names):
+            if name is None:
+                keywords = [str(term) for term in self.terms[top_terms[i][:5]]]
+                names[i] = _topic_name(keywords, {n for n in names if n is not None})
+
+        self.topic_names = names
+        self.topic_terms = current
+        return names
+
+
+class TopicModeler:
+    """TF-IDF + NMF topic extraction with per-product vocabulary reuse"""
+
+    def __init__(
+        self,
+        n_topics: int = 8,
+        max_features: int = 5000,
+        model_dir: Optional[str] = None,
+        max_cached: int = 64
+    ):
+        """
+        Initialize topic modeler
+
+        Args:
+            n_topics: Topics per product
+            max_features: Vocabulary size cap
+            model_dir: Directory to persist per-product vocabularies in
+                (None keeps them in memory only)
+            max_cached: Product vocabularies kept in memory (LRU)
+        """
+        self.n_topics = n_topics
+        self.max_features = max_features
+        self.model_dir = Path(model_dir) if model_dir else None
+        self.max_cached = max_cached
+        self._vocabularies: "OrderedDict[int, ProductVocabulary]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def extract(self, product_id: int, texts: List[str], scores: List[float]) -> Dict[str, dict]:
+        """
+        Extract topics from one analysis's comments
+
+        Every comment is assigned to its strongest topic; comments sharing
+        no term with the vocabulary are left unassigned.
+
+        Args:
+            product_id: Product the comments belong to (selects the vocabulary)
+            texts: Comment texts
+            scores: Sentiment score per comment (-1 to 1)
+
+        Returns:
+            {topic name: {"count", "keywords", "keyword_counts", "sentiment_sum",
+            "avg_sentiment"}}, the same shape as TopicMatcher.aggregate
+        """
+        return self.extract_split(product_id, texts, scores, 0)[0]
+
+    def extract_split(self, product_id: int, texts: List[str], scores: List[float], new_from: int) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+        """
+        Extract topics from all comments and, separately, from the new ones
+
+        Comments before new_from were already seen in an earlier analysis
+        (inherited by an incremental one): they count towards the topics but
+        do not update the model again.
+
+        Returns:
+            (topics of all comments, topics of the comments from new_from on),
+            each shaped like extract()'s result
+        """
+        vocabulary = self._get_vocabulary(product_id)
+        if vocabulary is None:
+            vocabulary, matrix = self._fit(texts)
+            logger.info(f"Fitted topic vocabulary for product {product_id}: "
+                        f"{len(vocabulary.terms)} terms, {vocabulary.nmf.n_components} topics")
+        else:
+            matrix = vocabulary.transform(texts)
+            sample = matrix[new_from:]
+            if sample.shape[0] > _UPDATE_SAMPLE_SIZE:
+                sampled = np.random.default_rng(vocabulary.updates).choice(sample.shape[0], _UPDATE_SAMPLE_SIZE, replace=False)
+                sample = sample[sampled]
+            if sample.shape[0]:
+                vocabulary.nmf.partial_fit(sample)
+                vocabulary.updates += 1
+        top_terms = np.argsort(-vocabulary.nmf.components_, axis=1)[:, :max(_NAME_TERMS, 5)]
+        names = vocabulary.name_topics(top_terms)
+        self._store_vocabulary(product_id, vocabulary)
+
+        weights = _solve_weights(matrix, vocabulary.nmf.components_)
+        assigned = weights.max(axis=1) > 0
+        rows = np.flatnonzero(assigned)
+        membership = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, weights[rows].argmax(axis=1))),
+            shape=weights.shape
+        )
+        scores = np.asarray(scores, dtype=np.float32)
+
+        topics = _summarize(vocabulary, names, top_terms, matrix, membership, scores)
+        if not new_from:
+            return topics, topics
+        new_topics = _summarize(
+            vocabulary, names, top_terms, matrix[new_from:], membership[new_from:], scores[new_from:]
+        )
+        return topics, new_topics
+
+    def _fit(self, texts: List[str]):
+        """Fit a product's vocabulary and NMF model from scratch"""
+        vectorizer = TfidfVectorizer(
+            max_features=self.max_features,
+            min_df=2,
+            max_df=0.95,
+            stop_words="english",
+            sublinear_tf=True,
+            dtype=np.float32
+        )
+        matrix = vectorizer.fit_transform(texts)
+        n_topics = min(self.n_topics, matrix.shape[0], matrix.shape[1])
+        nmf = MiniBatchNMF(n_components=n_topics, init="nndsvda", batch_size=2048, random_state=0)
+        nmf.fit(matrix)
+        return ProductVocabulary(vectorizer, nmf), matrix
+
+    def _get_vocabulary(self, product_id: int) -> Optional[ProductVocabulary]:
+        with self._lock:
+            vocabulary = self._vocabularies.get(product_id)
+            if vocabulary is not None:
+                self._vocabularies.move_to_end(product_id)
+                return vocabulary
+
+        path = self._path(product_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            vocabulary = joblib.load(path)
+        except Exception as e:
+            logger.warning(f"Failed to load topic vocabulary {path}: {e}. Refitting.")
+            return None
+
+        with self._lock:
+            self._remember(product_id, vocabulary)
+        return vocabulary
+
+    def _store_vocabulary(self, product_id: int, vocabulary: ProductVocabulary):
+        with self._lock:
+            self._remember(product_id, vocabulary)
+
+        path = self._path(product_id)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so concurrent workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            os.close(fd)
+            joblib.dump(vocabulary, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to save topic vocabulary {path}: {e}")
+
+    def _remember(self, product_id: int, vocabulary: ProductVocabulary):
+        self._vocabularies[product_id] = vocabulary
+        self._vocabularies.move_to_end(product_id)
+        while len(self._vocabularies) > self.max_cached:
+            self._vocabularies.popitem(last=False)
+
+    def _path(self, product_id: int) -> Optional[Path]:
+        if self.model_dir is None:
+            return None
+        return self.model_dir / f"product_{product_id}.joblib"
+
+
+def _solve_weights(matrix: sp.csr_matrix, components: np.ndarray) -> np.ndarray:
+    """
+    Non-negative comment -> topic weights W with X ~ W @ H for fixed H
+
+    Starts from the projection X @ H.T (already close for TF-IDF rows) and
+    refines it with the Frobenius multiplicative update NMF itself uses.
+    """
+    components = components.astype(np.float32, copy=False)
+    projection = np.asarray(matrix @ components.T)
+    gram = components @ components.T
+    weights = projection.copy()
+    for _ in range(_WEIGHT_ITERATIONS):
+        weights *= projection / np.maximum(weights @ gram, 1e-10)
+    return weights
+
+
+def _summarize(
+    vocabulary: ProductVocabulary,
+    names: List[str],
+    top_terms: np.ndarray,
+    matrix: sp.csr_matrix,
+    membership: sp.csr_matrix,
+    scores: np.ndarray
+) -> Dict[str, dict]:
+    """Topic sizes, sentiment and keyword counts from the one-hot comment -> topic assignment"""
+    counts = np.asarray(membership.sum(axis=0)).ravel()
+    sentiment_sums = membership.T @ scores
+
+    # Comments per topic containing each term
+    presence = matrix.copy()
+    presence.data[:] = 1
+    term_counts = (membership.T @ presence).toarray()
+
+    result = {}
+    for topic in np.flatnonzero(counts):
+        columns = top_terms[topic][:5]
+        keywords = [str(term) for term in vocabulary.terms[columns]]
+        result[names[topic]] = {
+            "count": int(counts[topic]),
+            "keywords": keywords,
+            "keyword_counts": {
+                keyword: int(term_counts[topic, column])
+                for keyword, column in zip(keywords, columns)
+                if term_counts[topic, column]
+            },
+            "sentiment_sum": float(sentiment_sums[topic]),
+            "avg_sentiment": float(sentiment_sums[topic] / counts[topic]),
+        }
+    return result
+
+
+def _topic_name(keywords: List[str], taken: set) -> str:
+    """
+    Name a topic after its top terms, adding terms until the name is unique
+
+    Names are cut to MAX_TOPIC_NAME_LENGTH characters (the name columns' size).
+    """
+    for size in range(2, len(keywords) + 1):
+        name = " / ".join(keywords[:size])[:MAX_TOPIC_NAME_LENGTH]
+        if name not in taken:
+            return name
+    number = len(taken) + 1
+    while True:
+        suffix = f" ({number})"
+        name = " / ".join(keywords)[:MAX_TOPIC_NAME_LENGTH - len(suffix)] + suffix
+        if name not in taken:
+            return name
+        number += 1
+
+
+# Global instance (lazy loading)
+_topic_modeler = None
+
+
+def get_topic_modeler() -> TopicModeler:
+    """Get or create the global topic modeler instance"""
+    global _topic_modeler
+    if _topic_modeler is None:
+        from app.core.config import settings
+
+        _topic_modeler = TopicModeler(
+            n_topics=settings.TOPIC_MODEL_TOPICS,
+            max_features=settings.TOPIC_MODEL_MAX_FEATURES,
+            model_dir=settings.TOPIC_MODEL_DIR or None
+        )
+    return _topic_modeler
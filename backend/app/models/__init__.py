@@ -2,8 +2,13 @@
 from .database_models import (
     Product,
     Analysis,
+    AnalysisBatch,
+    AnalysisBatchItem,
     CustomerComment,
     Topic,
+    ProductTopicAggregate,
+    ScrapeCursor,
+    CommentFingerprint,
     SentimentType,
     AnalysisStatus
 )
@@ -11,8 +16,13 @@ from .database_models import (
 __all__ = [
     "Product",
     "Analysis",
+    "AnalysisBatch",
+    "AnalysisBatchItem",
     "CustomerComment",
     "Topic",
+    "ProductTopicAggregate",
+    "ScrapeCursor",
+    "CommentFingerprint",
     "SentimentType",
     "AnalysisStatus"
 ]
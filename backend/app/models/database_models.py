@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Text, ForeignKey, Enum, Boolean, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -30,14 +30,39 @@ class Product(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Latest completed analysis and its summary, maintained on completion
+    # (see app/core/product_summary.py) so reads don't search analyses
+    latest_completed_analysis_id = Column(
+        Integer, ForeignKey("analyses.id", use_alter=True, name="fk_products_latest_completed_analysis", ondelete="SET NULL"),
+        nullable=True
+    )
+    previous_completed_analysis_id = Column(
+        Integer, ForeignKey("analyses.id", use_alter=True, name="fk_products_previous_completed_analysis", ondelete="SET NULL"),
+        nullable=True
+    )
+    latest_completed_at = Column(DateTime(timezone=True), nullable=True)
+    latest_total_comments = Column(Integer, nullable=True)
+    latest_positive_count = Column(Integer, nullable=True)
+    latest_negative_count = Column(Integer, nullable=True)
+    latest_avg_sentiment = Column(Float, nullable=True)
+    latest_churn_risk_score = Column(Float, nullable=True)
+    
     # Relationships
-    analyses = relationship("Analysis", back_populates="product", cascade="all, delete-orphan")
+    analyses = relationship("Analysis", back_populates="product", cascade="all, delete-orphan",
+                            foreign_keys="Analysis.product_id")
     comments = relationship("CustomerComment", back_populates="product", cascade="all, delete-orphan")
+    topic_aggregates = relationship("ProductTopicAggregate", back_populates="product", cascade="all, delete-orphan")
+    scrape_cursors = relationship("ScrapeCursor", back_populates="product", cascade="all, delete-orphan")
+    comment_fingerprints = relationship("CommentFingerprint", back_populates="product", cascade="all, delete-orphan")
 
 
 class Analysis(Base):
     """Analysis job for a product"""
     __tablename__ = "analyses"
+    __table_args__ = (
+        # Latest completed analysis of a product (dashboard, spike alerts, saved products)
+        Index("ix_analyses_product_status_completed", "product_id", "status", "completed_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -51,20 +76,56 @@ class Analysis(Base):
     neutral_count = Column(Integer, default=0)
     churn_risk_score = Column(Float, nullable=True)  # 0 to 1
     
+    # Incremental re-analyses reference the previous completed analysis and
+    # inherit its comments posted since inherited_since, instead of copying
+    # them (see app/core/scrape_cursors.py)
+    base_analysis_id = Column(Integer, ForeignKey("analyses.id", ondelete="SET NULL"), nullable=True)
+    inherited_since = Column(DateTime(timezone=True), nullable=True)  # None = no age limit
+    
     # Metadata
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
-    product = relationship("Product", back_populates="analyses")
+    product = relationship("Product", back_populates="analyses", foreign_keys=[product_id])
     comments = relationship("CustomerComment", back_populates="analysis", cascade="all, delete-orphan")
     topics = relationship("Topic", back_populates="analysis", cascade="all, delete-orphan")
 
 
+class AnalysisBatch(Base):
+    """A group of analyses started together through the batch endpoint"""
+    __tablename__ = "analysis_batches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    total = Column(Integer, default=0, nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)  # Set once every analysis has finished
+    
+    # Relationships
+    items = relationship("AnalysisBatchItem", back_populates="batch", cascade="all, delete-orphan")
+
+
+class AnalysisBatchItem(Base):
+    """Membership of an analysis in a batch"""
+    __tablename__ = "analysis_batch_items"
+    
+    batch_id = Column(Integer, ForeignKey("analysis_batches.id"), primary_key=True)
+    analysis_id = Column(Integer, ForeignKey("analyses.id"), primary_key=True)
+    coalesced = Column(Boolean, default=False, nullable=False)  # Joined an already running/recent analysis
+    
+    # Relationships
+    batch = relationship("AnalysisBatch", back_populates="items")
+
+
 class CustomerComment(Base):
     """Individual customer comment/review"""
     __tablename__ = "customer_comments"
+    __table_args__ = (
+        # An analysis's comments, newest first (dashboard recent comments)
+        Index("ix_customer_comments_analysis_scraped", "analysis_id", "scraped_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -93,6 +154,9 @@ class CustomerComment(Base):
 class Topic(Base):
     """Topics extracted from customer comments"""
     __tablename__ = "topics"
+    __table_args__ = (
+        Index("ix_topics_analysis_mentions", "analysis_id", "mention_count"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     analysis_id = Column(Integer, ForeignKey("analyses.id"), nullable=False)
@@ -108,6 +172,70 @@ class Topic(Base):
     analysis = relationship("Analysis", back_populates="topics")
 
 
+class ProductTopicAggregate(Base):
+    """Rolling topic totals per product, one row per topic per day"""
+    __tablename__ = "product_topic_aggregates"
+    __table_args__ = (
+        UniqueConstraint("product_id", "bucket_date", "name", name="uq_product_topic_aggregates_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    bucket_date = Column(Date, nullable=False)  # UTC day the analyses completed
+    name = Column(String(100), nullable=False)
+    
+    # Running totals over the bucket's analyses
+    mention_count = Column(Integer, default=0, nullable=False)
+    sentiment_sum = Column(Float, default=0.0, nullable=False)
+    keyword_counts = Column(JSON, nullable=True)  # {keyword: mentions}
+    analysis_count = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    product = relationship("Product", back_populates="topic_aggregates")
+
+
+class ScrapeCursor(Base):
+    """Newest comment already scraped per product and source (incremental scraping)"""
+    __tablename__ = "scrape_cursors"
+    __table_args__ = (
+        UniqueConstraint("product_id", "source", name="uq_scrape_cursors_source"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    source = Column(String(100), nullable=False)  # CustomerComment.source
+    
+    last_posted_at = Column(DateTime(timezone=True), nullable=True)
+    last_source_url = Column(String(500), nullable=True)  # URL of the newest comment
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    product = relationship("Product", back_populates="scrape_cursors")
+
+
+class CommentFingerprint(Base):
+    """Scored representative comment of a duplicate group (see app/ml/dedup.py)"""
+    __tablename__ = "comment_fingerprints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    model = Column(String(255), nullable=False)  # Sentiment model that produced the result
+    
+    exact_hash = Column(String(32), nullable=False)  # app.ml.dedup.reuse_key of the text
+    
+    sentiment = Column(Enum(SentimentType), nullable=False)
+    sentiment_score = Column(Float, nullable=False)
+    confidence = Column(Float, nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    product = relationship("Product", back_populates="comment_fingerprints")
+
+
 class User(Base):
     """User accounts for authentication"""
     __tablename__ = "users"
@@ -150,6 +278,10 @@ class NotificationPreference(Base):
 class SavedProduct(Base):
     """Products saved/tracked by users"""
     __tablename__ = "saved_products"
+    __table_args__ = (
+        # A user's saved products, newest first (paginated list)
+        Index("ix_saved_products_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, field_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
+from app.core.config import settings
 from app.models.database_models import SentimentType, AnalysisStatus
 
 
@@ -61,6 +62,17 @@ class TopicResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TopicAggregateResponse(BaseModel):
+    """A topic's totals across a product's analyses over a time window"""
+    name: str
+    mention_count: int
+    avg_sentiment: Optional[float] = None
+    keywords: List[str] = []
+    analysis_count: int
+    first_seen: date
+    last_seen: date
+
+
 # Analysis Schemas
 class AnalysisRequest(BaseModel):
     product_name: str = Field(..., min_length=1, max_length=255)
@@ -89,6 +101,10 @@ class DashboardData(BaseModel):
     latest_analysis: Optional[AnalysisResponse] = None
     recent_comments: List[CommentResponse] = []
     topics: List[TopicResponse] = []
+    topic_trends: List[TopicAggregateResponse] = Field(
+        default_factory=list,
+        description="Top topics across the product's analyses over the last TOPIC_TRENDS_DAYS days"
+    )
     
     # Additional computed metrics
     sentiment_distribution: dict = Field(
@@ -114,6 +130,57 @@ class AnalysisJobResponse(BaseModel):
         default=60,
         description="Estimated time to complete analysis"
     )
+    coalesced: bool = Field(
+        default=False,
+        description="True if the request joined an existing running or recent analysis"
+    )
+
+
+class BatchAnalysisRequest(BaseModel):
+    """Products to analyze in one batch"""
+    product_names: List[str] = Field(..., min_length=1, max_length=settings.BATCH_MAX_PRODUCTS)
+    
+    @field_validator("product_names")
+    @classmethod
+    def unique_names(cls, names: List[str]) -> List[str]:
+        """Strip names and drop blanks and repeats, keeping the first occurrence's order"""
+        names = list(dict.fromkeys(name.strip() for name in names if name.strip()))
+        if not names:
+            raise ValueError("No product names given")
+        too_long = [name for name in names if len(name) > 255]
+        if too_long:
+            raise ValueError(f"Product names must be at most 255 characters: {too_long[0][:50]!r}...")
+        return names
+
+
+class BatchAnalysisItem(BaseModel):
+    product_name: str
+    analysis_id: int
+    coalesced: bool = False
+
+
+class BatchAnalysisResponse(BaseModel):
+    """Response after initiating a batch of analyses"""
+    message: str
+    batch_id: int
+    total: int
+    queued: int = Field(description="Analyses newly started by this batch")
+    coalesced: int = Field(description="Products that joined an existing running or recent analysis")
+    analyses: List[BatchAnalysisItem] = []
+
+
+class BatchStatusResponse(BaseModel):
+    """Aggregated progress of a batch"""
+    batch_id: int
+    status: str = Field(description="in_progress until every analysis has completed or failed, then completed")
+    total: int
+    pending: int = 0
+    in_progress: int = 0
+    completed: int = 0
+    failed: int = 0
+    progress: float = Field(description="Percentage of analyses that have finished (completed or failed)")
+    created_at: datetime
+    completed_at: Optional[datetime] = None
 
 
 # User & Authentication Schemas
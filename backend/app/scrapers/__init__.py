@@ -1,4 +1,5 @@
 # Scrapers Module
-from .web_scraper import WebScraper, Comment, create_scraper
+from .web_scraper import WebScraper, Comment, create_scraper, get_scraper, close_scraper
+from .scheduler import ScrapeScheduler, CircuitOpenError
 
-__all__ = ["WebScraper", "Comment", "create_scraper"]
+__all__ = ["WebScraper", "Comment", "create_scraper", "get_scraper", "close_scraper", "ScrapeScheduler", "CircuitOpenError"]
@@ -0,0 +1,128 @@
+"""
+On-disk HTTP response cache for conditional requests
+
+Pages served with an ETag or Last-Modified are stored with those
+validators. The next fetch of the same URL sends If-None-Match /
+If-Modified-Since, and a 304 Not Modified is answered from disk, so
+unchanged pages cost a round trip but no transfer.
+
+Entries are single JSON files written atomically (write then rename), so
+concurrent workers sharing the directory never read a partial entry. The
+oldest entries are pruned once there are more than max_entries.
+"""
+
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+# Prune at most once per this many stores
+_PRUNE_INTERVAL = 100
+
+
+class CachedResponse:
+    """A stored response and its validators"""
+
+    def __init__(self, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that make the next request conditional on this response"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Directory of cached responses keyed by URL and query parameters"""
+
+    def __init__(self, directory: str, max_entries: int = 10000):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self._stores = 0
+
+        self.hits = 0  # 304s answered from disk
+        self.misses = 0
+
+    def get(self, url: str, params: Optional[Mapping] = None) -> Optional[CachedResponse]:
+        path = self._path(url, params)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable HTTP cache entry {path}: {e}")
+            return None
+        return CachedResponse(entry["body"], entry.get("etag"), entry.get("last_modified"))
+
+    def store(self, url: str, params: Optional[Mapping], headers: Mapping[str, str], body: str) -> bool:
+        """
+        Store a 200 response if it carries validators
+
+        Returns:
+            True if stored
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return False
+
+        path = self._path(url, params)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"url": url, "etag": etag, "last_modified": last_modified, "body": body}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write HTTP cache entry {path}: {e}")
+            return False
+
+        self._stores += 1
+        if self._stores % _PRUNE_INTERVAL == 0:
+            self.prune()
+        return True
+
+    def prune(self) -> int:
+        """Delete the least recently written entries beyond max_entries"""
+        try:
+            entries = [(entry.stat().st_mtime, entry) for entry in self.directory.glob("*/*.json")]
+        except OSError:
+            return 0
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return 0
+        for _, entry in sorted(entries)[:excess]:
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+        return excess
+
+    def touch(self, url: str, params: Optional[Mapping] = None):
+        """Mark an entry as recently used (a 304 confirmed it)"""
+        try:
+            os.utime(self._path(url, params), (time.time(), time.time()))
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _path(self, url: str, params: Optional[Mapping]) -> Path:
+        key = url if not params else f"{url}?{json.dumps(dict(params), sort_keys=True, default=str)}"
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        # Two-level layout keeps directories small
+        return self.directory / digest[:2] / f"{digest}.json"
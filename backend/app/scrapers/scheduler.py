@@ -0,0 +1,319 @@
+"""
+Scrape Scheduler
+
+Keeps scraping polite and resilient at production scale:
+
+- Per-host token buckets cap the request rate to each host. With Redis the
+  buckets are shared by every worker (an atomic Lua refill-and-take), so
+  the limit holds fleet-wide; without it each process keeps its own.
+- A global semaphore bounds concurrent requests per process.
+- Failed requests (429, 5xx, connection errors, timeouts) are retried with
+  jittered exponential backoff, honoring Retry-After.
+- A circuit breaker per source stops requests to a source that keeps
+  failing, then lets a single trial request through after a cool-down.
+"""
+
+from typing import Dict, Mapping, NamedTuple, Optional
+from urllib.parse import urlsplit
+import asyncio
+import logging
+import random
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Reservation-style bucket: always take a token (the balance may go
+# negative) and return how long the caller must wait for it, so waiters
+# are served in arrival order. Uses the Redis clock, so workers agree.
+_TAKE_TOKEN_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate) - 1
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of requesting a source whose circuit breaker is open"""
+
+
+class FetchResult(NamedTuple):
+    """Final response of a scheduled request"""
+    status: int
+    headers: Mapping[str, str]  # Case-insensitive
+    body: str
+
+
+class TokenBucket:
+    """In-process token bucket (same reservation semantics as the Redis script)"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token; returns seconds to wait before using it"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate) - 1
+        self._updated = now
+        return max(0.0, -self._tokens / self.rate)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open)"""
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 60):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may go out (one trial request while half-open)"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial = False
+        if self._opened_at is not None or self.failures >= self.threshold:
+            # A failed trial re-opens for another full cool-down
+            self._opened_at = time.monotonic()
+
+
+class ScrapeScheduler:
+    """Rate-limited, bounded, retrying request scheduler for the scraper"""
+
+    def __init__(
+        self,
+        rate_per_host: float = 2.0,
+        burst_per_host: int = 5,
+        max_concurrency: int = 16,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 60.0,
+        redis_url: str = None
+    ):
+        """
+        Initialize scheduler
+
+        Args:
+            rate_per_host: Sustained requests per second to one host
+            burst_per_host: Requests to a host allowed back to back
+            max_concurrency: Max in-flight requests in this process
+            max_retries: Retries per request after the first attempt
+            backoff_base: First retry's max delay in seconds (doubles per attempt)
+            backoff_max: Cap on a single retry delay
+            breaker_threshold: Consecutive failed attempts that open a source's breaker
+            breaker_reset: Seconds a breaker stays open before a trial request
+            redis_url: Redis URL for fleet-wide host buckets (None = per process)
+        """
+        self.rate_per_host = rate_per_host
+        self.burst_per_host = burst_per_host
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.redis_url = redis_url
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._redis = None
+        self._take_token = None
+
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0  # 429 responses
+        self.rejected = 0  # Requests refused by an open breaker
+
+    def breaker(self, source: str) -> CircuitBreaker:
+        if source not in self._breakers:
+            self._breakers[source] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+        return self._breakers[source]
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str, source: str, **kwargs) -> str:
+        """GET a URL under the rate limits (see request) and return its body"""
+        return (await self.request(session, url, source, **kwargs)).body
+
+    async def request(self, session: aiohttp.ClientSession, url: str, source: str, **kwargs) -> FetchResult:
+        """
+        GET a URL under the rate limits, retrying transient failures
+
+        Args:
+            session: Session to request with
+            url: URL to fetch
+            source: Source the request belongs to (selects the circuit breaker)
+            **kwargs: Passed to session.get
+
+        Returns:
+            Status, headers and body of the final (2xx/3xx) response
+
+        Raises:
+            CircuitOpenError: The source's breaker is open
+            aiohttp.ClientError / asyncio.TimeoutError: Retries exhausted
+        """
+        breaker = self.breaker(source)
+        host = urlsplit(url).hostname or ""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        attempt = 0
+        while True:
+            retry_after = None
+            trial = False
+            try:
+                async with self._semaphore:
+                    # Checked once a slot is free, so queued requests see failures
+                    # that happened while they waited; retries stop once it opens
+                    half_open = breaker.state == "half_open"
+                    if not (breaker.allow() if attempt == 0 else breaker.state != "open"):
+                        self.rejected += 1
+                        raise CircuitOpenError(f"Circuit open for source {source!r}")
+                    trial = attempt == 0 and half_open
+                    await self._wait_for_token(host)
+                    self.requests += 1
+                    async with session.get(url, **kwargs) as response:
+                        if response.status not in RETRY_STATUSES:
+                            response.raise_for_status()
+                            body = await response.text()
+                            breaker.record_success()
+                            return FetchResult(response.status, response.headers.copy(), body)
+                        if response.status == 429:
+                            self.throttled += 1
+                        retry_after = _retry_after(response.headers.get("Retry-After"))
+                        error = aiohttp.ClientResponseError(
+                            response.request_info, response.history,
+                            status=response.status, message=response.reason or ""
+                        )
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES:
+                    # Other 4xx are not transient, and the source did answer
+                    breaker.record_success()
+                    raise
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            except BaseException:
+                # Cancelled or failed without an answer from the source: the trial
+                # still has to end, or the breaker stays half-open with its one
+                # trial slot taken and rejects every later request
+                if trial:
+                    breaker.record_failure()
+                raise
+
+            if getattr(error, "status", None) == 429:
+                # Throttled means the source is up; pacing is the token bucket's job
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            if attempt >= self.max_retries:
+                logger.warning(f"Giving up on {url} after {attempt + 1} attempts: {error}")
+                raise error
+
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            self.retries += 1
+            logger.debug(f"Retrying {url} in {delay:.2f}s (attempt {attempt}): {error}")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, any]:
+        """Counters and breaker states for monitoring"""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "breakers": {source: breaker.state for source, breaker in self._breakers.items()},
+            "redis_enabled": self._redis is not None,
+        }
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, never sooner than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    async def _wait_for_token(self, host: str):
+        wait = await self._reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _reserve(self, host: str) -> float:
+        if self.redis_url and self._redis is None:
+            self._connect_redis()
+        if self._redis is not None:
+            try:
+                wait = await self._take_token(
+                    keys=[f"scrape:bucket:{host}"],
+                    args=[self.rate_per_host, self.burst_per_host]
+                )
+                return float(wait)
+            except Exception as e:
+                logger.warning(f"Shared rate limiter unavailable: {e}. Limiting per process.")
+                self._redis = None
+                self.redis_url = None
+
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate_per_host, self.burst_per_host)
+        return bucket.reserve()
+
+    def _connect_redis(self):
+        try:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.Redis.from_url(self.redis_url, socket_timeout=1)
+            self._take_token = self._redis.register_script(_TAKE_TOKEN_SCRIPT)
+        except Exception as e:
+            logger.warning(f"Shared rate limiter unavailable: {e}. Limiting per process.")
+            self._redis = None
+            self.redis_url = None
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds form only)"""
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
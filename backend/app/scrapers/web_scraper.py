@@ -8,12 +8,16 @@ Implements a unique multi-source scraping approach.
 import aiohttp
 import asyncio
 from bs4 import BeautifulSoup
-from typing import List, Dict
-from datetime import datetime
+from typing import AsyncIterator, List, Dict, Optional
+from datetime import datetime, timezone
+import json
 import logging
 import re
 from urllib.parse import quote_plus
 
+from .http_cache import HttpCache
+from .scheduler import CircuitOpenError, ScrapeScheduler
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,9 +42,53 @@ class Comment:
 class WebScraper:
     """Multi-source web scraper for customer feedback"""
     
-    def __init__(self, user_agent: str, timeout: int = 30):
+    # Source name -> (scraper method, share of max_results); add new sources here
+    SOURCES = {
+        "reddit": ("scrape_reddit_style", 0.4),
+        "review_sites": ("scrape_review_sites", 0.3),
+        "twitter": ("scrape_twitter_style", 0.3),
+    }
+    
+    # Sources that can be fetched over HTTP instead of simulated (with
+    # live_sources): source name -> method taking (product_name, max_results, since)
+    LIVE_SOURCES = {
+        "reddit": "fetch_reddit",
+    }
+    
+    def __init__(
+        self,
+        user_agent: str,
+        timeout: int = 30,
+        connection_limit: int = 100,
+        limit_per_host: int = 8,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        scheduler: Optional[ScrapeScheduler] = None,
+        http_cache: Optional[HttpCache] = None,
+        live_sources: bool = False
+    ):
+        """
+        Initialize scraper
+        
+        Args:
+            user_agent: User-Agent header for all requests
+            timeout: Total timeout per request in seconds
+            connection_limit: Max open connections in the session's pool
+            limit_per_host: Max concurrent connections to one host
+            keepalive_timeout: Seconds an idle connection stays open for reuse
+            dns_cache_ttl: Seconds resolved addresses are cached
+            scheduler: Rate limiting / retry / circuit breaking for fetch()
+                (default: a per-process ScrapeScheduler)
+            http_cache: On-disk cache for conditional requests (None disables it)
+            live_sources: Fetch the sources in LIVE_SOURCES over HTTP (through
+                fetch()) instead of generating synthetic comments for them
+        """
         self.user_agent = user_agent
         self.timeout = timeout
+        self.connection_limit = connection_limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
         self.headers = {
             'User-Agent': user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -48,6 +96,76 @@ class WebScraper:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         }
+        self.scheduler = scheduler or ScrapeScheduler()
+        self.http_cache = http_cache
+        self.live_sources = live_sources
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the scraper's pooled HTTP session, creating it on first use
+        
+        The session's connector keeps connections alive and caches DNS, so
+        requests (and analyses, when the scraper is shared via get_scraper)
+        reuse TCP/TLS connections instead of handshaking again. A session
+        belongs to the event loop it was created on.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            if self._session is not None and not self._session.closed:
+                logger.warning("Scraper used from a new event loop; opening a new HTTP session")
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._session_loop = loop
+        return self._session
+    
+    async def fetch(self, url: str, source: str, **params) -> str:
+        """
+        GET a page through the pooled session and return its body
+        
+        Goes through the scheduler: per-host rate limits, bounded
+        concurrency, retries with backoff and the source's circuit breaker.
+        With an HTTP cache, pages fetched before are requested conditionally
+        and a 304 Not Modified is served from disk.
+        """
+        session = await self.get_session()
+        cached = None
+        if self.http_cache is not None:
+            cached = await asyncio.to_thread(self.http_cache.get, url, params)
+        
+        result = await self.scheduler.request(
+            session, url, source,
+            params=params or None,
+            headers=cached.conditional_headers() if cached else None
+        )
+        
+        if self.http_cache is None:
+            return result.body
+        if result.status == 304 and cached is not None:
+            self.http_cache.hits += 1
+            await asyncio.to_thread(self.http_cache.touch, url, params)
+            return cached.body
+        self.http_cache.misses += 1
+        if result.status == 200:
+            await asyncio.to_thread(self.http_cache.store, url, params, result.headers, result.body)
+        return result.body
+    
+    async def close(self):
+        """Close the pooled session and its connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
     
     async def scrape_reddit_style(self, product_name: str, max_results: int = 20) -> List[Comment]:
         """
@@ -113,6 +231,56 @@ class WebScraper:
         logger.info(f"Scraped {len(comments)} Reddit-style comments")
         return comments
     
+    async def fetch_reddit(
+        self,
+        product_name: str,
+        max_results: int = 20,
+        since: Optional[Dict[str, datetime]] = None
+    ) -> List[Comment]:
+        """
+        Fetch recent Reddit posts mentioning the product from the public search API
+        
+        Pages through newest-first results with fetch(), so requests are rate
+        limited, retried, circuit-broken and conditionally cached. Stops at
+        max_results or at the first post not newer than the "reddit" cursor.
+        """
+        logger.info(f"Fetching Reddit posts for: {product_name}")
+        
+        cursor = (since or {}).get("reddit")
+        comments = []
+        after = None
+        while len(comments) < max_results:
+            params = {"q": product_name, "sort": "new", "limit": min(100, max_results - len(comments)), "raw_json": 1}
+            if after:
+                params["after"] = after
+            listing = json.loads(await self.fetch(REDDIT_SEARCH_URL, "reddit", **params)).get("data") or {}
+            
+            for child in listing.get("children", []):
+                post = child.get("data") or {}
+                posted_at = datetime.utcfromtimestamp(post.get("created_utc", 0))
+                if cursor is not None and posted_at <= cursor:
+                    logger.info(f"Fetched {len(comments)} Reddit posts (reached the cursor)")
+                    return comments
+                text = "\n\n".join(part for part in (post.get("title"), post.get("selftext")) if part).strip()
+                if not text:
+                    continue
+                comments.append(Comment(
+                    text=text,
+                    source="reddit",
+                    author=post.get("author"),
+                    source_url=f"https://www.reddit.com{post['permalink']}" if post.get("permalink") else None,
+                    posted_at=posted_at
+                ))
+                if len(comments) >= max_results:
+                    break
+            
+            after = listing.get("after")
+            if not after:
+                break
+        
+        logger.info(f"Fetched {len(comments)} Reddit posts")
+        return comments
+    
     async def scrape_review_sites(self, product_name: str, max_results: int = 15) -> List[Comment]:
         """
         Simulate scraping from review aggregator sites
@@ -185,6 +353,47 @@ class WebScraper:
         logger.info(f"Scraped {len(comments)} Twitter-style comments")
         return comments
     
+    def source_limits(self, max_results: int) -> Dict[str, int]:
+        """Distribute max_results across sources"""
+        return {source: int(max_results * share) for source, (_, share) in self.SOURCES.items()}
+    
+    async def scrape_source(
+        self,
+        source: str,
+        product_name: str,
+        max_results: int,
+        since: Optional[Dict[str, datetime]] = None
+    ) -> List[Comment]:
+        """
+        Scrape a single source by name (see SOURCES)
+        
+        Args:
+            since: Cursors from app.core.scrape_cursors, {comment source:
+                newest posted_at already stored}; only newer comments are kept
+        """
+        if source not in self.SOURCES:
+            raise ValueError(f"Unknown source: {source}")
+        if self.scheduler.breaker(source).state == "open":
+            raise CircuitOpenError(f"Skipping source {source!r}: circuit open")
+        if self.live_sources and source in self.LIVE_SOURCES:
+            comments = await getattr(self, self.LIVE_SOURCES[source])(product_name, max_results, since)
+        else:
+            method, _ = self.SOURCES[source]
+            comments = await getattr(self, method)(product_name, max_results)
+        
+        if since:
+            fetched = len(comments)
+            comments = [c for c in comments if c.source not in since or _naive_utc(c.posted_at) > since[c.source]]
+            logger.info(f"Source {source}: {len(comments)} of {fetched} comments are new")
+        return comments
+    
+    def _source_jobs(self, product_name: str, max_results: int, since: Optional[Dict[str, datetime]] = None) -> list:
+        """Scraper coroutines for every source, with max_results split across them"""
+        return [
+            self.scrape_source(source, product_name, limit, since)
+            for source, limit in self.source_limits(max_results).items()
+        ]
+    
     async def scrape_all_sources(self, product_name: str, max_results: int = 50) -> List[Comment]:
         """
         Scrape from all available sources concurrently
@@ -198,17 +407,8 @@ class WebScraper:
         """
         logger.info(f"Starting multi-source scraping for: {product_name}")
         
-        # Distribute max_results across sources
-        reddit_limit = int(max_results * 0.4)
-        review_limit = int(max_results * 0.3)
-        twitter_limit = int(max_results * 0.3)
-        
         # Run scrapers concurrently
-        tasks = [
-            self.scrape_reddit_style(product_name, reddit_limit),
-            self.scrape_review_sites(product_name, review_limit),
-            self.scrape_twitter_style(product_name, twitter_limit)
-        ]
+        tasks = self._source_jobs(product_name, max_results)
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
@@ -222,8 +422,103 @@ class WebScraper:
         
         logger.info(f"Total comments scraped: {len(all_comments)}")
         return all_comments[:max_results]
+    
+    async def iter_sources(
+        self,
+        product_name: str,
+        max_results: int = 50,
+        since: Optional[Dict[str, datetime]] = None
+    ) -> AsyncIterator[List[Comment]]:
+        """
+        Scrape all sources concurrently, yielding each source's comments as soon as it finishes
+        
+        Lets callers start processing the fastest source while slower ones
+        are still running. At most max_results comments are yielded in total.
+        With `since` cursors only comments newer than them are yielded (see
+        scrape_source).
+        """
+        logger.info(f"Starting streaming multi-source scraping for: {product_name}")
+        
+        tasks = [asyncio.ensure_future(job) for job in self._source_jobs(product_name, max_results, since)]
+        remaining = max_results
+        try:
+            for future in asyncio.as_completed(tasks):
+                try:
+                    comments = await future
+                except Exception as e:
+                    logger.error(f"Scraper error: {e}")
+                    continue
+                
+                comments = comments[:remaining]
+                remaining -= len(comments)
+                if comments:
+                    yield comments
+                if remaining <= 0:
+                    break
+        finally:
+            # Don't leave slower sources running once we have enough
+            for task in tasks:
+                task.cancel()
+
+
+REDDIT_SEARCH_URL = "https://www.reddit.com/search.json"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Scraped times are naive UTC; normalize any timezone-aware ones to match"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
-def create_scraper(user_agent: str, timeout: int = 30) -> WebScraper:
+def create_scraper(user_agent: str, timeout: int = 30, **kwargs) -> WebScraper:
     """Factory function to create a web scraper instance"""
-    return WebScraper(user_agent, timeout)
+    return WebScraper(user_agent, timeout, **kwargs)
+
+
+# Global instance (lazy loading), shared so its session pool outlives a task
+_scraper = None
+
+
+def get_scraper() -> WebScraper:
+    """
+    Get or create the process-wide scraper
+    
+    Use it from the persistent loop (app.core.event_loop.run_async) so its
+    pooled session stays on one loop.
+    """
+    global _scraper
+    if _scraper is None:
+        from app.core.config import settings
+        
+        _scraper = create_scraper(
+            user_agent=settings.USER_AGENT,
+            timeout=settings.SCRAPE_TIMEOUT,
+            connection_limit=settings.SCRAPE_CONNECTION_LIMIT,
+            limit_per_host=settings.SCRAPE_LIMIT_PER_HOST,
+            keepalive_timeout=settings.SCRAPE_KEEPALIVE_TIMEOUT,
+            dns_cache_ttl=settings.SCRAPE_DNS_CACHE_TTL,
+            scheduler=ScrapeScheduler(
+                rate_per_host=settings.SCRAPE_RATE_PER_HOST,
+                burst_per_host=settings.SCRAPE_BURST_PER_HOST,
+                max_concurrency=settings.SCRAPE_MAX_CONCURRENCY,
+                max_retries=settings.SCRAPE_MAX_RETRIES,
+                backoff_base=settings.SCRAPE_BACKOFF_BASE,
+                backoff_max=settings.SCRAPE_BACKOFF_MAX,
+                breaker_threshold=settings.SCRAPE_BREAKER_THRESHOLD,
+                breaker_reset=settings.SCRAPE_BREAKER_RESET,
+                redis_url=settings.REDIS_URL if settings.SCRAPE_RATE_LIMIT_REDIS else None
+            ),
+            http_cache=HttpCache(
+                settings.SCRAPE_HTTP_CACHE_DIR,
+                max_entries=settings.SCRAPE_HTTP_CACHE_MAX_ENTRIES
+            ) if settings.SCRAPE_HTTP_CACHE_DIR else None,
+            live_sources=settings.SCRAPE_LIVE_SOURCES
+        )
+    return _scraper
+
+
+async def close_scraper():
+    """Close the process-wide scraper's session, if one was opened"""
+    if _scraper is not None:
+        await _scraper.close()
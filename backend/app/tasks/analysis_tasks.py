@@ -2,17 +2,28 @@
 Celery background tasks for analysis processing
 """
 from celery import Task
+from sqlalchemy import bindparam, update
 from app.core.celery_app import celery_app
 from app.core.database import SessionLocal
+from app.core.bulk_insert import bulk_insert
+from app.core.dashboard_cache import get_dashboard_cache
+from app.core.dedup_index import load_duplicate_index, save_duplicate_index
+from app.core.event_loop import run_async
+from app.core.product_summary import record_completed_analysis
+from app.core.progress import publish_progress
+from app.core.scrape_cursors import advance_cursors, carry_forward_comments, comment_scope, load_cursors
+from app.core.topic_aggregates import record_topics
 from app.models.database_models import (
     Product, Analysis, CustomerComment, Topic,
     AnalysisStatus, SentimentType
 )
-from app.scrapers import create_scraper
-from app.ml import get_sentiment_analyzer, get_churn_predictor
+from app.scrapers import get_scraper
+from app.ml import get_sentiment_analyzer, get_churn_predictor, get_topic_matcher, get_topic_modeler
+from app.ml.dedup import duplicate_weights, score_deduplicated
 from app.core.config import settings
+from app.tasks.pipeline import run_pipeline
 from datetime import datetime
-from typing import List
+from typing import Callable, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,47 +44,261 @@ class DatabaseTask(Task):
             self._db.close()
             self._db = None
 
+    def report_progress(self, analysis_id: int, step: str, progress: int, **meta):
+        """Record progress in the task result and push it to /stream subscribers"""
+        self.update_state(state='PROGRESS', meta={'step': step, 'progress': progress, **meta})
+        publish_progress(analysis_id, "in_progress", step, progress, **meta)
 
-def extract_topics(texts: List[str], sentiments: List[dict]) -> dict:
+
+def extract_topics(texts: List[str], sentiments: List[dict], product_id: int = None, new_from: int = 0) -> Tuple[dict, dict]:
     """
-    Simple topic extraction based on common keywords
+    Extract topics and their average sentiment from comments
+    
+    With TOPIC_MODEL_METHOD=nmf and enough comments, topics are discovered
+    with TF-IDF + NMF using the product's vocabulary (see
+    app/ml/topic_model.py). Otherwise, or if modeling fails, comments are
+    matched against the keyword taxonomy (see app/ml/topic_matcher.py).
+    
+    Comments before `new_from` were inherited from earlier analyses, whose
+    topics already went into the product's rolling aggregates.
+    
+    Returns:
+        (topics of all comments, topics of the comments from new_from on)
     """
-    from collections import defaultdict
-    import re
-    
-    topic_keywords = {
-        "price": ["price", "expensive", "cheap", "cost", "pricing", "affordable", "$"],
-        "quality": ["quality", "reliable", "durable", "broken", "defective"],
-        "support": ["support", "service", "help", "customer service", "response"],
-        "features": ["feature", "functionality", "capability", "option", "tool"],
-        "performance": ["fast", "slow", "performance", "speed", "lag", "responsive"],
-        "usability": ["easy", "difficult", "intuitive", "user-friendly", "complicated"],
+    if (
+        settings.TOPIC_MODEL_METHOD == "nmf"
+        and product_id is not None
+        and len(texts) >= settings.TOPIC_MODEL_MIN_COMMENTS
+    ):
+        try:
+            return get_topic_modeler().extract_split(product_id, texts, [s['score'] for s in sentiments], new_from)
+        except Exception as e:
+            logger.warning(f"Topic modeling failed for product {product_id}: {e}. Using keyword topics.")
+    
+    matcher = get_topic_matcher()
+    topics = matcher.aggregate(texts, sentiments)
+    if not new_from:
+        return topics, topics
+    return topics, matcher.aggregate(texts[new_from:], sentiments[new_from:])
+
+
+def _generate_demo_comments(product_name: str) -> list:
+    """Generate 15-25 realistic sample comments with mixed sentiment (demo mode)"""
+    from app.models.schemas import ScrapedComment
+    from datetime import timedelta
+    import random
+    
+    # Realistic sample comments
+    sample_templates = {
+        'positive': [
+            f"Great {product_name}! Really impressed with the quality and features.",
+            f"Absolutely love my {product_name}! Best purchase ever.",
+            f"The {product_name} exceeded my expectations. Highly recommend!",
+            f"Five stars! {product_name} is exactly what I needed.",
+            f"Best {product_name} on the market. Worth every penny!",
+        ],
+        'negative': [
+            f"Not happy with {product_name}. Customer service was terrible.",
+            f"Disappointed with {product_name}. Expected better quality.",
+            f"The {product_name} broke after just one week. Avoid!",
+            f"Waste of money. {product_name} doesn't work as advertised.",
+            f"Poor quality {product_name}. Don't recommend at all.",
+        ],
+        'neutral': [
+            f"The {product_name} is okay but has some issues with battery life.",
+            f"Average product. Nothing special about {product_name}.",
+            f"{product_name} is decent for the price but could be better.",
+            f"Mixed feelings about {product_name}. Some pros and cons.",
+            f"It's alright. {product_name} does the job but nothing impressive.",
+        ]
     }
     
-    topics = defaultdict(lambda: {"count": 0, "keywords": set(), "sentiments": []})
+    sources = ['Amazon', 'Reddit', 'Twitter', 'Trustpilot', 'Google Reviews']
+    comments = []
+    
+    # Generate 15-25 random comments with mixed sentiment
+    num_comments = random.randint(15, 25)
+    
+    for i in range(num_comments):
+        rand = random.random()
+        if rand < 0.50:  # 50% positive
+            sentiment_type = 'positive'
+        elif rand < 0.80:  # 30% negative
+            sentiment_type = 'negative'
+        else:  # 20% neutral
+            sentiment_type = 'neutral'
+        
+        comment = ScrapedComment(
+            text=random.choice(sample_templates[sentiment_type]),
+            source=random.choice(sources),
+            source_url=f"https://example.com/{product_name.lower().replace(' ', '-')}",
+            author=f"User{i+1}",
+            posted_at=datetime.now() - timedelta(days=random.randint(0, 30))
+        )
+        comments.append(comment)
     
-    for text, sentiment in zip(texts, sentiments):
+    return comments
+
+
+def _mock_sentiments(texts: List[str]) -> List[dict]:
+    """Simple keyword-based sentiment (demo mode, no ML models)"""
+    sentiments = []
+    for text in texts:
         text_lower = text.lower()
-        
-        for topic, keywords in topic_keywords.items():
-            for kw in keywords:
-                if kw in text_lower:
-                    topics[topic]["count"] += 1
-                    topics[topic]["sentiments"].append(sentiment['score'])
-                    if kw not in ["$"]:
-                        topics[topic]["keywords"].add(kw)
-    
-    # Calculate average sentiment for each topic
-    result = {}
-    for topic, data in topics.items():
-        if data["count"] > 0:
-            result[topic] = {
-                "count": data["count"],
-                "keywords": list(data["keywords"])[:5],
-                "avg_sentiment": sum(data["sentiments"]) / len(data["sentiments"])
-            }
+        if any(word in text_lower for word in ['great', 'love', 'excellent', 'best', 'impressed', 'amazing', 'five stars']):
+            sentiments.append({'sentiment': 'positive', 'score': 0.85, 'confidence': 0.9})
+        elif any(word in text_lower for word in ['terrible', 'worst', 'hate', 'awful', 'disappointed', 'poor', 'broke', 'waste']):
+            sentiments.append({'sentiment': 'negative', 'score': 0.15, 'confidence': 0.9})
+        else:
+            sentiments.append({'sentiment': 'neutral', 'score': 0.5, 'confidence': 0.8})
+    return sentiments
+
+
+def _deduplicating_scorer(db, product_id: int, model: str, score: Callable[[List[str]], List[dict]]):
+    """
+    Wrap a batch sentiment function so only one comment per exact duplicate group is scored
+    
+    The product's duplicate index (see app/ml/dedup.py) is loaded from the
+    database; pass it to save_duplicate_index once the comments are saved.
     
-    return result
+    Returns:
+        (score function, index or None, stats dict filled in while scoring)
+    """
+    stats = {"scored": 0, "exact": 0}
+    if not settings.DEDUP_ENABLED:
+        return score, None, stats
+    
+    index = load_duplicate_index(db, product_id, model, settings.DEDUP_MAX_DISTANCE, settings.DEDUP_INDEX_SIZE)
+    
+    def dedup_score(texts: List[str]) -> List[dict]:
+        sentiments, chunk_stats = score_deduplicated(texts, score, index)
+        for key, count in chunk_stats.items():
+            stats[key] += count
+        return sentiments
+    
+    return dedup_score, index, stats
+
+
+def _save_duplicate_index(db, product_id: int, model: str, index, stats: dict, label: str):
+    if index is None:
+        return
+    stored = save_duplicate_index(db, product_id, model, index, settings.DEDUP_INDEX_SIZE)
+    db.commit()
+    logger.info(f"{label} dedup: scored {stats['scored']}, reused {stats['exact']} duplicates; "
+                f"stored {stored} new representatives")
+
+
+def _complete_analysis(task: DatabaseTask, db, analysis: Analysis, product_name: str, texts: List[str], sentiments: List[dict], new_from: int = 0) -> dict:
+    """
+    Steps 4-7 of the analysis: metrics, churn risk, topics and the final update
+    
+    Shared by run_analysis_task and the per-source fan-out's merge callback.
+    The first `new_from` comments are inherited from earlier analyses (see
+    _load_saved_comments).
+    """
+    analysis_id = analysis.id
+    product_id = analysis.product_id
+    
+    if not texts:
+        analysis.status = AnalysisStatus.FAILED
+        analysis.error_message = "No comments found"
+        db.commit()
+        publish_progress(analysis_id, "failed", error="No comments found")
+        return {"error": "No comments found"}
+    
+    logger.info(f"Processed {len(texts)} comments")
+    task.report_progress(analysis_id, 'calculating_metrics', 70)
+    
+    # Step 4: Calculate aggregate metrics
+    sentiment_scores = [s['score'] for s in sentiments]
+    total = len(texts)
+    positive = sum(1 for s in sentiments if s['sentiment'] == 'positive')
+    negative = sum(1 for s in sentiments if s['sentiment'] == 'negative')
+    neutral = sum(1 for s in sentiments if s['sentiment'] == 'neutral')
+    
+    # Repeats (retweets, templated reviews, spam bursts) count for little in
+    # the averages, so one message posted 100 times doesn't swing them
+    if settings.DEDUP_ENABLED:
+        weights = duplicate_weights(texts, settings.DEDUP_DUPLICATE_WEIGHT, settings.DEDUP_MAX_DISTANCE)
+    else:
+        weights = [1.0] * total
+    total_weight = sum(weights)
+    avg_sentiment = sum(w * s for w, s in zip(weights, sentiment_scores)) / total_weight if total_weight else 0
+    negative_ratio = sum(w for w, s in zip(weights, sentiments) if s['sentiment'] == 'negative') / total_weight if total_weight else 0
+    
+    # Step 5: Predict churn risk
+    if settings.DEMO_MODE:
+        # Demo Mode: Use simple calculation (no ML model)
+        logger.info("DEMO MODE: Using mock churn prediction")
+        # Simple rule-based churn prediction
+        churn_result = {
+            'churn_probability': min(0.9, negative_ratio * 1.5 + (1 - avg_sentiment)) if negative_ratio > 0.3 else 0.2,
+            'risk_factors': ['Negative sentiment ratio', 'Low average sentiment'] if negative_ratio > 0.3 else []
+        }
+    else:
+        # Production Mode: Use real ML model
+        logger.info("PRODUCTION MODE: Using ML model for churn prediction")
+        churn_predictor = get_churn_predictor()
+        
+        sentiment_volatility = sum(w * abs(s - avg_sentiment) for w, s in zip(weights, sentiment_scores)) / total_weight if total_weight else 0
+        
+        churn_result = churn_predictor.predict_churn_from_sentiment(
+            avg_sentiment=avg_sentiment,
+            negative_ratio=negative_ratio,
+            total_comments=total,
+            sentiment_volatility=sentiment_volatility
+        )
+    
+    task.report_progress(analysis_id, 'extracting_topics', 85)
+    
+    # Step 6: Extract topics
+    topics, new_topics = extract_topics(texts, sentiments, product_id, new_from)
+    
+    bulk_insert(db, Topic.__table__, [
+        {
+            "analysis_id": analysis_id,
+            "name": topic_name,
+            "keywords": ", ".join(topic_data['keywords']),
+            "mention_count": topic_data['count'],
+            "avg_sentiment": topic_data['avg_sentiment']
+        }
+        for topic_name, topic_data in topics.items()
+    ])
+    
+    # Add to the product's rolling topic aggregate (inherited comments were
+    # added when the analysis they were scraped by completed)
+    record_topics(db, product_id, new_topics)
+    
+    # The next analysis of the product only scrapes comments newer than these
+    advance_cursors(db, product_id, analysis_id)
+    
+    # Step 7: Update analysis with final results
+    analysis.status = AnalysisStatus.COMPLETED
+    analysis.total_comments = total
+    analysis.positive_count = positive
+    analysis.negative_count = negative
+    analysis.neutral_count = neutral
+    analysis.avg_sentiment_score = avg_sentiment
+    analysis.churn_risk_score = churn_result['churn_probability']
+    analysis.completed_at = datetime.utcnow()
+    
+    # Same transaction: the product points at the analysis once it's visible as completed
+    record_completed_analysis(db, analysis)
+    
+    db.commit()
+    
+    # The product's dashboard now shows this analysis
+    get_dashboard_cache().invalidate(product_name)
+    publish_progress(analysis_id, "completed", "done", 100, comments=total)
+    
+    logger.info(f"Analysis task {analysis_id} completed successfully")
+    
+    return {
+        "status": "completed",
+        "analysis_id": analysis_id,
+        "total_comments": total,
+        "avg_sentiment": avg_sentiment
+    }
 
 
 @celery_app.task(bind=True, base=DatabaseTask, name='app.tasks.run_analysis')
@@ -81,16 +306,38 @@ def run_analysis_task(self, analysis_id: int, product_name: str):
     """
     Background task to run the complete analysis pipeline
     
+    With SCRAPE_INCREMENTAL, a re-analysis inherits the previous
+    analysis's comments and steps 1-3 only handle newer ones.
+    
+    With ANALYSIS_FANOUT, steps 1-3 instead run as one scrape_source_task
+    per source (on any worker) and merge_sources_task finishes steps 4-7.
+    
     Steps:
     1. Scrape customer comments from web
     2. Run sentiment analysis on each comment
-    3. Calculate aggregate metrics
-    4. Predict churn risk
-    5. Extract topics
-    6. Update analysis status
+    3. Save comments to the database
+       (steps 1-3 run overlapped as pipeline stages, see app/tasks/pipeline.py)
+    4. Calculate aggregate metrics
+    5. Predict churn risk
+    6. Extract topics
+    7. Update analysis status
     """
-    db = self.db
+    return _run_analysis(self, self.db, analysis_id, product_name)
+
+
+class _SyncProgress:
+    """Progress reporting for analyses run without Celery (see run_analysis_sync)"""
     
+    def report_progress(self, analysis_id: int, step: str, progress: int, **meta):
+        publish_progress(analysis_id, "in_progress", step, progress, **meta)
+
+
+def _run_analysis(task, db, analysis_id: int, product_name: str) -> dict:
+    """
+    Steps of run_analysis_task, shared with run_analysis_sync
+    
+    `task` only needs report_progress (a DatabaseTask or _SyncProgress).
+    """
     try:
         # Update status to in_progress
         analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
@@ -104,219 +351,113 @@ def run_analysis_task(self, analysis_id: int, product_name: str):
         logger.info(f"Starting analysis task {analysis_id} for product: {product_name}")
         
         # Update task progress
-        self.update_state(state='PROGRESS', meta={'step': 'scraping', 'progress': 10})
+        task.report_progress(analysis_id, 'scraping', 10)
+        
+        product_id = analysis.product_id
+        since = None
+        base_analysis_id = None
+        if settings.SCRAPE_INCREMENTAL and not settings.DEMO_MODE:
+            # Start from the previous analysis: inherit its scored comments and
+            # only scrape (and score) what was posted since
+            since = load_cursors(db, product_id)
+            base_analysis_id = carry_forward_comments(db, product_id, analysis_id, settings.SCRAPE_CARRY_FORWARD_DAYS)
+            db.commit()
+        
+        if settings.ANALYSIS_FANOUT and not settings.DEMO_MODE:
+            return _dispatch_source_chord(analysis_id, product_name)
+        
+        # Steps 1-3 overlap: scraping (per source), sentiment analysis (in
+        # chunks) and saving comments run as concurrent pipeline stages
+        chunk_size = settings.PIPELINE_CHUNK_SIZE
+        sentiment_analyzer = None
         
-        # Step 1: Scrape or generate data based on DEMO_MODE
         if settings.DEMO_MODE:
-            # Demo Mode: Use sample data (for online demo)
-            from app.models.schemas import ScrapedComment
-            from datetime import datetime, timedelta
-            import random
-            
-            logger.info("DEMO MODE: Using sample data")
+            # Demo Mode: Use sample data and lightweight mock sentiment analysis (no ML models)
+            logger.info("DEMO MODE: Using sample data and mock sentiment analysis")
             
-            # Realistic sample comments
-            sample_templates = {
-                'positive': [
-                    f"Great {product_name}! Really impressed with the quality and features.",
-                    f"Absolutely love my {product_name}! Best purchase ever.",
-                    f"The {product_name} exceeded my expectations. Highly recommend!",
-                    f"Five stars! {product_name} is exactly what I needed.",
-                    f"Best {product_name} on the market. Worth every penny!",
-                ],
-                'negative': [
-                    f"Not happy with {product_name}. Customer service was terrible.",
-                    f"Disappointed with {product_name}. Expected better quality.",
-                    f"The {product_name} broke after just one week. Avoid!",
-                    f"Waste of money. {product_name} doesn't work as advertised.",
-                    f"Poor quality {product_name}. Don't recommend at all.",
-                ],
-                'neutral': [
-                    f"The {product_name} is okay but has some issues with battery life.",
-                    f"Average product. Nothing special about {product_name}.",
-                    f"{product_name} is decent for the price but could be better.",
-                    f"Mixed feelings about {product_name}. Some pros and cons.",
-                    f"It's alright. {product_name} does the job but nothing impressive.",
-                ]
-            }
-            
-            sources = ['Amazon', 'Reddit', 'Twitter', 'Trustpilot', 'Google Reviews']
-            comments = []
-            
-            # Generate 15-25 random comments with mixed sentiment
-            num_comments = random.randint(15, 25)
+            def produce(emit):
+                comments = _generate_demo_comments(product_name)
+                logger.info(f"Generated {len(comments)} sample comments for demo")
+                for i in range(0, len(comments), chunk_size):
+                    emit(comments[i:i + chunk_size])
             
-            for i in range(num_comments):
-                rand = random.random()
-                if rand < 0.50:  # 50% positive
-                    sentiment_type = 'positive'
-                elif rand < 0.80:  # 30% negative
-                    sentiment_type = 'negative'
-                else:  # 20% neutral
-                    sentiment_type = 'neutral'
-                
-                comment = ScrapedComment(
-                    text=random.choice(sample_templates[sentiment_type]),
-                    source=random.choice(sources),
-                    source_url=f"https://example.com/{product_name.lower().replace(' ', '-')}",
-                    author=f"User{i+1}",
-                    posted_at=datetime.now() - timedelta(days=random.randint(0, 30))
-                )
-                comments.append(comment)
-            
-            logger.info(f"Generated {len(comments)} sample comments for demo")
+            score_texts = _mock_sentiments
+            model = "mock"
         else:
-            # Production Mode: Real web scraping
+            # Production Mode: Real web scraping and ML model sentiment analysis
             import asyncio
             
-            logger.info("PRODUCTION MODE: Real web scraping")
-            scraper = create_scraper(
-                user_agent=settings.USER_AGENT,
-                timeout=settings.SCRAPE_TIMEOUT
-            )
-            
-            # Run async scraping in sync context
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                comments = loop.run_until_complete(
-                    scraper.scrape_all_sources(
-                        product_name,
-                        max_results=settings.MAX_SCRAPE_RESULTS
-                    )
-                )
-            finally:
-                loop.close()
-            
-            if not comments:
-                analysis.status = AnalysisStatus.FAILED
-                analysis.error_message = "No comments found"
-                db.commit()
-                return {"error": "No comments found"}
-            
-            logger.info(f"Scraped {len(comments)} real comments")
-        self.update_state(state='PROGRESS', meta={'step': 'sentiment_analysis', 'progress': 40})
-        
-        # Step 2: Sentiment analysis
-        if settings.DEMO_MODE:
-            # Demo Mode: Use lightweight mock sentiment analysis (no ML models)
-            logger.info("DEMO MODE: Using mock sentiment analysis")
-            sentiments = []
-            for comment in comments:
-                text_lower = comment.text.lower()
-                # Simple keyword-based sentiment (lightweight)
-                if any(word in text_lower for word in ['great', 'love', 'excellent', 'best', 'impressed', 'amazing']):
-                    sentiments.append({'sentiment': 'positive', 'score': 0.85, 'confidence': 0.9})
-                elif any(word in text_lower for word in ['terrible', 'worst', 'hate', 'awful', 'disappointed', 'poor', 'broke', 'waste']):
-                    sentiments.append({'sentiment': 'negative', 'score': 0.15, 'confidence': 0.9})
-                else:
-                    sentiments.append({'sentiment': 'neutral', 'score': 0.5, 'confidence': 0.8})
-        else:
-            # Production Mode: Use real ML model sentiment analysis
-            logger.info("PRODUCTION MODE: Using ML model for sentiment analysis")
+            logger.info("PRODUCTION MODE: Real web scraping and ML sentiment analysis")
+            scraper = get_scraper()
             sentiment_analyzer = get_sentiment_analyzer()
-            texts = [c.text for c in comments]
-            sentiments = sentiment_analyzer.analyze_batch(texts)
-        
-        self.update_state(state='PROGRESS', meta={'step': 'saving_data', 'progress': 60})
-        
-        # Step 3: Save comments to database
-        comment_objects = []
-        sentiment_scores = []
-        
-        for comment, sentiment in zip(comments, sentiments):
-            sentiment_type = SentimentType(sentiment['sentiment'])
             
-            db_comment = CustomerComment(
-                product_id=analysis.product_id,
-                analysis_id=analysis_id,
-                text=comment.text,
-                source=comment.source,
-                source_url=comment.source_url,
-                author=comment.author,
-                sentiment=sentiment_type,
-                sentiment_score=sentiment['score'],
-                confidence=sentiment['confidence'],
-                posted_at=comment.posted_at
-            )
+            def produce(emit):
+                async def scrape():
+                    loop = asyncio.get_running_loop()
+                    async for comments in scraper.iter_sources(product_name, max_results=settings.MAX_SCRAPE_RESULTS, since=since):
+                        for i in range(0, len(comments), chunk_size):
+                            # emit blocks when scoring falls behind; keep it off the loop
+                            # so the remaining sources keep scraping meanwhile
+                            await loop.run_in_executor(None, emit, comments[i:i + chunk_size])
+                
+                # Scrape on the worker's persistent loop, reusing the pooled session
+                run_async(scrape())
             
-            comment_objects.append(db_comment)
-            sentiment_scores.append(sentiment['score'])
+            score_texts = sentiment_analyzer.analyze_batch
+            model = sentiment_analyzer.cache_namespace
         
-        db.add_all(comment_objects)
-        db.commit()
-        
-        self.update_state(state='PROGRESS', meta={'step': 'calculating_metrics', 'progress': 70})
+        # Only one comment per exact duplicate group (in this scrape or
+        # earlier ones) reaches the model; the rest reuse its result
+        score, dedup_index, dedup_stats = _deduplicating_scorer(db, product_id, model, score_texts)
         
-        # Step 4: Calculate aggregate metrics
-        total = len(comments)
-        positive = sum(1 for s in sentiments if s['sentiment'] == 'positive')
-        negative = sum(1 for s in sentiments if s['sentiment'] == 'negative')
-        neutral = sum(1 for s in sentiments if s['sentiment'] == 'neutral')
-        avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
+        texts = []
+        sentiments = []
         
-        # Step 5: Predict churn risk
-        if settings.DEMO_MODE:
-            # Demo Mode: Use simple calculation (no ML model)
-            logger.info("DEMO MODE: Using mock churn prediction")
-            # Simple rule-based churn prediction
-            churn_result = {
-                'churn_probability': min(0.9, negative_ratio * 1.5 + (1 - avg_sentiment)) if negative_ratio > 0.3 else 0.2,
-                'risk_factors': ['Negative sentiment ratio', 'Low average sentiment'] if negative_ratio > 0.3 else []
-            }
-        else:
-            # Production Mode: Use real ML model
-            logger.info("PRODUCTION MODE: Using ML model for churn prediction")
-            churn_predictor = get_churn_predictor()
-            
-            negative_ratio = negative / total if total > 0 else 0
-            sentiment_volatility = sum(abs(s - avg_sentiment) for s in sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
+        def save(item):
+            comments, chunk_sentiments = item
+            # Bulk write (COPY on PostgreSQL, executemany elsewhere), no ORM objects
+            bulk_insert(db, CustomerComment.__table__, [
+                {
+                    "product_id": product_id,
+                    "analysis_id": analysis_id,
+                    "text": comment.text,
+                    "source": comment.source,
+                    "source_url": comment.source_url,
+                    "author": comment.author,
+                    "sentiment": SentimentType(sentiment['sentiment']),
+                    "sentiment_score": sentiment['score'],
+                    "confidence": sentiment['confidence'],
+                    "posted_at": comment.posted_at
+                }
+                for comment, sentiment in zip(comments, chunk_sentiments)
+            ])
+            db.commit()
             
-            churn_result = churn_predictor.predict_churn_from_sentiment(
-                avg_sentiment=avg_sentiment,
-                negative_ratio=negative_ratio,
-                total_comments=total,
-                sentiment_volatility=sentiment_volatility
-            )
-        
-        self.update_state(state='PROGRESS', meta={'step': 'extracting_topics', 'progress': 85})
-        
-        # Step 6: Extract topics
-        topics = extract_topics(texts, sentiments)
-        
-        topic_objects = []
-        for topic_name, topic_data in topics.items():
-            db_topic = Topic(
-                analysis_id=analysis_id,
-                name=topic_name,
-                keywords=", ".join(topic_data['keywords']),
-                mention_count=topic_data['count'],
-                avg_sentiment=topic_data['avg_sentiment']
-            )
-            topic_objects.append(db_topic)
-        
-        db.add_all(topic_objects)
-        
-        # Step 7: Update analysis with final results
-        analysis.status = AnalysisStatus.COMPLETED
-        analysis.total_comments = total
-        analysis.positive_count = positive
-        analysis.negative_count = negative
-        analysis.neutral_count = neutral
-        analysis.avg_sentiment_score = avg_sentiment
-        analysis.churn_risk_score = churn_result['churn_probability']
-        analysis.completed_at = datetime.utcnow()
-        
-        db.commit()
-        
-        logger.info(f"Analysis task {analysis_id} completed successfully")
-        
-        return {
-            "status": "completed",
-            "analysis_id": analysis_id,
-            "total_comments": total,
-            "avg_sentiment": avg_sentiment
-        }
+            texts.extend(c.text for c in comments)
+            sentiments.extend(chunk_sentiments)
+            progress = 10 + int(60 * min(len(texts) / max(settings.MAX_SCRAPE_RESULTS, 1), 1))
+            task.report_progress(analysis_id, 'processing', progress, comments=len(texts))
+        
+        stage_timings = run_pipeline(
+            ("scrape", produce),
+            [("sentiment_analysis", lambda comments: (comments, score([c.text for c in comments])))],
+            ("saving_data", save),
+            maxsize=settings.PIPELINE_QUEUE_SIZE
+        )
+        logger.info(f"Analysis {analysis_id} pipeline timings: {stage_timings}")
+        if sentiment_analyzer is not None and sentiment_analyzer.cache is not None:
+            logger.info(f"Sentiment cache stats: {sentiment_analyzer.cache.stats()}")
+        _save_duplicate_index(db, product_id, model, dedup_index, dedup_stats, f"Analysis {analysis_id}")
+        
+        new_from = 0
+        if base_analysis_id is not None:
+            texts, sentiments, new_from = _load_saved_comments(db, analysis_id)
+            logger.info(f"Analysis {analysis_id}: {len(texts) - new_from} new comments, "
+                        f"{new_from} inherited from analysis {base_analysis_id}")
+        
+        result = _complete_analysis(task, db, analysis, product_name, texts, sentiments, new_from)
+        result["stage_timings"] = stage_timings
+        return result
         
     except Exception as e:
         logger.error(f"Error in analysis task {analysis_id}: {e}", exc_info=True)
@@ -326,193 +467,207 @@ def run_analysis_task(self, analysis_id: int, product_name: str):
             analysis.status = AnalysisStatus.FAILED
             analysis.error_message = str(e)
             db.commit()
+        publish_progress(analysis_id, "failed", error=str(e))
         
         raise
 
 
-def run_analysis_sync(analysis_id: int, product_name: str):
+def _dispatch_source_chord(analysis_id: int, product_name: str) -> dict:
+    """Queue one scrape_source_task per source, with merge_sources_task as the chord callback"""
+    from celery import chord
+    
+    limits = get_scraper().source_limits(settings.MAX_SCRAPE_RESULTS)
+    callback = merge_sources_task.s(analysis_id, product_name)
+    callback.link_error(fail_analysis_task.s(analysis_id=analysis_id))
+    result = chord(
+        scrape_source_task.s(analysis_id, product_name, source, limit)
+        for source, limit in limits.items()
+    )(callback)
+    
+    logger.info(f"Analysis {analysis_id} fanned out to {len(limits)} source tasks (chord {result.id})")
+    return {"status": "dispatched", "analysis_id": analysis_id, "sources": list(limits), "chord_id": result.id}
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name='app.tasks.scrape_source')
+def scrape_source_task(self, analysis_id: int, product_name: str, source: str, max_results: int):
     """
-    Synchronous version of the analysis task for DEMO mode (no Celery/Redis needed)
+    Fan-out subtask: scrape one source, score its comments and save them
     
-    This function can be called directly without Celery infrastructure.
-    Used when DEMO_MODE=True in settings.
+    With DEDUP_ENABLED the comments are saved unscored and
+    merge_sources_task scores them, so the product's duplicate index is
+    loaded and saved once per analysis rather than by every source task.
+    
+    A failing source is logged and reported in the result rather than
+    raised, so the remaining sources still complete the analysis (as with
+    WebScraper.iter_sources).
+    
+    Returns:
+        {"source", "comments"} plus "error" if the source failed
     """
-    db = SessionLocal()
+    db = self.db
+    product_id = db.query(Analysis.product_id).filter(Analysis.id == analysis_id).scalar()
+    since = load_cursors(db, product_id) if settings.SCRAPE_INCREMENTAL else None
+    try:
+        comments = run_async(get_scraper().scrape_source(source, product_name, max_results, since))
+    except Exception as e:
+        logger.error(f"Analysis {analysis_id}: source {source} failed: {e}")
+        return {"source": source, "comments": 0, "error": str(e)}
+    
+    score = None
+    if not settings.DEDUP_ENABLED:
+        score = get_sentiment_analyzer().analyze_batch
+    chunk_size = settings.PIPELINE_CHUNK_SIZE
+    
+    for i in range(0, len(comments), chunk_size):
+        chunk = comments[i:i + chunk_size]
+        chunk_sentiments = score([c.text for c in chunk]) if score else [None] * len(chunk)
+        bulk_insert(db, CustomerComment.__table__, [
+            {
+                "product_id": product_id,
+                "analysis_id": analysis_id,
+                "text": comment.text,
+                "source": comment.source,
+                "source_url": comment.source_url,
+                "author": comment.author,
+                "sentiment": SentimentType(sentiment['sentiment']) if sentiment else None,
+                "sentiment_score": sentiment['score'] if sentiment else None,
+                "confidence": sentiment['confidence'] if sentiment else None,
+                "posted_at": comment.posted_at
+            }
+            for comment, sentiment in zip(chunk, chunk_sentiments)
+        ])
+        db.commit()
+    
+    publish_progress(analysis_id, "in_progress", "processing", 40, source=source, comments=len(comments))
+    logger.info(f"Analysis {analysis_id}: source {source} saved {len(comments)} comments")
+    return {"source": source, "comments": len(comments)}
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name='app.tasks.merge_sources')
+def merge_sources_task(self, source_results: List[dict], analysis_id: int, product_name: str):
+    """
+    Fan-out chord callback: merge the sources' saved comments into the analysis
+    
+    Scores the comments the source tasks saved unscored (DEDUP_ENABLED),
+    reads them back from the database (rather than passing them through
+    the result backend) and runs steps 4-7.
+    """
+    db = self.db
     
     try:
-        # Update status to in_progress
         analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
         if not analysis:
             logger.error(f"Analysis {analysis_id} not found")
             return {"error": "Analysis not found"}
         
-        analysis.status = AnalysisStatus.IN_PROGRESS
-        db.commit()
-        
-        logger.info(f"Starting SYNC analysis {analysis_id} for product: {product_name}")
-        
-        # DEMO MODE: Generate sample data
-        from app.models.schemas import ScrapedComment
-        from datetime import datetime, timedelta
-        import random
-        
-        logger.info("DEMO MODE: Using sample data")
-        
-        # Realistic sample comments
-        sample_templates = {
-            'positive': [
-                f"Great {product_name}! Really impressed with the quality and features.",
-                f"Absolutely love my {product_name}! Best purchase ever.",
-                f"The {product_name} exceeded my expectations. Highly recommend!",
-                f"Five stars! {product_name} is exactly what I needed.",
-                f"Best {product_name} on the market. Worth every penny!",
-            ],
-            'negative': [
-                f"Not happy with {product_name}. Customer service was terrible.",
-                f"Disappointed with {product_name}. Expected better quality.",
-                f"The {product_name} broke after just one week. Avoid!",
-                f"Waste of money. {product_name} doesn't work as advertised.",
-                f"Poor quality {product_name}. Don't recommend at all.",
-            ],
-            'neutral': [
-                f"The {product_name} is okay but has some issues with battery life.",
-                f"Average product. Nothing special about {product_name}.",
-                f"{product_name} is decent for the price but could be better.",
-                f"Mixed feelings about {product_name}. Some pros and cons.",
-                f"It's alright. {product_name} does the job but nothing impressive.",
-            ]
-        }
-        
-        sources = ['Amazon', 'Reddit', 'Twitter', 'Trustpilot', 'Google Reviews']
-        comments = []
-        
-        # Generate 15-25 random comments
-        num_comments = random.randint(15, 25)
-        
-        for i in range(num_comments):
-            rand = random.random()
-            if rand < 0.50:  # 50% positive
-                sentiment_type = 'positive'
-            elif rand < 0.80:  # 30% negative
-                sentiment_type = 'negative'
-            else:  # 20% neutral
-                sentiment_type = 'neutral'
-            
-            comment = ScrapedComment(
-                text=random.choice(sample_templates[sentiment_type]),
-                source=random.choice(sources),
-                source_url=f"https://example.com/{product_name.lower().replace(' ', '-')}",
-                author=f"User{i+1}",
-                posted_at=datetime.now() - timedelta(days=random.randint(0, 30))
-            )
-            comments.append(comment)
-        
-        logger.info(f"Generated {len(comments)} sample comments for demo")
-        
-        # Sentiment analysis - LIGHTWEIGHT (no ML models)
-        logger.info("DEMO MODE: Using lightweight mock sentiment analysis")
-        sentiments = []
-        for comment in comments:
-            text_lower = comment.text.lower()
-            # Simple keyword-based sentiment
-            if any(word in text_lower for word in ['great', 'love', 'excellent', 'best', 'impressed', 'amazing', 'five stars']):
-                sentiments.append({'sentiment': 'positive', 'score': 0.85, 'confidence': 0.9})
-            elif any(word in text_lower for word in ['terrible', 'worst', 'hate', 'awful', 'disappointed', 'poor', 'broke', 'waste']):
-                sentiments.append({'sentiment': 'negative', 'score': 0.15, 'confidence': 0.9})
-            else:
-                sentiments.append({'sentiment': 'neutral', 'score': 0.5, 'confidence': 0.8})
-        
-        texts = [c.text for c in comments]
-        
-        # Save comments to database
-        comment_objects = []
-        sentiment_scores = []
-        
-        for comment, sentiment in zip(comments, sentiments):
-            sentiment_type = SentimentType(sentiment['sentiment'])
-            
-            db_comment = CustomerComment(
-                product_id=analysis.product_id,
-                analysis_id=analysis_id,
-                text=comment.text,
-                source=comment.source,
-                source_url=comment.source_url,
-                author=comment.author,
-                sentiment=sentiment_type,
-                sentiment_score=sentiment['score'],
-                confidence=sentiment['confidence'],
-                posted_at=comment.posted_at
-            )
-            
-            comment_objects.append(db_comment)
-            sentiment_scores.append(sentiment['score'])
-        
-        db.add_all(comment_objects)
+        logger.info(f"Merging analysis {analysis_id} sources: {source_results}")
         
-        # Calculate metrics
-        total = len(comment_objects)
-        positive = sum(1 for c in comment_objects if c.sentiment == SentimentType.POSITIVE)
-        negative = sum(1 for c in comment_objects if c.sentiment == SentimentType.NEGATIVE)
-        neutral = sum(1 for c in comment_objects if c.sentiment == SentimentType.NEUTRAL)
+        if settings.DEDUP_ENABLED:
+            self.report_progress(analysis_id, 'sentiment_analysis', 50)
+            _score_saved_comments(db, analysis.product_id, analysis_id)
         
-        avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
+        texts, sentiments, new_from = _load_saved_comments(db, analysis_id)
         
-        # Extract topics
-        topics_data = extract_topics(texts, sentiments)
-        
-        topic_objects = []
-        for topic_name, data in topics_data.items():
-            topic = Topic(
-                analysis_id=analysis_id,
-                name=topic_name,
-                mention_count=data['count'],
-                keywords=", ".join(data['keywords'][:5]),
-                avg_sentiment=data['avg_sentiment']
-            )
-            topic_objects.append(topic)
-        
-        db.add_all(topic_objects)
-        
-        # Churn prediction - LIGHTWEIGHT (no ML model)
-        logger.info("DEMO MODE: Using lightweight mock churn prediction")
-        negative_ratio = negative / total if total > 0 else 0
-        # Simple rule-based churn prediction
-        churn_result = {
-            'churn_probability': min(0.9, negative_ratio * 1.5 + (1 - avg_sentiment)) if negative_ratio > 0.3 else 0.2,
-            'risk_factors': ['Negative sentiment ratio', 'Low average sentiment'] if negative_ratio > 0.3 else []
-        }
-        
-        # Update analysis with final results
-        analysis.status = AnalysisStatus.COMPLETED
-        analysis.total_comments = total
-        analysis.positive_count = positive
-        analysis.negative_count = negative
-        analysis.neutral_count = neutral
-        analysis.avg_sentiment = avg_sentiment
-        analysis.churn_risk_score = churn_result['churn_probability']
-        analysis.completed_at = datetime.utcnow()
-        
-        db.commit()
-        
-        logger.info(f"SYNC analysis {analysis_id} completed successfully")
-        
-        return {
-            "status": "completed",
-            "analysis_id": analysis_id,
-            "total_comments": total,
-            "avg_sentiment": avg_sentiment
-        }
+        result = _complete_analysis(self, db, analysis, product_name, texts, sentiments, new_from)
+        result["sources"] = source_results
+        return result
         
     except Exception as e:
-        logger.error(f"Error in SYNC analysis {analysis_id}: {e}", exc_info=True)
-        
-        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
-        if analysis:
-            analysis.status = AnalysisStatus.FAILED
-            analysis.error_message = str(e)
-            db.commit()
-        
+        logger.error(f"Error merging analysis {analysis_id}: {e}", exc_info=True)
+        _mark_failed(db, analysis_id, str(e))
         raise
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name='app.tasks.fail_analysis')
+def fail_analysis_task(self, *args, analysis_id: int):
+    """Fan-out errback: mark the analysis failed if its chord did not complete"""
+    analysis = self.db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    if analysis and analysis.status not in (AnalysisStatus.COMPLETED, AnalysisStatus.FAILED):
+        _mark_failed(self.db, analysis_id, "Source tasks failed")
+
+
+def _score_saved_comments(db, product_id: int, analysis_id: int):
+    """Score an analysis's comments saved without sentiment, with one duplicate index load and save"""
+    sentiment_analyzer = get_sentiment_analyzer()
+    model = sentiment_analyzer.cache_namespace
+    score, dedup_index, dedup_stats = _deduplicating_scorer(db, product_id, model, sentiment_analyzer.analyze_batch)
+    
+    rows = (
+        db.query(CustomerComment.id, CustomerComment.text)
+        .filter(CustomerComment.analysis_id == analysis_id, CustomerComment.sentiment.is_(None))
+        .order_by(CustomerComment.id)
+        .all()
+    )
+    table = CustomerComment.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("comment_id"))
+        .values(
+            sentiment=bindparam("new_sentiment"),
+            sentiment_score=bindparam("new_score"),
+            confidence=bindparam("new_confidence")
+        )
+    )
+    chunk_size = settings.PIPELINE_CHUNK_SIZE
+    
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i:i + chunk_size]
+        chunk_sentiments = score([row.text for row in chunk])
+        db.execute(statement, [
+            {
+                "comment_id": row.id,
+                "new_sentiment": SentimentType(sentiment['sentiment']),
+                "new_score": sentiment['score'],
+                "new_confidence": sentiment['confidence']
+            }
+            for row, sentiment in zip(chunk, chunk_sentiments)
+        ])
+        db.commit()
+    _save_duplicate_index(db, product_id, model, dedup_index, dedup_stats, f"Analysis {analysis_id}")
+
+
+def _load_saved_comments(db, analysis_id: int):
+    """
+    An analysis's comment texts and sentiments, including inherited ones
+    
+    Comments inherited from earlier analyses (see comment_scope) come
+    first, then the analysis's own; each in insertion order.
+    
+    Returns:
+        (texts, sentiments, number of inherited comments)
+    """
+    own = CustomerComment.analysis_id == analysis_id
+    rows = (
+        db.query(CustomerComment.text, CustomerComment.sentiment, CustomerComment.sentiment_score, own.label("own"))
+        .filter(comment_scope(db, analysis_id))
+        .order_by(own, CustomerComment.id)
+        .all()
+    )
+    texts = [row.text for row in rows]
+    sentiments = [{'sentiment': row.sentiment.value, 'score': row.sentiment_score} for row in rows]
+    return texts, sentiments, sum(1 for row in rows if not row.own)
+
+
+def _mark_failed(db, analysis_id: int, error: str):
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    if analysis:
+        analysis.status = AnalysisStatus.FAILED
+        analysis.error_message = error
+        db.commit()
+    publish_progress(analysis_id, "failed", error=error)
+
+
+def run_analysis_sync(analysis_id: int, product_name: str):
+    """
+    Synchronous version of the analysis task for DEMO mode (no Celery/Redis needed)
+    
+    This function can be called directly without Celery infrastructure.
+    Used when DEMO_MODE=True in settings. Runs the same steps as
+    run_analysis_task, publishing progress directly.
+    """
+    db = SessionLocal()
     
+    try:
+        return _run_analysis(_SyncProgress(), db, analysis_id, product_name)
     finally:
         db.close()
@@ -0,0 +1,90 @@
+"""
+Batch analysis orchestration
+
+A batch's new analyses fan out as one Celery chord of run_analysis_task
+subtasks; the chord callback stamps the batch complete. Batch progress is
+always derived from the member analyses' statuses, so it stays correct even
+when a failed subtask keeps the chord callback from running.
+"""
+
+from celery import chord
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import Dict, List, Tuple
+import logging
+
+from app.core.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.models.database_models import Analysis, AnalysisBatch, AnalysisBatchItem, AnalysisStatus
+from app.tasks.analysis_tasks import DatabaseTask, run_analysis_sync, run_analysis_task
+
+logger = logging.getLogger(__name__)
+
+_FINISHED = (AnalysisStatus.COMPLETED, AnalysisStatus.FAILED)
+
+
+def batch_progress(db: Session, batch: AnalysisBatch) -> Dict[str, int]:
+    """
+    Count a batch's analyses by status, stamping the batch complete once all have finished
+
+    Returns:
+        {"pending", "in_progress", "completed", "failed"} counts
+    """
+    rows = (
+        db.query(Analysis.status, func.count())
+        .join(AnalysisBatchItem, AnalysisBatchItem.analysis_id == Analysis.id)
+        .filter(AnalysisBatchItem.batch_id == batch.id)
+        .group_by(Analysis.status)
+        .all()
+    )
+    counts = {status.value: 0 for status in AnalysisStatus}
+    counts.update({status.value: count for status, count in rows})
+
+    finished = sum(counts[status.value] for status in _FINISHED)
+    if batch.completed_at is None and finished >= batch.total:
+        batch.completed_at = datetime.utcnow()
+        db.commit()
+        logger.info(f"Batch {batch.id} complete: {counts}")
+
+    return counts
+
+
+def dispatch_batch(batch_id: int, jobs: List[Tuple[int, str]]):
+    """Queue a batch's new analyses as one chord of run_analysis_task subtasks"""
+    callback = finalize_batch.si(batch_id)
+    # A chord skips its callback when a subtask fails; run it as the errback then
+    callback.link_error(finalize_batch.si(batch_id))
+    result = chord(run_analysis_task.si(analysis_id, product_name) for analysis_id, product_name in jobs)(callback)
+    logger.info(f"Queued batch {batch_id}: {len(jobs)} analyses (chord {result.id})")
+    return result
+
+
+def run_batch_sync(batch_id: int, jobs: List[Tuple[int, str]]):
+    """Run a batch's analyses one after another in DEMO mode (no Celery/Redis needed)"""
+    for analysis_id, product_name in jobs:
+        try:
+            run_analysis_sync(analysis_id, product_name)
+        except Exception as e:
+            logger.error(f"Batch {batch_id}: analysis {analysis_id} failed: {e}")
+    _finalize(batch_id)
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name='app.tasks.finalize_batch')
+def finalize_batch(self, batch_id: int, *args):
+    """Chord callback: stamp the batch complete if every analysis has finished"""
+    return _finalize(batch_id, self.db)
+
+
+def _finalize(batch_id: int, db: Session = None) -> Dict[str, int]:
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        batch = db.query(AnalysisBatch).filter(AnalysisBatch.id == batch_id).first()
+        if not batch:
+            logger.error(f"Batch {batch_id} not found")
+            return {}
+        return batch_progress(db, batch)
+    finally:
+        if own_session:
+            db.close()
@@ -0,0 +1,174 @@
+"""
+Staged producer/consumer pipeline for analysis tasks
+
+Runs a source, any number of transform stages and a sink concurrently,
+connected by bounded queues. A slow stage fills its inbound queue and blocks
+the stages before it (backpressure), so memory stays bounded by the queue
+sizes, and wall-clock time approaches that of the slowest stage rather than
+the sum of all stages.
+
+The source and transform stages run on worker threads; the sink runs on the
+calling thread so it can safely use the task's database session.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    """Raised inside a stage when another stage failed"""
+
+
+@dataclass
+class StageStats:
+    """Timings for one pipeline stage"""
+    name: str
+    items: int = 0
+    busy_seconds: float = 0.0  # Doing the stage's own work
+    blocked_seconds: float = 0.0  # Waiting for room downstream (backpressure)
+    idle_seconds: float = 0.0  # Waiting for input from upstream
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "idle_seconds": round(self.idle_seconds, 3),
+        }
+
+
+class _Channel:
+    """Bounded queue whose blocking calls give up once the pipeline is stopping"""
+
+    def __init__(self, maxsize: int, stop: threading.Event):
+        self._queue = queue.Queue(maxsize)
+        self._stop = stop
+
+    def put(self, item, stats: StageStats):
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                self._queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        stats.blocked_seconds += time.perf_counter() - start
+
+    def get(self, stats: StageStats):
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                item = self._queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        stats.idle_seconds += time.perf_counter() - start
+        return item
+
+
+def run_pipeline(
+    source: Tuple[str, Callable[[Callable[[Any], None]], None]],
+    stages: List[Tuple[str, Callable[[Any], Any]]],
+    sink: Tuple[str, Callable[[Any], None]],
+    maxsize: int = 4
+) -> Dict[str, Any]:
+    """
+    Run source -> stages -> sink with bounded queues between them
+
+    Args:
+        source: (name, fn) where fn(emit) calls emit(item) for every item it produces
+        stages: List of (name, fn) transforms, each mapping one item to one item
+        sink: (name, fn) consuming the final items on the calling thread
+        maxsize: Capacity of each inter-stage queue
+
+    Returns:
+        Per-stage timings plus total wall-clock seconds
+
+    Raises:
+        The first exception raised by any stage
+    """
+    stop = threading.Event()
+    errors = []
+    channels = [_Channel(maxsize, stop) for _ in range(len(stages) + 1)]
+    stats = [StageStats(source[0])] + [StageStats(name) for name, _ in stages] + [StageStats(sink[0])]
+
+    def fail(e: Exception):
+        if not isinstance(e, _Stopped):
+            errors.append(e)
+        stop.set()
+
+    def run_source():
+        source_stats, out = stats[0], channels[0]
+
+        def emit(item):
+            source_stats.items += 1
+            out.put(item, source_stats)
+
+        start = time.perf_counter()
+        try:
+            source[1](emit)
+            out.put(_DONE, source_stats)
+        except Exception as e:
+            fail(e)
+        finally:
+            # Time spent producing, excluding time blocked on a full queue
+            source_stats.busy_seconds = time.perf_counter() - start - source_stats.blocked_seconds
+
+    def run_stage(index: int, fn: Callable[[Any], Any]):
+        stage_stats, inbound, out = stats[index + 1], channels[index], channels[index + 1]
+        try:
+            while True:
+                item = inbound.get(stage_stats)
+                if item is _DONE:
+                    out.put(_DONE, stage_stats)
+                    return
+                start = time.perf_counter()
+                result = fn(item)
+                stage_stats.busy_seconds += time.perf_counter() - start
+                stage_stats.items += 1
+                out.put(result, stage_stats)
+        except Exception as e:
+            fail(e)
+
+    threads = [threading.Thread(target=run_source, name=f"pipeline-{source[0]}", daemon=True)]
+    for index, (name, fn) in enumerate(stages):
+        threads.append(threading.Thread(target=run_stage, args=(index, fn), name=f"pipeline-{name}", daemon=True))
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    sink_stats, inbound = stats[-1], channels[-1]
+    try:
+        while True:
+            item = inbound.get(sink_stats)
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            sink[1](item)
+            sink_stats.busy_seconds += time.perf_counter() - start
+            sink_stats.items += 1
+    except Exception as e:
+        fail(e)
+    finally:
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+
+    report = {stage.name: stage.as_dict() for stage in stats}
+    report["wall_seconds"] = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,114 @@
+"""
+Query count check: listing saved products costs the same at any list size
+
+Usage (from backend/):
+    python -m benchmarks.saved_products_queries
+    python -m benchmarks.saved_products_queries --sizes 1 10 200 1000 --page-size 200
+
+For each size, a user saves that many products (each with a few
+analyses), then get_saved_products is called for the first and the last
+page. Counts the SQL statements each call executes and exits non-zero if
+the count grows with the number of saved products. Runs against a
+throwaway SQLite file.
+"""
+
+from datetime import datetime, timedelta
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from app.api.saved_products import get_saved_products
+from app.core.database import Base
+from app.core.product_summary import record_completed_analysis
+from app.models.database_models import Analysis, AnalysisStatus, Product, SavedProduct, User
+
+
+def _fill(db: Session, user: User, size: int, run: int):
+    start = datetime(2026, 1, 1)
+    for i in range(size):
+        product = Product(name=f"bench-{run}-{i}")
+        db.add(product)
+        db.flush()
+        for day in range(3):
+            analysis = Analysis(
+                product_id=product.id,
+                status=AnalysisStatus.COMPLETED,
+                total_comments=100,
+                positive_count=50 + day,
+                negative_count=20,
+                neutral_count=30 - day,
+                avg_sentiment_score=0.6,
+                churn_risk_score=0.2,
+                completed_at=start + timedelta(days=day)
+            )
+            db.add(analysis)
+            db.flush()
+            record_completed_analysis(db, analysis)
+        db.add(SavedProduct(user_id=user.id, product_id=product.id))
+    db.commit()
+
+
+def _count_queries(engine, call):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        start = time.perf_counter()
+        result = call()
+        return len(statements), time.perf_counter() - start, result
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 200])
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{tmp_path}")
+    Base.metadata.create_all(engine)
+
+    counts = set()
+    print(f"{'saved':>6} {'page':>6} {'rows':>5} {'total':>6} {'queries':>8} {'ms':>8}")
+    try:
+        for run, size in enumerate(args.sizes):
+            with Session(engine) as db:
+                user = User(email=f"bench-{run}@example.com", hashed_password="x", full_name="Bench")
+                db.add(user)
+                db.commit()
+                _fill(db, user, size, run)
+                db.refresh(user)
+
+                last_offset = max(0, (size - 1) // args.page_size * args.page_size)
+                for label, offset in (("first", 0), ("last", last_offset)):
+                    db.expunge_all()
+                    response = Response()
+                    queries, seconds, rows = _count_queries(engine, lambda: get_saved_products(
+                        response=response, limit=args.page_size, offset=offset, current_user=user, db=db
+                    ))
+                    counts.add(queries)
+                    print(f"{size:>6} {label:>6} {len(rows):>5} {response.headers['X-Total-Count']:>6} "
+                          f"{queries:>8} {seconds * 1000:>8.2f}")
+    finally:
+        engine.dispose()
+        os.unlink(tmp_path)
+
+    if len(counts) > 1:
+        print(f"FAIL: query count varies with the number of saved products: {sorted(counts)}")
+        sys.exit(1)
+    print(f"ok: {counts.pop()} queries per page at every size")
+
+
+if __name__ == "__main__":
+    main()
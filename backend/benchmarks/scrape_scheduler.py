@@ -0,0 +1,175 @@
+"""
+Benchmark: ScrapeScheduler against a local mock server that throttles
+
+Usage (from backend/):
+    python -m benchmarks.scrape_scheduler
+    python -m benchmarks.scrape_scheduler --workers 4 --redis-url redis://localhost:6379/15
+
+The mock server enforces its own limit of --server-rate requests/second
+(burst --server-burst) and answers 429 with Retry-After beyond it; one
+extra route fails every request with 503. Each simulated worker (a thread
+with its own event loop, session and scheduler) fetches --requests pages.
+
+Three runs are compared:
+
+- unlimited: no rate limit, no retries (the old fire-everything behavior)
+- scheduler: per-host token bucket just under the server's limit, retries
+- the failing route, to show the circuit breaker opening and rejecting
+
+Without --redis-url each worker has its own bucket, so with several
+workers the fleet exceeds the server's limit. With it, the buckets are
+shared and the fleet stays under the limit.
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+import aiohttp
+from aiohttp import web
+
+from app.scrapers.scheduler import CircuitOpenError, ScrapeScheduler, TokenBucket
+
+
+class MockServer:
+    """Local server that rate limits like a real site"""
+
+    def __init__(self, rate: float, burst: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.lock = threading.Lock()
+        self.ok = 0
+        self.throttled = 0
+        self.failed = 0
+        self.port = None
+        self._ready = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+
+    def reset(self):
+        self.ok = self.throttled = self.failed = 0
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        async def reviews(request):
+            with self.lock:
+                if self.bucket.reserve() > 0:
+                    # Refund the reservation: rejected requests don't use capacity
+                    self.bucket._tokens += 1
+                    self.throttled += 1
+                    return web.Response(status=429, headers={"Retry-After": "0.5"})
+                self.ok += 1
+            return web.Response(text="<p>review</p>", content_type="text/html")
+
+        async def down(request):
+            self.failed += 1
+            return web.Response(status=503)
+
+        async def serve():
+            app = web.Application()
+            app.router.add_get("/reviews", reviews)
+            app.router.add_get("/down", down)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            self.port = site._server.sockets[0].getsockname()[1]
+            self._ready.set()
+
+        loop.run_until_complete(serve())
+        loop.run_forever()
+
+
+def _worker(url: str, requests: int, make_scheduler, results: list):
+    """One simulated worker: its own loop, session and scheduler"""
+    async def run():
+        scheduler = make_scheduler()
+        outcome = {"ok": 0, "failed": 0, "rejected": 0}
+        async with aiohttp.ClientSession() as session:
+            async def one():
+                try:
+                    await scheduler.fetch(session, url, "mock")
+                    outcome["ok"] += 1
+                except CircuitOpenError:
+                    outcome["rejected"] += 1
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    outcome["failed"] += 1
+
+            await asyncio.gather(*(one() for _ in range(requests)))
+        outcome.update(scheduler.stats())
+        if scheduler._redis is not None:
+            await scheduler._redis.aclose()
+        results.append(outcome)
+
+    asyncio.run(run())
+
+
+def _run(label: str, server: MockServer, url: str, workers: int, requests: int, make_scheduler):
+    server.reset()
+    results = []
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=_worker, args=(url, requests, make_scheduler, results))
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    ok = sum(r["ok"] for r in results)
+    failed = sum(r["failed"] for r in results)
+    rejected = sum(r["rejected"] for r in results)
+    retries = sum(r["retries"] for r in results)
+    sent = sum(r["requests"] for r in results)
+    breakers = sorted({state for r in results for state in r["breakers"].values()})
+    print(f"{label:>10} {seconds:>8.2f} {ok:>6} {failed:>7} {rejected:>9} {sent:>6} {retries:>8} "
+          f"{server.throttled:>6} {','.join(breakers):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape scheduler benchmark against a throttling mock server")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=40, help="Pages per worker")
+    parser.add_argument("--server-rate", type=float, default=20.0)
+    parser.add_argument("--server-burst", type=int, default=10)
+    parser.add_argument("--redis-url", default=None, help="Share host buckets across workers")
+    args = parser.parse_args()
+
+    server = MockServer(args.server_rate, args.server_burst)
+    server.start()
+
+    # Stay just under the server's limit; with shared buckets that holds fleet-wide
+    per_worker_rate = args.server_rate * 0.9 if args.redis_url else args.server_rate * 0.9 / args.workers
+    print(f"Server limit {args.server_rate}/s (burst {args.server_burst}); {args.workers} workers x {args.requests} pages; "
+          f"buckets {'shared via Redis' if args.redis_url else 'per worker'}")
+    print(f"{'run':>10} {'seconds':>8} {'ok':>6} {'failed':>7} {'rejected':>9} {'sent':>6} {'retries':>8} "
+          f"{'429s':>6} {'breakers':>10}")
+
+    _run("unlimited", server, server.url("/reviews"), args.workers, args.requests, lambda: ScrapeScheduler(
+        rate_per_host=1e9, burst_per_host=10 ** 9, max_concurrency=1000, max_retries=0, breaker_threshold=10 ** 9
+    ))
+    time.sleep(1)
+    _run("scheduler", server, server.url("/reviews"), args.workers, args.requests, lambda: ScrapeScheduler(
+        rate_per_host=per_worker_rate if not args.redis_url else args.server_rate * 0.9,
+        burst_per_host=args.server_burst // 2,
+        max_retries=5,
+        backoff_base=0.2,
+        redis_url=args.redis_url
+    ))
+    _run("down", server, server.url("/down"), args.workers, args.requests, lambda: ScrapeScheduler(
+        rate_per_host=50, burst_per_host=5, max_concurrency=2, max_retries=2, backoff_base=0.05,
+        breaker_threshold=3, breaker_reset=60
+    ))
+
+
+if __name__ == "__main__":
+    main()
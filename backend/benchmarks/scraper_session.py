@@ -0,0 +1,221 @@
+"""
+Benchmark: per-task event loop + session vs the pooled scraper session
+
+Usage (from backend/):
+    python -m benchmarks.scraper_session
+    python -m benchmarks.scraper_session --tls --tasks 50 --requests 20
+
+Starts a local stand-in HTTP(S) server and simulates analysis tasks that
+each fetch --requests pages:
+
+- per_request: a new ClientSession for every request (no reuse at all)
+- per_task: a new event loop and scraper session per task (the old task
+  structure, once scraping makes real requests)
+- pooled: one shared scraper on the persistent loop (app.core.event_loop)
+
+The server counts the TCP connections it accepts, i.e. the handshakes each
+mode paid for. --tls generates a throwaway self-signed certificate, so the
+TLS handshake is included. Loopback has no network round trips, so real
+hosts widen the gap further.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import datetime
+import ssl
+import tempfile
+import threading
+import time
+
+import aiohttp
+from aiohttp import web
+
+from app.core.event_loop import run_async
+from app.scrapers.web_scraper import WebScraper
+
+PAGE = "<html><body>" + "<p>Great product, would buy again.</p>" * 50 + "</body></html>"
+
+
+class StandInServer:
+    """Local HTTP(S) server on its own thread that counts accepted connections"""
+
+    def __init__(self, tls_dir: Path = None):
+        self.connections = set()
+        self.requests = 0
+        self.ssl_context = None
+        self.client_ssl = None
+        if tls_dir is not None:
+            cert, key = _self_signed_cert(tls_dir)
+            self.ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            self.ssl_context.load_cert_chain(cert, key)
+            self.client_ssl = ssl.create_default_context(cafile=cert)
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self.port = None
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+
+    @property
+    def url(self) -> str:
+        scheme = "https" if self.ssl_context else "http"
+        return f"{scheme}://localhost:{self.port}/reviews"
+
+    def reset(self):
+        self.connections.clear()
+        self.requests = 0
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+
+        async def reviews(request):
+            self.connections.add(request.transport.get_extra_info("peername"))
+            self.requests += 1
+            return web.Response(text=PAGE, content_type="text/html")
+
+        async def serve():
+            app = web.Application()
+            app.router.add_get("/reviews", reviews)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "localhost", 0, ssl_context=self.ssl_context)
+            await site.start()
+            self.port = site._server.sockets[0].getsockname()[1]
+            self._ready.set()
+
+        self._loop.run_until_complete(serve())
+        self._loop.run_forever()
+
+
+def _self_signed_cert(directory: Path):
+    """Write a throwaway certificate and key for localhost"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ))
+    return str(cert_path), str(key_path)
+
+
+async def _task_fetches(fetch, requests: int, concurrency: int):
+    """One simulated analysis task: `requests` page fetches, `concurrency` at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await fetch()
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+
+
+def _scraper() -> WebScraper:
+    return WebScraper("benchmark", timeout=30)
+
+
+def run_per_request(server: StandInServer, tasks: int, requests: int, concurrency: int):
+    async def fetch():
+        async with aiohttp.ClientSession() as session:
+            async with session.get(server.url, ssl=server.client_ssl) as response:
+                await response.text()
+
+    for _ in range(tasks):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(_task_fetches(fetch, requests, concurrency))
+        finally:
+            loop.close()
+
+
+def run_per_task(server: StandInServer, tasks: int, requests: int, concurrency: int):
+    for _ in range(tasks):
+        scraper = _scraper()
+
+        async def task():
+            session = await scraper.get_session()
+
+            async def fetch():
+                async with session.get(server.url, ssl=server.client_ssl) as response:
+                    await response.text()
+
+            try:
+                await _task_fetches(fetch, requests, concurrency)
+            finally:
+                await scraper.close()
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(task())
+        finally:
+            loop.close()
+
+
+def run_pooled(server: StandInServer, tasks: int, requests: int, concurrency: int):
+    scraper = _scraper()
+
+    async def task():
+        session = await scraper.get_session()
+
+        async def fetch():
+            async with session.get(server.url, ssl=server.client_ssl) as response:
+                await response.text()
+
+        await _task_fetches(fetch, requests, concurrency)
+
+    try:
+        for _ in range(tasks):
+            run_async(task())
+    finally:
+        run_async(scraper.close())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper session pooling benchmark")
+    parser.add_argument("--tasks", type=int, default=30, help="Simulated analysis tasks")
+    parser.add_argument("--requests", type=int, default=20, help="Page fetches per task")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent fetches within a task")
+    parser.add_argument("--tls", action="store_true", help="Serve HTTPS with a throwaway certificate")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = StandInServer(Path(tmp) if args.tls else None)
+        server.start()
+
+        total = args.tasks * args.requests
+        print(f"Server: {server.url} ({args.tasks} tasks x {args.requests} requests, concurrency {args.concurrency})")
+        print(f"{'mode':>12} {'seconds':>9} {'req/s':>9} {'connections':>12} {'ms/request':>11}")
+        for mode, run in [("per_request", run_per_request), ("per_task", run_per_task), ("pooled", run_pooled)]:
+            server.reset()
+            start = time.perf_counter()
+            run(server, args.tasks, args.requests, args.concurrency)
+            seconds = time.perf_counter() - start
+            assert server.requests == total
+            print(f"{mode:>12} {seconds:>9.3f} {total / seconds:>9.0f} {len(server.connections):>12} "
+                  f"{seconds / total * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
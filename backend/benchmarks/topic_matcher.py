@@ -0,0 +1,99 @@
+"""
+Benchmark: nested keyword loop vs compiled TopicMatcher
+
+Usage (from backend/):
+    python -m benchmarks.topic_matcher --comments 100000
+    python -m benchmarks.topic_matcher --extra-keywords 50
+
+--extra-keywords adds that many synthetic keywords per topic, to show how
+each approach scales with the size of the taxonomy.
+"""
+
+from collections import defaultdict
+import argparse
+import random
+import time
+
+from app.ml.topic_matcher import DEFAULT_TOPIC_TAXONOMY, TopicMatcher
+
+TEMPLATES = [
+    "I've been using {p} for months and it's amazing!",
+    "Really disappointed with {p}. Not worth the money.",
+    "Customer support for {p} is terrible. Never again.",
+    "Pricing of {p} is too high for what it offers.",
+    "Excellent features! {p} is our go-to solution.",
+    "User interface of {p} could be more intuitive.",
+    "Reliable and stable. {p} just works.",
+    "Why is {p} so expensive? Not happy",
+    "The toolbar in {p} is slow and the app lags on startup.",
+    "{p} update is fire! Great improvements, way faster now",
+    "Lots of features in {p} but steep learning curve. Support was helpful though.",
+]
+
+
+def legacy_extract_topics(texts, sentiments, taxonomy=DEFAULT_TOPIC_TAXONOMY):
+    """The original O(texts x keywords) substring scan, kept as the baseline"""
+    topics = defaultdict(lambda: {"count": 0, "keywords": set(), "sentiments": []})
+    for text, sentiment in zip(texts, sentiments):
+        text_lower = text.lower()
+        for topic, keywords in taxonomy.items():
+            for kw in keywords:
+                if kw in text_lower:
+                    topics[topic]["count"] += 1
+                    topics[topic]["sentiments"].append(sentiment['score'])
+                    if kw not in ["$"]:
+                        topics[topic]["keywords"].add(kw)
+    return {
+        topic: {
+            "count": data["count"],
+            "keywords": list(data["keywords"])[:5],
+            "avg_sentiment": sum(data["sentiments"]) / len(data["sentiments"]),
+        }
+        for topic, data in topics.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Topic extraction micro-benchmark")
+    parser.add_argument("--comments", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--extra-keywords", type=int, default=0, help="Synthetic keywords to add per topic")
+    args = parser.parse_args()
+
+    taxonomy = {
+        topic: keywords + [f"{topic}term{i}" for i in range(args.extra_keywords)]
+        for topic, keywords in DEFAULT_TOPIC_TAXONOMY.items()
+    }
+
+    random.seed(0)
+    texts = [random.choice(TEMPLATES).format(p=f"Product{random.randint(1, 50)}") for _ in range(args.comments)]
+    sentiments = [{"score": random.uniform(-1, 1)} for _ in texts]
+
+    start = time.perf_counter()
+    matcher = TopicMatcher(taxonomy)
+    compile_seconds = time.perf_counter() - start
+
+    def best_of(fn):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = fn(texts, sentiments)
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    legacy_seconds, legacy = best_of(lambda t, s: legacy_extract_topics(t, s, taxonomy))
+    matcher_seconds, matched = best_of(matcher.aggregate)
+
+    keyword_total = sum(len(keywords) for keywords in taxonomy.values())
+    print(f"Comments: {args.comments:,}, keywords: {keyword_total} (best of {args.repeat})")
+    print(f"  nested loop:   {legacy_seconds:.3f}s ({args.comments / legacy_seconds:,.0f} comments/s)")
+    print(f"  TopicMatcher:  {matcher_seconds:.3f}s ({args.comments / matcher_seconds:,.0f} comments/s), "
+          f"compile {compile_seconds * 1000:.1f}ms")
+    print(f"  speedup:       {legacy_seconds / matcher_seconds:.1f}x")
+    print(f"{'topic':>12} {'legacy':>8} {'matcher':>8}")
+    for topic in DEFAULT_TOPIC_TAXONOMY:
+        print(f"{topic:>12} {legacy.get(topic, {}).get('count', 0):>8} {matched.get(topic, {}).get('count', 0):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: TF-IDF + NMF topic extraction, first vs repeat analyses
+
+Usage (from backend/):
+    python -m benchmarks.topic_model
+    python -m benchmarks.topic_model --sizes 1000 10000 50000 --topics 8
+
+For each size, times a product's first analysis (vocabulary and NMF fit)
+against a later analysis that reuses them, and compares the reused-vocabulary
+transform with TfidfVectorizer.transform (time and max difference).
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.ml.topic_model import TopicModeler
+
+ASPECTS = {
+    "battery": "battery life charge drains hours charger",
+    "screen": "screen display brightness resolution glare pixels",
+    "shipping": "shipping delivery arrived package late courier",
+    "billing": "billing invoice refund charged subscription payment",
+    "support": "support agent ticket response waited helpful",
+    "sync": "sync export backup cloud upload files",
+    "login": "login password account locked reset authentication",
+    "speed": "slow lag crash freezes startup loading",
+}
+OPENERS = ["Honestly", "Update:", "After two weeks,", "Overall", "Not gonna lie,", ""]
+TONES = ["love the", "hate the", "really disappointed by the", "impressed with the", "no complaints about the"]
+
+
+def _comments(count: int, seed: int) -> tuple:
+    rng = random.Random(seed)
+    aspects = list(ASPECTS.values())
+    texts, scores = [], []
+    for _ in range(count):
+        words = rng.choice(aspects).split()
+        texts.append(f"{rng.choice(OPENERS)} {rng.choice(TONES)} {' '.join(rng.sample(words, 3))}. "
+                     f"The {rng.choice(words)} is {rng.choice(['great', 'awful', 'okay'])}!")
+        scores.append(rng.uniform(-1, 1))
+    return texts, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--topics", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'comments':>9} {'first_s':>8} {'repeat_s':>9} {'sklearn_tf_s':>13} {'reused_tf_s':>12} {'max_diff':>9} {'topics':>7}")
+    for size in args.sizes:
+        modeler = TopicModeler(n_topics=args.topics)
+        texts, scores = _comments(size, seed=0)
+        repeat_texts, repeat_scores = _comments(size, seed=1)
+
+        start = time.perf_counter()
+        modeler.extract(1, texts, scores)
+        first_seconds = time.perf_counter() - start
+
+        # Warm up, then time a repeat analysis on fresh comments
+        modeler.extract(1, repeat_texts, repeat_scores)
+        start = time.perf_counter()
+        topics = modeler.extract(1, repeat_texts, repeat_scores)
+        repeat_seconds = time.perf_counter() - start
+
+        # Transform parity against a vectorizer with the same vocabulary and IDF
+        vocabulary = modeler._get_vocabulary(1)
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        reference = TfidfVectorizer(vocabulary=vocabulary.terms, sublinear_tf=True, dtype=np.float32)
+        reference.fit(texts[:10])
+        reference.idf_ = vocabulary.idf
+
+        start = time.perf_counter()
+        expected = reference.transform(repeat_texts)
+        sklearn_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = vocabulary.transform(repeat_texts)
+        reused_seconds = time.perf_counter() - start
+        max_diff = abs(expected - actual).max()
+
+        print(f"{size:>9} {first_seconds:>8.3f} {repeat_seconds:>9.3f} {sklearn_seconds:>13.3f} "
+              f"{reused_seconds:>12.3f} {max_diff:>9.1e} {len(topics):>7}")
+
+    print("\nTopics (last size):")
+    for name, data in sorted(topics.items(), key=lambda kv: -kv[1]["count"]):
+        print(f"  {name:<30} {data['count']:>7}  avg_sentiment={data['avg_sentiment']:+.3f}  {', '.join(data['keywords'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Shared fixtures: a fresh in-memory SQLite database per test
+
+Settings are read from the environment when app.core.config is imported,
+so the required ones get test values before any app module is loaded.
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("DASHBOARD_CACHE_REDIS", "false")
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from aiohttp import web
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.product_summary import record_completed_analysis
+from app.models.database_models import Analysis, AnalysisStatus, Product
+
+
+@pytest.fixture
+def db():
+    """Session on an empty in-memory database with every table created"""
+    # StaticPool: every connection is the same one, so the tables stay visible
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def product(db):
+    product = Product(name="Widget")
+    db.add(product)
+    db.commit()
+    return product
+
+
+def complete_analysis(db, analysis: Analysis, completed_at: datetime = None) -> Analysis:
+    """Mark an analysis completed and make it its product's latest, as the worker does"""
+    analysis.status = AnalysisStatus.COMPLETED
+    analysis.completed_at = completed_at or datetime.now(timezone.utc)
+    db.flush()
+    record_completed_analysis(db, analysis)
+    db.commit()
+    return analysis
+
+
+@asynccontextmanager
+async def serve(handler):
+    """Run an aiohttp handler on a local port; yields the URL to request"""
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/"
+    finally:
+        await runner.cleanup()
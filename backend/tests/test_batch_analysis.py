@@ -0,0 +1,86 @@
+from fastapi import BackgroundTasks, HTTPException
+from pydantic import ValidationError
+import pytest
+
+from app.api.analysis import get_batch_status, start_batch_analysis
+from app.core.config import settings
+from app.models.database_models import Analysis, AnalysisStatus, Product
+from app.models.schemas import BatchAnalysisRequest
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    batches = []
+    monkeypatch.setattr("app.tasks.batches.dispatch_batch", lambda batch_id, jobs: batches.append(jobs))
+    return batches
+
+
+def test_batch_names_are_deduplicated():
+    request = BatchAnalysisRequest(product_names=[" Widget", "Widget", "Gadget", "  "])
+    assert request.product_names == ["Widget", "Gadget"]
+
+
+def test_batch_size_is_limited():
+    with pytest.raises(ValidationError):
+        BatchAnalysisRequest(product_names=[f"p{i}" for i in range(settings.BATCH_MAX_PRODUCTS + 1)])
+    with pytest.raises(ValidationError):
+        BatchAnalysisRequest(product_names=[" "])
+
+
+def test_batch_coalesces_with_running_analyses(db, dispatched):
+    first = start_batch_analysis(BatchAnalysisRequest(product_names=["Widget", "Gadget"]), BackgroundTasks(), db)
+    assert (first.queued, first.coalesced) == (2, 0)
+    assert db.query(Product).count() == 2
+
+    second = start_batch_analysis(BatchAnalysisRequest(product_names=["Gadget", "Gizmo"]), BackgroundTasks(), db)
+    assert (second.queued, second.coalesced) == (1, 1)
+    items = {item.product_name: item for item in second.analyses}
+    assert items["Gadget"].coalesced
+    assert items["Gadget"].analysis_id == {item.product_name: item for item in first.analyses}["Gadget"].analysis_id
+    assert not items["Gizmo"].coalesced
+
+    assert db.query(Analysis).count() == 3
+    assert [[name for _, name in jobs] for jobs in dispatched] == [["Widget", "Gadget"], ["Gizmo"]]
+
+
+def test_batch_status_aggregates_member_analyses(db, dispatched):
+    started = start_batch_analysis(BatchAnalysisRequest(product_names=["Widget", "Gadget", "Gizmo"]), BackgroundTasks(), db)
+    analyses = {item.product_name: db.get(Analysis, item.analysis_id) for item in started.analyses}
+
+    status = get_batch_status(started.batch_id, db)
+    assert (status.status, status.total, status.pending, status.progress) == ("in_progress", 3, 3, 0.0)
+
+    analyses["Widget"].status = AnalysisStatus.COMPLETED
+    analyses["Gadget"].status = AnalysisStatus.IN_PROGRESS
+    db.commit()
+    status = get_batch_status(started.batch_id, db)
+    assert (status.pending, status.in_progress, status.completed, status.failed) == (1, 1, 1, 0)
+    assert status.progress == 33.3
+    assert status.completed_at is None
+
+    # A failed analysis still finishes the batch
+    analyses["Gadget"].status = AnalysisStatus.COMPLETED
+    analyses["Gizmo"].status = AnalysisStatus.FAILED
+    db.commit()
+    status = get_batch_status(started.batch_id, db)
+    assert (status.status, status.completed, status.failed, status.progress) == ("completed", 2, 1, 100.0)
+    assert status.completed_at is not None
+
+
+def test_batch_status_counts_coalesced_analyses(db, dispatched):
+    first = start_batch_analysis(BatchAnalysisRequest(product_names=["Widget"]), BackgroundTasks(), db)
+    second = start_batch_analysis(BatchAnalysisRequest(product_names=["Widget", "Gadget"]), BackgroundTasks(), db)
+
+    db.get(Analysis, first.analyses[0].analysis_id).status = AnalysisStatus.COMPLETED
+    db.commit()
+
+    # The analysis the second batch joined counts towards both
+    assert get_batch_status(first.batch_id, db).status == "completed"
+    status = get_batch_status(second.batch_id, db)
+    assert (status.status, status.completed, status.pending) == ("in_progress", 1, 1)
+
+
+def test_unknown_batch_is_not_found(db):
+    with pytest.raises(HTTPException) as raised:
+        get_batch_status(404, db)
+    assert raised.value.status_code == 404
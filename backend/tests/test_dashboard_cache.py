@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from app.core.dashboard_cache import DashboardCache
+
+
+class Builder:
+    def __init__(self, body: bytes = b"{}", delay: float = 0):
+        self.body = body
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self) -> bytes:
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.body
+
+
+def test_entries_are_built_once_until_invalidated():
+    cache = DashboardCache()
+    build = Builder(b'{"v": 1}')
+    assert cache.get_or_build("Widget", build) == b'{"v": 1}'
+    assert cache.get_or_build("Widget", build) == b'{"v": 1}'
+    assert build.calls == 1
+
+    cache.invalidate("Widget")
+    build.body = b'{"v": 2}'
+    assert cache.get_or_build("Widget", build) == b'{"v": 2}'
+    assert build.calls == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_invalidation_only_affects_its_product():
+    cache = DashboardCache()
+    widget, gadget = Builder(), Builder()
+    cache.get_or_build("Widget", widget)
+    cache.get_or_build("Gadget", gadget)
+    cache.invalidate("Widget")
+    cache.get_or_build("Widget", widget)
+    cache.get_or_build("Gadget", gadget)
+    assert (widget.calls, gadget.calls) == (2, 1)
+
+
+def test_bodies_are_only_served_for_their_version():
+    cache = DashboardCache()
+    cache.get_or_build("Widget", Builder(b"old"), version="a")
+    assert cache.get_or_build("Widget", Builder(b"new"), version="b") == b"new"
+
+
+def test_concurrent_misses_build_once():
+    cache = DashboardCache()
+    build = Builder(delay=0.2)
+    threads = [threading.Thread(target=cache.get_or_build, args=("Widget", build)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert build.calls == 1
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_failed_builds_are_not_cached():
+    cache = DashboardCache()
+
+    def fail():
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_build("Widget", fail)
+    assert cache.get_or_build("Widget", Builder(b"ok")) == b"ok"
+
+
+def test_entries_expire_after_the_ttl():
+    cache = DashboardCache(ttl=0)
+    build = Builder()
+    cache.get_or_build("Widget", build)
+    cache.get_or_build("Widget", build)
+    assert build.calls == 2
+
+
+def test_least_recently_used_products_are_evicted():
+    cache = DashboardCache(max_size=2)
+    builds = {name: Builder() for name in ("a", "b", "c")}
+    for name in ("a", "b", "a", "c"):
+        cache.get_or_build(name, builds[name])
+    cache.get_or_build("a", builds["a"])
+    cache.get_or_build("b", builds["b"])
+    assert (builds["a"].calls, builds["b"].calls) == (1, 2)
@@ -0,0 +1,68 @@
+from app.core.dedup_index import load_duplicate_index, save_duplicate_index
+from app.ml.dedup import DuplicateIndex, duplicate_weights, normalize, score_deduplicated, simhash
+
+
+class CountingScorer:
+    def __init__(self):
+        self.scored = []
+
+    def __call__(self, texts):
+        self.scored.extend(texts)
+        return [{"sentiment": "positive", "score": 0.8, "confidence": 0.9} for _ in texts]
+
+
+def test_exact_duplicates_are_scored_once():
+    score = CountingScorer()
+    sentiments, stats = score_deduplicated(
+        ["Love it!", "Love  it!\n", "Love it!", "Hate it"],
+        score,
+        DuplicateIndex()
+    )
+    assert score.scored == ["Love it!", "Hate it"]
+    assert stats == {"scored": 2, "exact": 2}
+    assert len(sentiments) == 4
+
+
+def test_texts_differing_in_case_or_punctuation_are_scored_separately():
+    # The same after normalize(), but the model reads the difference
+    texts = ["Love it!", "love it", "LOVE IT \U0001F621", "RT @shop: Love it http://t.co/x"]
+    assert len({normalize(text) for text in texts}) == 1
+    score = CountingScorer()
+    _, stats = score_deduplicated(texts, score, DuplicateIndex())
+    assert score.scored == texts
+    assert stats == {"scored": 4, "exact": 0}
+
+
+def test_near_duplicates_are_scored_themselves():
+    score = CountingScorer()
+    index = DuplicateIndex()
+    score_deduplicated(["the battery lasts all day and the screen is good"], score, index)
+    score_deduplicated(["the battery lasts all day and the screen is not good"], score, index)
+    assert len(score.scored) == 2
+
+
+def test_reordered_words_are_not_near_duplicates():
+    first = simhash(normalize("the battery is good and the screen is bad"))
+    second = simhash(normalize("the battery is bad and the screen is good"))
+    assert bin(first ^ second).count("1") > 6
+
+
+def test_repeats_are_down_weighted():
+    weights = duplicate_weights(
+        ["Great phone, fast shipping, works well", "great phone fast shipping works well!", "Broke in a week"],
+        duplicate_weight=0.1
+    )
+    assert weights == [1.0, 0.1, 1.0]
+
+
+def test_stored_index_prefers_the_newest_result(db, product):
+    for score in (0.1, 0.9):
+        index = DuplicateIndex()
+        index.add("same-text", None, {"sentiment": "positive", "score": score, "confidence": 1.0})
+        save_duplicate_index(db, product.id, "model", index)
+    db.commit()
+
+    index = load_duplicate_index(db, product.id, "model")
+    entry, _ = index.lookup("same-text", None)
+    assert index.result(entry)["score"] == 0.9
+    assert load_duplicate_index(db, product.id, "other-model").lookup("same-text", None) is None
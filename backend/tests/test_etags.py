@@ -0,0 +1,81 @@
+import json
+
+from fastapi import Response
+import pytest
+from starlette.requests import Request
+
+from app.api.analysis import get_analysis_status, get_dashboard_data
+from app.core.dashboard_cache import DashboardCache
+from app.models.database_models import Analysis, AnalysisStatus
+from tests.conftest import complete_analysis
+
+
+def request_with(etag: str = None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+@pytest.fixture
+def dashboard_cache(monkeypatch):
+    cache = DashboardCache()
+    monkeypatch.setattr("app.api.analysis.get_dashboard_cache", lambda: cache)
+    return cache
+
+
+def test_status_is_not_modified_until_the_analysis_moves_on(db, product):
+    analysis = Analysis(product_id=product.id, status=AnalysisStatus.PENDING)
+    db.add(analysis)
+    db.commit()
+
+    response = Response()
+    assert get_analysis_status(analysis.id, request_with(), response, db).id == analysis.id
+    etag = response.headers["ETag"]
+    assert get_analysis_status(analysis.id, request_with(etag), Response(), db).status_code == 304
+
+    analysis.status = AnalysisStatus.IN_PROGRESS
+    db.commit()
+    response = Response()
+    get_analysis_status(analysis.id, request_with(etag), response, db)
+    assert response.headers["ETag"] != etag
+
+
+def test_if_none_match_uses_weak_comparison(db, product):
+    analysis = Analysis(product_id=product.id, status=AnalysisStatus.PENDING)
+    db.add(analysis)
+    db.commit()
+    response = Response()
+    get_analysis_status(analysis.id, request_with(), response, db)
+    etag = response.headers["ETag"]
+
+    for header in (f"W/{etag}", f'"other", {etag}', "*"):
+        assert get_analysis_status(analysis.id, request_with(header), Response(), db).status_code == 304
+
+
+def completed(db, product) -> Analysis:
+    analysis = Analysis(product_id=product.id, status=AnalysisStatus.PENDING)
+    db.add(analysis)
+    return complete_analysis(db, analysis)
+
+
+def test_dashboard_is_not_modified_until_a_new_analysis_completes(db, product, dashboard_cache):
+    first = completed(db, product)
+
+    response = get_dashboard_data("Widget", request_with(), db)
+    etag = response.headers["ETag"]
+    assert json.loads(response.body)["latest_analysis"]["id"] == first.id
+    assert get_dashboard_data("Widget", request_with(etag), db).status_code == 304
+
+    second = completed(db, product)
+    response = get_dashboard_data("Widget", request_with(etag), db)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    # Not invalidated yet (the worker does that after committing), but the
+    # new ETag is a new cache version, so the previous body is not reused
+    assert json.loads(response.body)["latest_analysis"]["id"] == second.id
+
+
+def test_dashboard_without_analyses_has_no_etag(db, product, dashboard_cache):
+    response = get_dashboard_data("Widget", request_with(), db)
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert json.loads(response.body)["latest_analysis"] is None
@@ -0,0 +1,74 @@
+"""InferenceClient against a real InferenceServer with a stub analyzer"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import asyncio
+import os
+import threading
+import time
+
+from app.ml.inference_server import InferenceClient, InferenceServer
+
+
+class LengthAnalyzer:
+    """Scores a text by its length, so results can be matched to their texts"""
+
+    cache_namespace = "stub"
+
+    def analyze_batch(self, texts):
+        return [{"sentiment": "neutral", "score": len(text)} for text in texts]
+
+
+@contextmanager
+def running_server(socket_path: str, **kwargs):
+    """Run an InferenceServer on its own event loop thread; yields the server"""
+    server = InferenceServer(LengthAnalyzer(), socket_path, **kwargs)
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(server.serve_forever())
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        # Let the cancelled batcher task finish too
+        loop.run_until_complete(asyncio.sleep(0))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not os.path.exists(socket_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        yield server
+    finally:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join(timeout=5)
+        loop.close()
+
+
+def test_large_calls_are_split_into_requests(tmp_path):
+    socket_path = str(tmp_path / "inference.sock")
+    texts = ["a" * n for n in range(1, 6)]
+
+    with running_server(socket_path, max_batch_texts=4, max_wait_ms=1) as server:
+        results = InferenceClient(socket_path, timeout=5, max_request_texts=2).analyze_batch(texts)
+
+    assert [result["score"] for result in results] == [1, 2, 3, 4, 5]
+    assert server.batcher.requests == 3
+
+
+def _concurrent_batches(socket_path: str, request_texts: int) -> int:
+    """Micro-batches the server ran for two workers each sending request_texts texts at once"""
+    with running_server(socket_path, max_batch_texts=4, max_wait_ms=500) as server:
+        client = InferenceClient(socket_path, timeout=5, max_request_texts=request_texts)
+        with ThreadPoolExecutor(2) as pool:
+            list(pool.map(client.analyze_batch, [["x"] * request_texts] * 2))
+        return server.batcher.batches
+
+
+def test_requests_below_the_batch_size_share_micro_batches(tmp_path):
+    # Half-size requests from two workers fill one micro-batch together;
+    # full-size ones each fill their own
+    assert _concurrent_batches(str(tmp_path / "half.sock"), request_texts=2) == 1
+    assert _concurrent_batches(str(tmp_path / "full.sock"), request_texts=4) == 2
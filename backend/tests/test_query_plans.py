@@ -0,0 +1,144 @@
+"""
+Query plans: the dashboard and scrape cursor queries use the composite indexes
+
+The queries come from the app's own builders. Plans are checked on an
+in-memory SQLite database, and on PostgreSQL too when TEST_DATABASE_URL
+points at a scratch database (the test creates its tables and drops them
+afterwards). Both get a few thousand rows and fresh statistics, so the
+planner picks what it would on real data rather than scanning small tables.
+"""
+
+from datetime import datetime, timedelta, timezone
+import json
+import os
+
+import pytest
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.api.analysis import _recent_comments_query, _topics_query
+from app.core.database import Base
+from app.core.scrape_cursors import _completed_analyses_query
+from app.models.database_models import Analysis, AnalysisStatus, CustomerComment, Product, Topic
+
+PRODUCTS = 20
+ANALYSES_PER_PRODUCT = 10
+COMMENTS_PER_ANALYSIS = 20
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def plan_db(request):
+    """Session on a filled database; yields (session, ids of the sample rows)"""
+    if request.param == "sqlite":
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        url = os.environ.get("TEST_DATABASE_URL")
+        if not url:
+            pytest.skip("TEST_DATABASE_URL is not set")
+        engine = create_engine(url)
+
+    Base.metadata.create_all(engine)
+    try:
+        with Session(engine) as db:
+            samples = _fill(db)
+            yield db, samples
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def _fill(db: Session) -> dict:
+    """Products with a chain of incremental analyses each, their comments and topics"""
+    now = datetime.now(timezone.utc)
+    product_ids = db.execute(
+        insert(Product).returning(Product.id),
+        [{"name": f"product {i}"} for i in range(PRODUCTS)]
+    ).scalars().all()
+
+    analysis_ids = []
+    for product_id in product_ids:
+        base = None
+        for i in range(ANALYSES_PER_PRODUCT):
+            base = db.execute(insert(Analysis).returning(Analysis.id).values(
+                product_id=product_id,
+                status=AnalysisStatus.COMPLETED,
+                completed_at=now - timedelta(days=ANALYSES_PER_PRODUCT - i),
+                base_analysis_id=base,
+                inherited_since=now - timedelta(days=90) if base else None
+            )).scalar()
+            analysis_ids.append(base)
+
+    db.execute(insert(CustomerComment), [
+        {"product_id": product_ids[n // ANALYSES_PER_PRODUCT], "analysis_id": analysis_id,
+         "text": f"comment {i}", "source": "reddit", "scraped_at": now - timedelta(minutes=i)}
+        for n, analysis_id in enumerate(analysis_ids)
+        for i in range(COMMENTS_PER_ANALYSIS)
+    ])
+    db.execute(insert(Topic), [
+        {"analysis_id": analysis_id, "name": f"topic {i}", "mention_count": i}
+        for analysis_id in analysis_ids
+        for i in range(5)
+    ])
+    db.commit()
+    db.execute(text("ANALYZE"))
+
+    return {
+        "product_id": product_ids[0],
+        "first_analysis_id": analysis_ids[0],  # No base analysis
+        "latest_analysis_id": analysis_ids[ANALYSES_PER_PRODUCT - 1],  # Inherits from the others
+    }
+
+
+def explain(db: Session, query) -> dict:
+    """Index lookups and sorts in a query's plan: {"searches": {index names}, "sorts": bool}"""
+    sql = str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    if db.get_bind().dialect.name == "postgresql":
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        nodes = _plan_nodes((plan if not isinstance(plan, str) else json.loads(plan))[0]["Plan"])
+        return {
+            # Index nodes without an Index Cond only walk the whole index
+            "searches": {node["Index Name"] for node in nodes if "Index Name" in node and "Index Cond" in node},
+            "sorts": any(node["Node Type"] in ("Sort", "Incremental Sort") for node in nodes),
+        }
+    details = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return {
+        "searches": {
+            detail.split(" INDEX ")[1].split()[0]
+            for detail in details if detail.startswith("SEARCH") and " INDEX " in detail
+        },
+        "sorts": any("TEMP B-TREE FOR ORDER BY" in detail for detail in details),
+    }
+
+
+def _plan_nodes(node: dict) -> list:
+    return [node] + [child for plan in node.get("Plans", []) for child in _plan_nodes(plan)]
+
+
+def test_recent_comments_read_the_index_in_order(plan_db):
+    db, samples = plan_db
+    plan = explain(db, _recent_comments_query(db, samples["first_analysis_id"]))
+    assert "ix_customer_comments_analysis_scraped" in plan["searches"]
+    assert not plan["sorts"]
+
+
+def test_recent_comments_with_inherited_scope_search_the_index(plan_db):
+    # comment_scope over the chain of base analyses: one index range per
+    # analysis, then a sort of just those rows
+    db, samples = plan_db
+    plan = explain(db, _recent_comments_query(db, samples["latest_analysis_id"]))
+    assert "ix_customer_comments_analysis_scraped" in plan["searches"]
+
+
+def test_topics_search_the_index(plan_db):
+    db, samples = plan_db
+    plan = explain(db, _topics_query(db, samples["latest_analysis_id"]))
+    # PostgreSQL may still sort an analysis's handful of topics itself
+    assert "ix_topics_analysis_mentions" in plan["searches"]
+
+
+def test_completed_analyses_search_the_index(plan_db):
+    db, samples = plan_db
+    query = _completed_analyses_query(db, samples["product_id"], exclude=samples["latest_analysis_id"]).limit(1)
+    plan = explain(db, query)
+    assert "ix_analyses_product_status_completed" in plan["searches"]
@@ -0,0 +1,86 @@
+from fastapi import Response
+import pytest
+from sqlalchemy import event
+
+from app.api.saved_products import get_saved_products
+from app.models.database_models import Analysis, AnalysisStatus, Product, SavedProduct, User
+from tests.conftest import complete_analysis
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="tester@example.com", hashed_password="x", full_name="Tester")
+    db.add(user)
+    db.flush()
+    for i in range(5):
+        product = Product(name=f"product-{i}")
+        db.add(product)
+        db.flush()
+        db.add(SavedProduct(user_id=user.id, product_id=product.id))
+    db.commit()
+    return user
+
+
+@pytest.mark.parametrize("offset, rows", [(0, 2), (2, 2), (4, 1), (10, 0)])
+def test_every_page_reports_the_total(db, user, offset, rows):
+    response = Response()
+    page = get_saved_products(response=response, limit=2, offset=offset, current_user=user, db=db)
+    assert len(page) == rows
+    assert response.headers["X-Total-Count"] == "5"
+
+
+def test_pages_do_not_overlap(db, user):
+    names = []
+    for offset in (0, 2, 4):
+        names += [item["product_name"] for item in get_saved_products(
+            response=Response(), limit=2, offset=offset, current_user=user, db=db
+        )]
+    assert sorted(names) == [f"product-{i}" for i in range(5)]
+
+
+def _saved_products_user(db, email: str, size: int) -> User:
+    """A user who saved `size` products, each with two completed analyses"""
+    user = User(email=email, hashed_password="x", full_name="Tester")
+    db.add(user)
+    db.flush()
+    for i in range(size):
+        product = Product(name=f"{email}-{i}")
+        db.add(product)
+        db.flush()
+        for _ in range(2):
+            analysis = Analysis(product_id=product.id, status=AnalysisStatus.PENDING,
+                                total_comments=10, positive_count=6, negative_count=2, neutral_count=2)
+            db.add(analysis)
+            complete_analysis(db, analysis)
+        db.add(SavedProduct(user_id=user.id, product_id=product.id))
+    db.commit()
+    return user
+
+
+def _count_statements(db, call) -> int:
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return len(statements)
+
+
+def test_query_count_does_not_grow_with_saved_products(db):
+    counts = {}
+    for size in (1, 200):
+        user = _saved_products_user(db, f"user{size}@example.com", size)
+        user_id = user.id  # Loaded before counting
+        page = []
+        counts[size] = _count_statements(db, lambda: page.extend(get_saved_products(
+            response=Response(), limit=200, offset=0, current_user=user, db=db
+        )))
+        assert len(page) == size and user_id
+        assert page[0]["last_analysis"] is not None
+    assert counts[1] == counts[200]
@@ -0,0 +1,124 @@
+"""ScrapeScheduler against a local mock server (throttling, retries, circuit breaker)"""
+
+import asyncio
+
+import aiohttp
+from aiohttp import web
+import pytest
+
+from app.scrapers.scheduler import CircuitOpenError, ScrapeScheduler
+
+from tests.conftest import serve
+
+
+def make_scheduler(**kwargs) -> ScrapeScheduler:
+    options = dict(rate_per_host=1000, burst_per_host=100, backoff_base=0.01, backoff_max=0.05)
+    options.update(kwargs)
+    return ScrapeScheduler(**options)
+
+
+def test_throttled_requests_are_retried_after_retry_after():
+    hits = []
+
+    async def handler(request):
+        hits.append(request)
+        if len(hits) <= 2:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        return web.Response(text="ok")
+
+    async def run():
+        scheduler = make_scheduler(max_retries=3)
+        async with serve(handler) as url, aiohttp.ClientSession() as session:
+            body = await scheduler.fetch(session, url, "mock")
+        return scheduler, body
+
+    scheduler, body = asyncio.run(run())
+
+    assert body == "ok"
+    assert len(hits) == 3
+    assert scheduler.throttled == 2 and scheduler.retries == 2
+    # Throttling means the source is up, so it doesn't count against the breaker
+    assert scheduler.breaker("mock").state == "closed"
+
+
+def test_gives_up_when_retries_run_out():
+    hits = []
+
+    async def handler(request):
+        hits.append(request)
+        return web.Response(status=429)
+
+    async def run():
+        scheduler = make_scheduler(max_retries=2)
+        async with serve(handler) as url, aiohttp.ClientSession() as session:
+            with pytest.raises(aiohttp.ClientResponseError) as raised:
+                await scheduler.fetch(session, url, "mock")
+        return raised.value
+
+    assert asyncio.run(run()).status == 429
+    assert len(hits) == 3
+
+
+def test_failing_source_opens_its_breaker():
+    hits = []
+
+    async def handler(request):
+        hits.append(request)
+        return web.Response(status=503)
+
+    async def run():
+        scheduler = make_scheduler(max_retries=1, breaker_threshold=2)
+        async with serve(handler) as url, aiohttp.ClientSession() as session:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await scheduler.fetch(session, url, "mock")
+            with pytest.raises(CircuitOpenError):
+                await scheduler.fetch(session, url, "mock")
+        return scheduler
+
+    scheduler = asyncio.run(run())
+
+    assert len(hits) == 2
+    assert scheduler.rejected == 1
+    assert scheduler.breaker("mock").state == "open"
+
+
+def test_cancelled_trial_does_not_leave_the_breaker_stuck():
+    state = {"calls": 0}
+
+    async def run():
+        arrived, release = asyncio.Event(), asyncio.Event()
+
+        async def handler(request):
+            state["calls"] += 1
+            if state["calls"] == 1:
+                arrived.set()
+                await release.wait()
+            return web.Response(text="ok")
+
+        scheduler = make_scheduler(breaker_threshold=1, breaker_reset=0.2)
+        breaker = scheduler.breaker("mock")
+        breaker.record_failure()
+        await asyncio.sleep(0.25)
+        assert breaker.state == "half_open"
+
+        async with serve(handler) as url, aiohttp.ClientSession() as session:
+            trial = asyncio.create_task(scheduler.fetch(session, url, "mock"))
+            await arrived.wait()
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+            release.set()
+
+            # The cancelled trial counts as failed: open for another cool-down,
+            # then a new trial goes out and closes the breaker
+            assert breaker.state == "open"
+            with pytest.raises(CircuitOpenError):
+                await scheduler.fetch(session, url, "mock")
+            await asyncio.sleep(0.25)
+            body = await scheduler.fetch(session, url, "mock")
+        return breaker, body
+
+    breaker, body = asyncio.run(run())
+
+    assert body == "ok"
+    assert breaker.state == "closed"
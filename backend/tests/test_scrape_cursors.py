@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core.scrape_cursors import carry_forward_comments, comment_scope
+from app.models.database_models import Analysis, CustomerComment
+from app.tasks.analysis_tasks import _load_saved_comments, extract_topics
+
+from tests.conftest import complete_analysis
+
+
+def _analysis(db, product, texts, posted_days_ago=0):
+    analysis = Analysis(product_id=product.id)
+    db.add(analysis)
+    db.flush()
+    posted_at = datetime.now(timezone.utc) - timedelta(days=posted_days_ago)
+    db.add_all(
+        CustomerComment(
+            product_id=product.id,
+            analysis_id=analysis.id,
+            text=text,
+            source="reddit",
+            sentiment="POSITIVE",
+            sentiment_score=0.5,
+            posted_at=posted_at
+        )
+        for text in texts
+    )
+    db.commit()
+    return analysis
+
+
+def _scope_texts(db, analysis):
+    return sorted(c.text for c in db.query(CustomerComment).filter(comment_scope(db, analysis.id)))
+
+
+def test_first_analysis_has_nothing_to_inherit(db, product):
+    analysis = _analysis(db, product, ["a"])
+    assert carry_forward_comments(db, product.id, analysis.id) is None
+    assert _scope_texts(db, analysis) == ["a"]
+
+
+def test_carry_forward_references_instead_of_copying(db, product):
+    first = complete_analysis(db, _analysis(db, product, ["a", "b"]))
+    second = _analysis(db, product, ["c"])
+
+    assert carry_forward_comments(db, product.id, second.id) == first.id
+    db.commit()
+
+    assert db.query(CustomerComment).count() == 3
+    assert _scope_texts(db, second) == ["a", "b", "c"]
+    assert _scope_texts(db, first) == ["a", "b"]
+
+
+def test_inheritance_follows_the_chain_within_the_age_limit(db, product):
+    old = complete_analysis(db, _analysis(db, product, ["old"], posted_days_ago=200),
+                            datetime.now(timezone.utc) - timedelta(days=200))
+    middle = _analysis(db, product, ["middle"], posted_days_ago=10)
+    carry_forward_comments(db, product.id, middle.id, max_age_days=0)
+    complete_analysis(db, middle)
+    latest = _analysis(db, product, ["new"])
+    carry_forward_comments(db, product.id, latest.id, max_age_days=90)
+    db.commit()
+
+    assert db.get(Analysis, latest.id).base_analysis_id == middle.id
+    assert _scope_texts(db, middle) == ["middle", "old"]
+    assert _scope_texts(db, latest) == ["middle", "new"]
+    assert old.id not in {c.analysis_id for c in db.query(CustomerComment).filter(comment_scope(db, latest.id))}
+
+
+def test_saved_comments_list_inherited_ones_first(db, product):
+    complete_analysis(db, _analysis(db, product, ["a", "b"]))
+    second = _analysis(db, product, ["c"])
+    carry_forward_comments(db, product.id, second.id)
+    db.commit()
+
+    texts, sentiments, new_from = _load_saved_comments(db, second.id)
+    assert texts == ["a", "b", "c"]
+    assert new_from == 2
+    assert sentiments[2] == {"sentiment": "positive", "score": 0.5}
+
+
+def test_only_new_comments_count_towards_new_topics():
+    texts = ["too expensive", "support was slow", "great price"]
+    sentiments = [{"sentiment": "neutral", "score": 0.0}] * 3
+
+    topics, new_topics = extract_topics(texts, sentiments, new_from=2)
+    assert topics["price"]["count"] == 2
+    assert new_topics["price"]["count"] == 1
+    assert "support" in topics and "support" not in new_topics
@@ -0,0 +1,21 @@
+from app.ml.sentiment_analyzer import _bucket_by_length
+
+
+def test_buckets_group_similar_lengths():
+    lengths = [300, 5, 280, 6, 7, 310]
+    buckets = _bucket_by_length(lengths, token_budget=1000, max_batch_size=8)
+    assert buckets == [[1, 3, 4], [2, 0, 5]]
+
+
+def test_buckets_respect_the_token_budget_and_batch_size():
+    lengths = [10 * (i % 7 + 1) for i in range(100)]
+    buckets = _bucket_by_length(lengths, token_budget=256, max_batch_size=16)
+    assert sorted(i for bucket in buckets for i in bucket) == list(range(100))
+    for bucket in buckets:
+        assert len(bucket) <= 16
+        assert len(bucket) * max(lengths[i] for i in bucket) <= 256
+
+
+def test_input_over_the_budget_gets_its_own_bucket():
+    buckets = _bucket_by_length([4, 600, 5], token_budget=512, max_batch_size=8)
+    assert buckets == [[0, 2], [1]]
@@ -0,0 +1,50 @@
+from app.ml.sentiment_analyzer import SentimentAnalyzer
+from app.ml.sentiment_cache import SentimentCache, cache_key
+
+POSITIVE = {"sentiment": "positive", "score": 0.9, "confidence": 0.9}
+
+
+class CountingAnalyzer(SentimentAnalyzer):
+    """SentimentAnalyzer without a model: records what reaches _score_batch"""
+
+    def __init__(self, cache: SentimentCache):
+        self.model_name = "test-model"
+        self.backend = "pytorch"
+        self.long_text_mode = "truncate"
+        self.cache = cache
+        self.scored = []
+
+    def _score_batch(self, texts):
+        self.scored.extend(texts)
+        return [dict(POSITIVE) for _ in texts]
+
+
+def test_only_cache_misses_are_scored():
+    analyzer = CountingAnalyzer(SentimentCache(max_size=100))
+    analyzer.analyze_batch(["great phone", "battery died"])
+    results = analyzer.analyze_batch(["battery died", "great  phone ", "new text"])
+    assert analyzer.scored == ["great phone", "battery died", "new text"]
+    assert results == [POSITIVE] * 3
+    assert analyzer.cache.stats()["hits"] == 2
+
+
+def test_keys_depend_on_the_model_and_fold_whitespace():
+    assert cache_key("model-a", "great  phone\n") == cache_key("model-a", "great phone")
+    assert cache_key("model-a", "great phone") != cache_key("model-b", "great phone")
+    assert cache_key("model-a", "Great phone") != cache_key("model-a", "great phone")
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SentimentCache(max_size=2)
+    cache.set_many("m", ["a", "b"], [POSITIVE, POSITIVE])
+    cache.get_many("m", ["a"])  # "b" is now the oldest
+    cache.set_many("m", ["c"], [POSITIVE])
+    assert cache.get_many("m", ["a", "b", "c"]) == [POSITIVE, None, POSITIVE]
+    assert cache.stats()["size"] == 2
+
+
+def test_unreachable_redis_falls_back_to_the_lru():
+    cache = SentimentCache(max_size=10, redis_url="redis://127.0.0.1:1/0")
+    cache.set_many("m", ["a"], [POSITIVE])
+    assert cache.get_many("m", ["a"]) == [POSITIVE]
+    assert cache.stats()["redis_enabled"] is False
@@ -0,0 +1,21 @@
+from fastapi import BackgroundTasks
+
+from app.api.analysis import start_analysis
+from app.models.database_models import Analysis
+from app.models.schemas import AnalysisRequest
+
+
+def test_concurrent_requests_coalesce_into_one_analysis(db, monkeypatch):
+    monkeypatch.setattr("app.api.analysis.settings.DEMO_MODE", True)
+
+    first_tasks = BackgroundTasks()
+    first = start_analysis(AnalysisRequest(product_name="Widget"), first_tasks, db)
+    assert not first.coalesced
+    assert len(first_tasks.tasks) == 1  # Demo run starts after the response
+
+    second_tasks = BackgroundTasks()
+    second = start_analysis(AnalysisRequest(product_name="Widget"), second_tasks, db)
+    assert second.coalesced
+    assert second.analysis_id == first.analysis_id
+    assert not second_tasks.tasks
+    assert db.query(Analysis).count() == 1
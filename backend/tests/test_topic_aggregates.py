@@ -0,0 +1,141 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+import os
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.core.topic_aggregates import backfill_topic_aggregates, record_topics, top_topics
+from app.models.database_models import Analysis, AnalysisStatus, Product, ProductTopicAggregate, Topic
+
+
+@pytest.fixture
+def postgresql_engine():
+    """Engine on the scratch PostgreSQL database at TEST_DATABASE_URL, tables created"""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url or not url.startswith("postgresql"):
+        pytest.skip("TEST_DATABASE_URL is not a PostgreSQL database")
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def _topic(count, avg_sentiment, keyword_counts):
+    return {
+        "count": count,
+        "avg_sentiment": avg_sentiment,
+        "sentiment_sum": avg_sentiment * count,
+        "keywords": list(keyword_counts),
+        "keyword_counts": keyword_counts,
+    }
+
+
+def test_record_topics_adds_up_within_a_day(db, product):
+    day = date(2026, 1, 1)
+    record_topics(db, product.id, {"price": _topic(3, 0.5, {"price": 2, "cost": 1})}, day)
+    record_topics(db, product.id, {"price": _topic(2, -0.5, {"price": 1, "cheap": 2})}, day)
+    db.commit()
+
+    row = db.query(ProductTopicAggregate).one()
+    assert row.bucket_date == day
+    assert row.mention_count == 5
+    assert row.sentiment_sum == 0.5
+    assert row.keyword_counts == {"price": 3, "cost": 1, "cheap": 2}
+    assert row.analysis_count == 2
+
+
+def test_record_topics_keeps_one_row_per_day_and_topic(db, product):
+    today = datetime.utcnow().date()
+    record_topics(db, product.id, {"price": _topic(1, 1.0, {"price": 1})}, today - timedelta(days=1))
+    record_topics(db, product.id, {"price": _topic(2, 0.0, {"price": 2}), "support": _topic(4, 0.25, {})}, today)
+    db.commit()
+
+    assert db.query(ProductTopicAggregate).count() == 3
+    topics = {topic["name"]: topic for topic in top_topics(db, product.id, days=7)}
+    assert topics["price"]["mention_count"] == 3
+    assert topics["price"]["analysis_count"] == 2
+    assert topics["price"]["avg_sentiment"] == 1 / 3
+    assert topics["support"]["mention_count"] == 4
+    assert [topic["name"] for topic in top_topics(db, product.id, days=1, limit=1)] == ["support"]
+
+
+def test_record_topics_ignores_empty_results(db, product):
+    record_topics(db, product.id, {})
+    assert db.query(ProductTopicAggregate).count() == 0
+
+
+def test_backfill_rebuilds_from_completed_analyses(db, product):
+    completed_at = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    for status in (AnalysisStatus.COMPLETED, AnalysisStatus.COMPLETED, AnalysisStatus.FAILED):
+        analysis = Analysis(product_id=product.id, status=status, completed_at=completed_at)
+        db.add(analysis)
+        db.flush()
+        db.add(Topic(analysis_id=analysis.id, name="price", keywords="price, cost", mention_count=2, avg_sentiment=0.5))
+    # A stale row the backfill replaces
+    record_topics(db, product.id, {"shipping": _topic(9, 0.0, {})}, completed_at.date())
+    db.commit()
+
+    assert backfill_topic_aggregates(db, product.id) == 2
+    db.commit()
+
+    row = db.query(ProductTopicAggregate).one()
+    assert (row.name, row.bucket_date) == ("price", completed_at.date())
+    assert row.mention_count == 4
+    assert row.sentiment_sum == 2.0
+    assert row.keyword_counts == {"price": 4, "cost": 4}
+    assert row.analysis_count == 2
+
+
+def test_upsert_adds_up_on_postgresql(postgresql_engine):
+    day = date(2026, 1, 1)
+    with Session(postgresql_engine) as db:
+        product = Product(name="Widget")
+        db.add(product)
+        db.commit()
+        record_topics(db, product.id, {"price": _topic(3, 0.5, {"price": 2, "cost": 1})}, day)
+        record_topics(db, product.id, {"price": _topic(2, -0.5, {"price": 1, "cheap": 2})}, day)
+        db.commit()
+
+        row = db.query(ProductTopicAggregate).one()
+        assert row.mention_count == 5
+        assert row.sentiment_sum == 0.5
+        assert row.keyword_counts == {"price": 3, "cost": 1, "cheap": 2}
+        assert row.analysis_count == 2
+
+
+def test_concurrent_upserts_both_count_on_postgresql(postgresql_engine):
+    # Two analyses finishing at once, both creating the day's row: the second
+    # insert waits for the first transaction, then adds to its row
+    day = date(2026, 1, 1)
+    with Session(postgresql_engine) as setup:
+        product = Product(name="Widget")
+        setup.add(product)
+        setup.commit()
+        product_id = product.id
+
+    def second_analysis():
+        with Session(postgresql_engine) as db:
+            record_topics(db, product_id, {"price": _topic(2, 1.0, {"cheap": 2})}, day)
+            db.commit()
+
+    with Session(postgresql_engine) as first, ThreadPoolExecutor(1) as pool:
+        record_topics(first, product_id, {"price": _topic(3, 0.0, {"price": 3})}, day)
+        second = pool.submit(second_analysis)
+        time.sleep(0.2)
+        assert not second.done()
+        first.commit()
+        second.result(timeout=10)
+
+    with Session(postgresql_engine) as db:
+        row = db.query(ProductTopicAggregate).one()
+        assert row.mention_count == 5
+        assert row.sentiment_sum == 2.0
+        assert row.keyword_counts == {"price": 3, "cheap": 2}
+        assert row.analysis_count == 2
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from app.ml.topic_matcher import TopicMatcher
+
+
+def test_keywords_match_whole_words_with_plurals():
+    matcher = TopicMatcher({"features": ["tool", "option"], "price": ["price"]})
+    assert matcher.match("Great tools and many options") == {("features", "tool"), ("features", "option")}
+    assert matcher.match("The toolbar is cluttered") == set()
+    assert matcher.match("PRICES went up") == {("price", "price")}
+
+
+def test_multi_word_and_symbol_keywords():
+    matcher = TopicMatcher({"support": ["customer service"], "price": ["$"]})
+    assert matcher.match("customer\n  service was slow") == {("support", "customer service")}
+    assert matcher.match("only $5") == {("price", "$")}
+
+
+def test_a_comment_counts_once_per_topic():
+    matcher = TopicMatcher({"price": ["price", "expensive"], "quality": ["broken"]})
+    topics = matcher.aggregate(
+        ["Expensive, and the price keeps rising", "arrived broken", "nothing relevant"],
+        [{"score": -0.5}, {"score": -1.0}, {"score": 1.0}]
+    )
+    assert topics["price"]["count"] == 1
+    assert topics["price"]["avg_sentiment"] == -0.5
+    assert topics["price"]["keyword_counts"] == {"expensive": 1, "price": 1}
+    assert topics["quality"]["count"] == 1
+    assert set(topics) == {"price", "quality"}
+
+
+def test_symbol_keywords_are_counted_but_not_listed():
+    topics = TopicMatcher({"price": ["$", "cheap"]}).aggregate(
+        ["$$$ for this?", "cheap and $10"], [{"score": -0.2}, {"score": 0.4}]
+    )
+    assert topics["price"]["count"] == 2
+    assert topics["price"]["keywords"] == ["cheap"]
+
+
+def test_taxonomy_file_must_map_topics_to_lists(tmp_path):
+    path = tmp_path / "taxonomy.json"
+    path.write_text(json.dumps({"price": ["cost"]}))
+    assert TopicMatcher.from_file(str(path)).match("the cost") == {("price", "cost")}
+
+    path.write_text(json.dumps({"price": "cost"}))
+    with pytest.raises(ValueError):
+        TopicMatcher.from_file(str(path))
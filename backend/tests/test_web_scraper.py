@@ -0,0 +1,119 @@
+"""WebScraper against a local mock server (conditional requests, Reddit paging)"""
+
+from datetime import datetime
+import asyncio
+
+from aiohttp import web
+
+from app.scrapers import web_scraper
+from app.scrapers.http_cache import HttpCache
+from app.scrapers.scheduler import ScrapeScheduler
+from app.scrapers.web_scraper import WebScraper
+
+from tests.conftest import serve
+
+
+def make_scraper(**kwargs) -> WebScraper:
+    scheduler = ScrapeScheduler(rate_per_host=1000, burst_per_host=100, backoff_base=0.01, backoff_max=0.05)
+    return WebScraper(user_agent="test", scheduler=scheduler, **kwargs)
+
+
+def test_unchanged_pages_are_served_from_the_http_cache(tmp_path):
+    seen = []
+
+    async def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text=f"page {request.query['q']}", headers={"ETag": '"v1"'})
+
+    async def run():
+        scraper = make_scraper(http_cache=HttpCache(str(tmp_path)))
+        try:
+            async with serve(handler) as url:
+                bodies = [
+                    await scraper.fetch(url, "mock", q="a"),
+                    await scraper.fetch(url, "mock", q="a"),
+                    await scraper.fetch(url, "mock", q="b"),
+                ]
+        finally:
+            await scraper.close()
+        return scraper, bodies
+
+    scraper, bodies = asyncio.run(run())
+
+    assert bodies == ["page a", "page a", "page b"]
+    # Only the repeat of q=a is conditional; q=b is a different cache entry
+    assert seen == [None, '"v1"', None]
+    assert scraper.http_cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_responses_without_validators_are_not_cached(tmp_path):
+    seen = []
+
+    async def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        return web.Response(text="page")
+
+    async def run():
+        scraper = make_scraper(http_cache=HttpCache(str(tmp_path)))
+        try:
+            async with serve(handler) as url:
+                for _ in range(2):
+                    await scraper.fetch(url, "mock")
+        finally:
+            await scraper.close()
+
+    asyncio.run(run())
+
+    assert seen == [None, None]
+    assert not list(tmp_path.glob("*/*.json"))
+
+
+def _post(n: int) -> dict:
+    return {"data": {"title": f"post {n}", "author": f"user{n}", "permalink": f"/r/x/{n}", "created_utc": 1_700_000_000 + n}}
+
+
+def test_fetch_reddit_pages_until_the_cursor(monkeypatch):
+    # Newest first, two posts per page: 9 8 | 7 6 | 5 4 | ...
+    pages = []
+
+    async def handler(request):
+        pages.append(request.query.get("after"))
+        start = int(request.query.get("after", 10))
+        posts = [_post(n) for n in range(start - 1, max(start - 3, -1), -1)]
+        after = str(start - 2) if start > 2 else None
+        return web.json_response({"data": {"children": posts, "after": after}})
+
+    async def run():
+        scraper = make_scraper(live_sources=True)
+        try:
+            async with serve(handler) as url:
+                monkeypatch.setattr(web_scraper, "REDDIT_SEARCH_URL", url)
+                cursor = datetime.utcfromtimestamp(1_700_000_000 + 4)
+                return await scraper.fetch_reddit("Widget", max_results=20, since={"reddit": cursor})
+        finally:
+            await scraper.close()
+
+    comments = asyncio.run(run())
+
+    # Stops at post 4, the first one not newer than the cursor
+    assert [comment.text for comment in comments] == ["post 9", "post 8", "post 7", "post 6", "post 5"]
+    assert pages == [None, "8", "6"]
+    assert comments[0].source_url == "https://www.reddit.com/r/x/9"
+
+
+def test_fetch_reddit_stops_at_max_results(monkeypatch):
+    async def handler(request):
+        return web.json_response({"data": {"children": [_post(n) for n in range(9, 0, -1)], "after": "more"}})
+
+    async def run():
+        scraper = make_scraper(live_sources=True)
+        try:
+            async with serve(handler) as url:
+                monkeypatch.setattr(web_scraper, "REDDIT_SEARCH_URL", url)
+                return await scraper.fetch_reddit("Widget", max_results=3)
+        finally:
+            await scraper.close()
+
+    assert [comment.text for comment in asyncio.run(run())] == ["post 9", "post 8", "post 7"]
@@ -4,6 +4,10 @@ Celery Worker Entry Point
 
 Start this worker with:
     celery -A worker.celery_app worker --loglevel=info
+
+Models are preloaded in the parent process before the pool forks (see
+app/core/worker_bootstrap.py). Check per-child memory with:
+    python -m app.core.worker_bootstrap <worker parent pid>
 """
 from app.core.celery_app import celery_app
 
@@ -57,44 +57,72 @@ function App() {
 
       setAnalysisStatus(`Analysis started! ID: ${jobResponse.analysis_id}`);
 
-      // Poll for completion
       const analysisId = jobResponse.analysis_id;
-      let attempts = 0;
-      const maxAttempts = 30; // 1 minute max (30 attempts * 2 seconds)
 
-      const pollInterval = setInterval(async () => {
-        attempts++;
+      const finish = async (status: string, errorMessage?: string | null) => {
+        if (status === 'completed') {
+          // Fetch dashboard data
+          const { data: dashboard } = await apiService.getDashboardData(productName.trim());
+          setDashboardData(dashboard);
+        } else {
+          setError(errorMessage || 'Analysis failed');
+        }
+        setLoading(false);
+        setAnalysisStatus('');
+      };
 
-        try {
-          const { data: status } = await apiService.getAnalysisStatus(analysisId);
-          
-          setAnalysisStatus(`Status: ${status.status.toUpperCase()} - ${status.total_comments} comments processed`);
+      // Poll for completion (fallback when the progress stream is unavailable)
+      const poll = () => {
+        let attempts = 0;
+        const maxAttempts = 30; // 1 minute max (30 attempts * 2 seconds)
 
-          if (status.status === 'completed') {
-            clearInterval(pollInterval);
+        const pollInterval = setInterval(async () => {
+          attempts++;
+
+          try {
+            const { data: status } = await apiService.getAnalysisStatus(analysisId);
             
-            // Fetch dashboard data
-            const { data: dashboard } = await apiService.getDashboardData(productName.trim());
-            setDashboardData(dashboard);
-            setLoading(false);
-            setAnalysisStatus('');
-          } else if (status.status === 'failed') {
+            setAnalysisStatus(`Status: ${status.status.toUpperCase()} - ${status.total_comments} comments processed`);
+
+            if (status.status === 'completed' || status.status === 'failed') {
+              clearInterval(pollInterval);
+              await finish(status.status, status.error_message);
+              return;
+            }
+          } catch (err) {
+            console.error('Polling error:', err);
+          }
+
+          if (attempts >= maxAttempts) {
             clearInterval(pollInterval);
-            setError(status.error_message || 'Analysis failed');
+            setError('Analysis timed out. Please try again.');
             setLoading(false);
             setAnalysisStatus('');
           }
-        } catch (err) {
-          console.error('Polling error:', err);
-        }
+        }, 2000); // Poll every 2 seconds
+      };
 
-        if (attempts >= maxAttempts) {
-          clearInterval(pollInterval);
-          setError('Analysis timed out. Please try again.');
-          setLoading(false);
-          setAnalysisStatus('');
+      // Follow progress pushed by the server
+      let finished = false;
+      apiService.streamAnalysisProgress(
+        analysisId,
+        async (event) => {
+          if (event.status === 'completed' || event.status === 'failed') {
+            finished = true;
+            await finish(event.status, event.error);
+            return;
+          }
+          const step = event.step ? ` - ${event.step.replace(/_/g, ' ')}` : '';
+          const progress = event.progress !== null ? ` (${event.progress}%)` : '';
+          setAnalysisStatus(`Status: ${event.status.toUpperCase()}${step}${progress}`);
+        },
+        () => {
+          if (!finished) {
+            console.warn('Progress stream unavailable, falling back to polling');
+            poll();
+          }
         }
-      }, 2000); // Poll every 2 seconds
+      );
 
     } catch (err: any) {
       console.error('Search error:', err);
@@ -35,6 +35,15 @@ export interface AnalysisStatus {
   completed_at: string | null;
 }
 
+export interface AnalysisProgressEvent {
+  analysis_id: number;
+  status: 'pending' | 'in_progress' | 'completed' | 'failed';
+  step: string | null;
+  progress: number | null;
+  comments?: number;
+  error?: string | null;
+}
+
 export interface Comment {
   id: number;
   text: string;
@@ -78,6 +87,27 @@ export const apiService = {
   getAnalysisStatus: (analysisId: number) =>
     api.get<AnalysisStatus>(`/api/analysis/status/${analysisId}`),
   
+  // Server-Sent Events progress stream; returns a function that closes it
+  streamAnalysisProgress: (
+    analysisId: number,
+    onEvent: (event: AnalysisProgressEvent) => void,
+    onError: () => void
+  ) => {
+    const source = new EventSource(`${API_BASE_URL}/api/analysis/stream/${analysisId}`);
+    source.addEventListener('progress', (e) => {
+      const event: AnalysisProgressEvent = JSON.parse((e as MessageEvent).data);
+      if (event.status === 'completed' || event.status === 'failed') {
+        source.close();
+      }
+      onEvent(event);
+    });
+    source.onerror = () => {
+      source.close();
+      onError();
+    };
+    return () => source.close();
+  },
+  
   getDashboardData: (productName: string) =>
     api.get<DashboardData>(`/api/analysis/dashboard/${productName}`),
 };